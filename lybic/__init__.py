@@ -35,9 +35,25 @@ from .dto import json_extra_fields_policy
 # Lybic Client
 from .authentication import LybicAuth
 from .lybic import LybicClient
+from .registry import LybicClientRegistry
+from .transport import TransportConfig
+from .retry import RetryPolicy, RetryBudget
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .failover import EndpointSelector
+from .rate_limit import RateLimiter, RateLimit
+from .concurrency import AdaptiveConcurrencyLimiter
+from .cache import ResponseCache, RevalidationCache
+from .sandbox_registry import SandboxRegistry
+from .compression import Compression
+from .deadline import Deadline
+from .middleware import Middleware, RequestContext
+from .fork import PerProcess
 
 # Exceptions
-from .exceptions import LybicError, LybicAPIError, LybicInternalError
+from .exceptions import (
+    LybicError, LybicAPIError, LybicInternalError, LybicCircuitOpenError,
+    LybicDeadlineExceededError, LybicSandboxNotReadyError,
+)
 
 # MCP Operations
 from .mcp import Mcp
@@ -53,6 +69,10 @@ from .pyautogui import Pyautogui
 
 # Sandbox
 from .sandbox import Sandbox
+from .sandbox_pool import SandboxPool
+from .sandbox_watcher import SandboxWatcher, StatusChange
+from .lease import Lease, LeaseManager
+from .bulk import BulkOperation, BulkReport, BulkResult
 
 # Stream Shell
 from .stream_shell import StreamShell
@@ -64,15 +84,44 @@ __all__ = [
     "__version__",
     "LybicAuth",
     "LybicClient",
+    "LybicClientRegistry",
+    "TransportConfig",
+    "RetryPolicy",
+    "RetryBudget",
+    "CircuitBreaker",
+    "CircuitState",
+    "EndpointSelector",
+    "RateLimiter",
+    "RateLimit",
+    "AdaptiveConcurrencyLimiter",
+    "ResponseCache",
+    "SandboxRegistry",
+    "RevalidationCache",
+    "Compression",
+    "Deadline",
+    "Middleware",
+    "RequestContext",
+    "PerProcess",
 
     "LybicError",
     "LybicAPIError",
     "LybicInternalError",
+    "LybicCircuitOpenError",
+    "LybicDeadlineExceededError",
+    "LybicSandboxNotReadyError",
 
     "ComputerUse",
     "Project",
     "Pyautogui",
     "Sandbox",
+    "SandboxPool",
+    "SandboxWatcher",
+    "StatusChange",
+    "Lease",
+    "LeaseManager",
+    "BulkOperation",
+    "BulkReport",
+    "BulkResult",
     "StreamShell",
     "Stats",
 
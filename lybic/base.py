@@ -29,15 +29,41 @@ import logging
 from sys import stderr
 from typing import Optional
 
+import httpx
+
 from lybic.authentication import LybicAuth
+from lybic.cache import ResponseCache, RevalidationCache
+from lybic.sandbox_registry import SandboxRegistry
+from lybic.circuit_breaker import CircuitBreaker
+from lybic.codec import ModelT, encode_json, parse_response
+from lybic.compression import Compression
+from lybic.concurrency import AdaptiveConcurrencyLimiter
+from lybic.deadline import TimeoutTypes
+from lybic.failover import EndpointSelector
+from lybic.middleware import RequestContext, default_middlewares
+from lybic.rate_limit import RateLimiter
+from lybic.retry import RetryPolicy
+from lybic.transport import TransportConfig
 
 class _LybicBaseClient:
     """_LybicBaseClient is a base client for all Lybic API."""
 
-    def __init__(self,
+    def __init__(self,  # pylint: disable=too-many-locals
                  auth: Optional[LybicAuth] = None,
-                 timeout: int = 10,
+                 timeout: TimeoutTypes = 10,
                  max_retries: int = 3,
+                 transport: Optional[TransportConfig] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 revalidation: Optional[RevalidationCache] = None,
+                 compression: Optional[Compression] = None,
+                 singleflight: bool = False,
+                 middlewares: Optional[list] = None,
+                 failover: Optional[EndpointSelector] = None,
+                 sandbox_registry: Optional[SandboxRegistry] = None,
                  ):
         """
         Init lybic client with org_id, api_key and endpoint
@@ -46,18 +72,82 @@ class _LybicBaseClient:
         :param org_id:
         :param api_key:
         :param endpoint:
+        :param timeout: seconds, or httpx.Timeout with separate connect/read/write/pool timeouts
+        :param transport: connection pool and protocol settings
+        :param retry_policy: retry policy, overrides max_retries
+        :param circuit_breaker: per-endpoint circuit breaker, disabled if None
+        :param rate_limiter: client-side rate limiter, disabled if None
+        :param concurrency_limiter: adaptive in-flight request limiter, disabled if None
+        :param cache: TTL response cache of slow-changing routes, disabled if None
+        :param revalidation: ETag / Last-Modified revalidation of polled routes, disabled if None
+        :param compression: response encoding negotiation and gzip request bodies, httpx defaults if None
+        :param singleflight: coalesce identical concurrent GET requests
+        :param middlewares: custom middlewares, run once per attempt
+        :param failover: equivalent API endpoints to fail over between, disabled if None
+        :param sandbox_registry: metadata of sandboxes by id, for Sandbox.get_metadata, disabled if None
         """
         if auth is None:
             auth = LybicAuth()
         self.auth = auth
-        if timeout < 0:
+        if not isinstance(timeout, httpx.Timeout) and timeout < 0:
             print("Warning: Timeout cannot be negative, set to 10", file=stderr)
             timeout = 10
         self.timeout = timeout
-        self.max_retries = max(max_retries, 0)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
+        self.max_retries = self.retry_policy.max_retries
+        self.transport_config = transport or TransportConfig()
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.cache = cache
+        self.revalidation = revalidation
+        self.compression = compression
+        self.failover = failover
+        self.sandbox_registry = sandbox_registry
+        # The request pipeline, outermost first. It can be edited, e.g. to wrap whole calls at index 0.
+        self.middlewares = default_middlewares(
+            self.retry_policy, middlewares, cache=cache, singleflight=singleflight, revalidation=revalidation,
+            compression=compression, circuit_breaker=circuit_breaker, rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter, failover=failover,
+        )
 
         self.logger = logging.getLogger(__name__)
 
+    def _context(self, method: str, path: str, kwargs: dict) -> RequestContext:
+        """Build the context of a call, preparing its headers and encoding its `json` body as `content`"""
+        key = None
+        if method.upper() == "GET" and set(kwargs) <= {"params"}:
+            key = self._request_key(path, kwargs.get("params"))
+        headers = self.headers.copy()
+        headers.update(kwargs.pop("headers", None) or {})
+        if kwargs.get("json") is not None:
+            kwargs["content"] = encode_json(kwargs.pop("json"))
+            headers["Content-Type"] = "application/json"
+        elif method.upper() != "POST":
+            headers.pop("Content-Type", None)
+        kwargs["headers"] = headers
+        return RequestContext(self, method, path, kwargs, key)
+
+    def _request_key(self, path: str, params) -> tuple:
+        return self.endpoint, path, tuple(sorted(httpx.QueryParams(params).multi_items()))
+
+    def parse(self, response: httpx.Response, model: type[ModelT]) -> ModelT:
+        """
+        Validate the body of a response as a DTO, see lybic.codec.parse_response
+
+        The middlewares of the call that fetched the response are notified with the DTO.
+
+        :param response:
+        :param model: the DTO class
+        :return:
+        """
+        parsed = parse_response(response, model)
+        context = response.extensions.get("lybic_context") if isinstance(response.extensions, dict) else None
+        if context is not None:
+            for middleware in context.client.middlewares:
+                middleware.on_parsed(context, parsed)
+        return parsed
+
     @property
     def headers(self):
         """
@@ -0,0 +1,170 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""bulk.py runs one API call per item of a list with bounded concurrency and reports each outcome."""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BULK_CONCURRENCY = 16
+
+
+class BulkResult(Generic[T]):
+    """The outcome of one item of a bulk operation."""
+    __slots__ = ("index", "item", "value", "error")
+
+    def __init__(self, index: int, item: Any, value: Optional[T] = None, error: Optional[Exception] = None):
+        """
+        :param index: position of the item in the input
+        :param item: the spec or id given for the item
+        :param value: the result of the call, on success
+        :param error: the error of the call, on failure
+        """
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call of the item succeeded"""
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok else f"error={type(self.error).__name__}: {self.error}"
+        return f"<BulkResult #{self.index} {self.item!r} {outcome}>"
+
+
+class BulkReport(Generic[T]):
+    """The outcomes of a bulk operation, in input order."""
+
+    def __init__(self, results: list[BulkResult[T]]):
+        """
+        :param results: the outcome of every item
+        """
+        self.results = sorted(results, key=lambda result: result.index)
+
+    @property
+    def succeeded(self) -> list[BulkResult[T]]:
+        """Outcomes of the items whose call succeeded"""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[BulkResult[T]]:
+        """Outcomes of the items whose call failed"""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def values(self) -> list[T]:
+        """Results of the successful calls, in input order"""
+        return [result.value for result in self.results if result.ok]
+
+    @property
+    def ok(self) -> bool:
+        """Whether every call succeeded"""
+        return all(result.ok for result in self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def summary(self) -> dict:
+        """
+        Count the outcomes
+
+        :return: {"total", "succeeded", "failed", "errors": {error type name: count}}
+        """
+        errors: dict[str, int] = {}
+        for result in self.failed:
+            errors[type(result.error).__name__] = errors.get(type(result.error).__name__, 0) + 1
+        return {"total": len(self.results), "succeeded": len(self.results) - sum(errors.values()),
+                "failed": sum(errors.values()), "errors": errors}
+
+    def __repr__(self):
+        summary = self.summary()
+        return f"<BulkReport {summary['succeeded']}/{summary['total']} succeeded>"
+
+
+class BulkOperation(Generic[T]):
+    """
+    A bulk operation of LybicClient: one call per item, at most `concurrency` in flight.
+
+    Await it for the BulkReport, or iterate over it to get each BulkResult as soon as its call finishes:
+
+        report = await client.sandbox.create_many(specs)
+
+        async for result in client.sandbox.delete_many(sandbox_ids, concurrency=32):
+            print(result.item, result.ok)
+
+    Every call goes through the request pipeline of the client, so its retry policy, rate limiter and
+    concurrency limiter apply. Errors are reported per item instead of being raised.
+    """
+
+    def __init__(self, items: Iterable[Any], function: Callable[[Any], Awaitable[T]],
+                 concurrency: int = DEFAULT_BULK_CONCURRENCY):
+        """
+        :param items: specs or ids
+        :param function: the call of one item
+        :param concurrency: maximum number of calls in flight
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.items = list(items)
+        self.function = function
+        self.concurrency = concurrency
+
+    async def _run(self, index: int, item: Any) -> BulkResult[T]:
+        try:
+            return BulkResult(index, item, value=await self.function(item))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return BulkResult(index, item, error=e)
+
+    async def __aiter__(self) -> AsyncIterator[BulkResult[T]]:
+        pending = iter(enumerate(self.items))
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            for index, item in pending:
+                results.put_nowait(await self._run(index, item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(self.items)))]
+        try:
+            for _ in range(len(self.items)):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def wait(self) -> BulkReport[T]:
+        """Run every call and get the report"""
+        return BulkReport([result async for result in self])
+
+    def __await__(self):
+        return self.wait().__await__()  # pylint: disable=no-member
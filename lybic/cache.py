@@ -0,0 +1,270 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""cache.py holds the TTL response cache for slow-changing Lybic API routes."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+from .fork import register_after_fork
+
+# Cached GET routes and their time to live, in seconds
+DEFAULT_CACHE_TTLS = {
+    "/api/orgs/{org_id}/shapes": 300.0,
+    "/api/orgs/{org_id}/machine-images": 60.0,
+    "/api/orgs/{org_id}/mcp-servers": 60.0,
+    "/api/orgs/{org_id}/mcp-servers/default": 60.0,
+    "/api/orgs/{org_id}/projects": 60.0,
+}
+
+# Mutating routes and the cached routes they make stale
+DEFAULT_CACHE_INVALIDATIONS = {
+    "/api/orgs/{org_id}/machine-images": ("/api/orgs/{org_id}/machine-images",),
+    "/api/orgs/{org_id}/machine-images/{image_id}": ("/api/orgs/{org_id}/machine-images",),
+    "/api/orgs/{org_id}/mcp-servers": (
+        "/api/orgs/{org_id}/mcp-servers", "/api/orgs/{org_id}/mcp-servers/default"),
+    "/api/orgs/{org_id}/mcp-servers/{mcp_server_id}": (
+        "/api/orgs/{org_id}/mcp-servers", "/api/orgs/{org_id}/mcp-servers/default"),
+    "/api/orgs/{org_id}/mcp-servers/{mcp_server_id}/sandbox": (
+        "/api/orgs/{org_id}/mcp-servers", "/api/orgs/{org_id}/mcp-servers/default"),
+    "/api/orgs/{org_id}/projects": ("/api/orgs/{org_id}/projects",),
+    "/api/orgs/{org_id}/projects/{project_id}": ("/api/orgs/{org_id}/projects",),
+}
+
+
+class _Entry:
+    __slots__ = ("response", "template", "org_id", "expires_at")
+
+    def __init__(self, response: httpx.Response, template: str, org_id: Optional[str], expires_at: float):
+        self.response = response
+        self.template = template
+        self.org_id = org_id
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    ResponseCache keeps successful GET responses of slow-changing routes for a per-route TTL.
+
+    Entries are evicted least-recently-used once `max_entries` is reached. A successful mutation
+    (any method but GET) of a route drops the cached entries of the routes it makes stale, for the same org.
+    Responses are shared with the DTOs parsed from them, so a cache hit does not validate the body again.
+    """
+
+    def __init__(self,
+                 ttls: Optional[dict[str, float]] = None,
+                 max_entries: int = 1024,
+                 invalidations: Optional[dict[str, tuple[str, ...]]] = None,
+                 ):
+        """
+        Init response cache
+
+        :param ttls: time to live in seconds per route template, defaults to DEFAULT_CACHE_TTLS.
+            Routes without a TTL are not cached.
+        :param max_entries: maximum number of cached responses
+        :param invalidations: cached route templates to drop per mutated route template,
+            defaults to DEFAULT_CACHE_INVALIDATIONS
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttls = DEFAULT_CACHE_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self.invalidations = DEFAULT_CACHE_INVALIDATIONS if invalidations is None else invalidations
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_cacheable(self, method: str, template: str) -> bool:
+        """
+        Check whether a request may be served from the cache
+
+        :param method:
+        :param template: route template of the request
+        :return:
+        """
+        return method.upper() == "GET" and template in self.ttls
+
+    def get(self, key: tuple) -> Optional[httpx.Response]:
+        """
+        Get a cached response
+
+        :param key: cache key, see LybicClient.request
+        :return: the response, or None when missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, template: str, org_id: Optional[str], response: httpx.Response):
+        """
+        Cache a response
+
+        :param key: cache key
+        :param template: route template of the request
+        :param org_id: org of the request, used for invalidation
+        :param response:
+        """
+        ttl = self.ttls.get(template)
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(response, template, org_id, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, template: str, org_id: Optional[str] = None):
+        """
+        Drop the entries made stale by a mutation of a route
+
+        :param template: route template of the mutation
+        :param org_id: org of the mutation, None for all orgs
+        """
+        stale = self.invalidations.get(template)
+        if not stale:
+            return
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry.template in stale and (org_id is None or entry.org_id == org_id)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Polled GET routes whose responses are revalidated with If-None-Match / If-Modified-Since
+DEFAULT_REVALIDATED_ROUTES = (
+    "/api/orgs/{org_id}/sandboxes",
+    "/api/orgs/{org_id}/mcp-servers",
+    "/api/orgs/{org_id}/projects",
+    "/api/orgs/{org_id}/stats",
+)
+
+
+class RevalidationCache:
+    """
+    RevalidationCache keeps the last response of polled routes together with its validators (ETag, Last-Modified).
+
+    The next GET of the same url is sent as a conditional request. When the server answers 304 Not Modified,
+    the previous response, and the DTO already parsed from it, is returned without downloading or validating
+    the body again. Responses without validators are not kept.
+    """
+
+    def __init__(self, routes: Optional[tuple[str, ...]] = None, max_entries: int = 256):
+        """
+        Init revalidation cache
+
+        :param routes: revalidated route templates, defaults to DEFAULT_REVALIDATED_ROUTES
+        :param max_entries: maximum number of kept responses, least recently used first out
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.routes = frozenset(DEFAULT_REVALIDATED_ROUTES if routes is None else routes)
+        self.max_entries = max_entries
+        self.not_modified = 0
+        self._entries: OrderedDict[tuple, httpx.Response] = OrderedDict()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple, template: str) -> Optional[httpx.Response]:
+        """
+        Get the response to revalidate
+
+        :param key: cache key, see LybicClient.request
+        :param template: route template of the request
+        :return:
+        """
+        if template not in self.routes:
+            return None
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    @staticmethod
+    def conditional_headers(response: httpx.Response) -> dict:
+        """
+        Build the conditional request headers from the validators of a response
+
+        :param response:
+        :return:
+        """
+        headers = {}
+        if "etag" in response.headers:
+            headers["If-None-Match"] = response.headers["etag"]
+        if "last-modified" in response.headers:
+            headers["If-Modified-Since"] = response.headers["last-modified"]
+        return headers
+
+    def resolve(self, key: tuple, template: str, response: httpx.Response,
+                previous: Optional[httpx.Response]) -> httpx.Response:
+        """
+        Resolve the response of a (possibly conditional) request
+
+        :param key: cache key
+        :param template: route template of the request
+        :param response: the response received
+        :param previous: the response that was revalidated, if any
+        :return: previous on 304 Not Modified, otherwise response
+        """
+        if response.status_code == 304 and previous is not None:
+            with self._lock:
+                self.not_modified += 1
+            return previous
+        if template in self.routes and self.conditional_headers(response):
+            with self._lock:
+                self._entries[key] = response
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return response
@@ -0,0 +1,188 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""circuit_breaker.py holds the per-endpoint circuit breaker of the request pipeline."""
+import threading
+import time
+from enum import Enum
+from typing import Optional
+
+import httpx
+
+from .exceptions import LybicCircuitOpenError
+from .fork import register_after_fork
+
+
+class CircuitState(str, Enum):
+    """State of a circuit."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probes", "trips")
+
+    def __init__(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.trips = 0
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker keeps one circuit per (endpoint, route template).
+
+    A circuit opens after `failure_threshold` consecutive failures (network errors and 5xx responses).
+    While it is open, calls fail fast with LybicCircuitOpenError. After `recovery_timeout` seconds the circuit
+    becomes half-open and lets `half_open_max_calls` probe calls through: a success closes it, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Init circuit breaker
+
+        :param failure_threshold: consecutive failures that open a circuit
+        :param recovery_timeout: seconds a circuit stays open before letting probe calls through
+        :param half_open_max_calls: concurrent probe calls allowed while half-open
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self._circuits: dict[tuple[str, str], _Circuit] = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_failure(error: Optional[Exception]) -> bool:
+        """
+        Check whether an outcome counts as a failure of the endpoint
+
+        :param error: the error of the call, None on success
+        :return:
+        """
+        if error is None:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.RequestError)
+
+    def before_call(self, endpoint: str, route: str):
+        """
+        Check that a call may be sent
+
+        :param endpoint: base url of the endpoint
+        :param route: route template of the call
+        :raises LybicCircuitOpenError: When the circuit is open
+        """
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuits.get((endpoint, route))
+            if circuit is None or circuit.state == CircuitState.CLOSED:
+                return
+            if circuit.state == CircuitState.OPEN:
+                remaining = circuit.opened_at + self.recovery_timeout - now
+                if remaining > 0:
+                    raise LybicCircuitOpenError(endpoint, route, remaining)
+                circuit.state = CircuitState.HALF_OPEN
+                circuit.opened_at = now
+                circuit.probes = 0
+            if circuit.probes >= self.half_open_max_calls:
+                # a probe that never reported back (e.g. cancelled) must not wedge the circuit
+                remaining = circuit.opened_at + self.recovery_timeout - now
+                if remaining > 0:
+                    raise LybicCircuitOpenError(endpoint, route, remaining)
+                circuit.opened_at = now
+                circuit.probes = 0
+            circuit.probes += 1
+
+    def record(self, endpoint: str, route: str, error: Optional[Exception] = None):
+        """
+        Record the outcome of a call
+
+        :param endpoint: base url of the endpoint
+        :param route: route template of the call
+        :param error: the error of the call, None on success
+        """
+        failed = self.is_failure(error)
+        with self._lock:
+            circuit = self._circuits.get((endpoint, route))
+            if circuit is None:
+                if not failed:
+                    return
+                circuit = self._circuits[(endpoint, route)] = _Circuit()
+            if not failed:
+                circuit.state = CircuitState.CLOSED
+                circuit.failures = 0
+                circuit.probes = 0
+                return
+            circuit.failures += 1
+            if circuit.state == CircuitState.HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = CircuitState.OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.trips += 1
+
+    def state(self, endpoint: str, route: str) -> CircuitState:
+        """
+        Get the state of a circuit
+
+        :param endpoint:
+        :param route:
+        :return:
+        """
+        with self._lock:
+            circuit = self._circuits.get((endpoint, route))
+            return circuit.state if circuit is not None else CircuitState.CLOSED
+
+    def snapshot(self) -> list[dict]:
+        """
+        Get the state of every known circuit, for metrics
+
+        :return: a list of {"endpoint", "route", "state", "failures", "trips"}
+        """
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "route": route,
+                    "state": circuit.state.value,
+                    "failures": circuit.failures,
+                    "trips": circuit.trips,
+                }
+                for (endpoint, route), circuit in self._circuits.items()
+            ]
+
+    def reset(self):
+        """Close all circuits"""
+        with self._lock:
+            self._circuits.clear()
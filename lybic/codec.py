@@ -0,0 +1,80 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""codec.py encodes request bodies and decodes Lybic API responses into DTOs.
+
+DTOs are serialized straight to JSON bytes and responses are validated from the raw body bytes, skipping the
+intermediate dicts and str decodes. Plain dicts are encoded with orjson when it is installed.
+"""
+import json
+from typing import Any, TypeVar
+
+import httpx
+import pydantic_core
+from pydantic import BaseModel
+
+# pylint: disable=invalid-name
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def encode_json(body: Any) -> bytes:
+    """
+    Encode a request body as JSON bytes
+
+    DTOs are serialized without their None fields, like `model_dump(exclude_none=True)`.
+
+    :param body: a DTO, or any JSON serializable object
+    :return:
+    """
+    if isinstance(body, BaseModel):
+        return pydantic_core.to_json(body, exclude_none=True)
+    if orjson is not None:
+        return orjson.dumps(body)  # pylint: disable=no-member
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def parse_response(response: httpx.Response, model: type[ModelT]) -> ModelT:
+    """
+    Validate the body of a response as a DTO
+
+    The result is memoized on the response, so callers sharing a response (e.g. coalesced requests)
+    also share the parsed DTO instead of validating the body again. Treat shared DTOs as read-only.
+
+    :param response:
+    :param model: the DTO class
+    :return:
+    """
+    parsed = response.extensions.setdefault("lybic_parsed", {})
+    try:
+        return parsed[model]
+    except KeyError:
+        result = parsed[model] = model.model_validate_json(response.content)
+        return result
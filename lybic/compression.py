@@ -0,0 +1,137 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""compression.py negotiates compressed responses and compresses large request bodies."""
+import gzip
+import importlib.util
+import threading
+from typing import Optional
+
+import httpx
+
+from .fork import register_after_fork
+
+
+def supported_encodings() -> tuple:
+    """
+    Content encodings httpx can decode in this environment
+
+    brotli needs the `brotli` (or `brotlicffi`) package and zstd the `zstandard` package,
+    see `pip install 'lybic[compression]'`.
+
+    :return: e.g. ("zstd", "br", "gzip", "deflate")
+    """
+    encodings = []
+    if importlib.util.find_spec("zstandard") is not None:
+        encodings.append("zstd")
+    if importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None:
+        encodings.append("br")
+    return tuple(encodings) + ("gzip", "deflate")
+
+
+class Compression:
+    """
+    Compression settings of LybicClient and LybicSyncClient
+
+    Responses are negotiated with every encoding httpx can decode. Request bodies of at least
+    `min_request_size` bytes are sent gzip-compressed. The bytes before and after compression are
+    counted both ways, see `snapshot()`.
+    """
+
+    def __init__(self, min_request_size: Optional[int] = None, level: int = 6,
+                 encodings: Optional[tuple] = None):
+        """
+        :param min_request_size: gzip request bodies of at least this many bytes, None to never compress requests.
+            Only enable it when the endpoint accepts `Content-Encoding: gzip` request bodies.
+        :param level: gzip compression level, 1 (fastest) to 9 (smallest)
+        :param encodings: response encodings to negotiate, defaults to supported_encodings()
+        """
+        if min_request_size is not None and min_request_size < 0:
+            raise ValueError("min_request_size cannot be negative")
+        if not 1 <= level <= 9:
+            raise ValueError("level must be between 1 and 9")
+        self.min_request_size = min_request_size
+        self.level = level
+        self.accept_encoding = ", ".join(encodings or supported_encodings())
+
+        self._lock = threading.Lock()
+        register_after_fork(self)
+        self.request_bytes = 0
+        self.request_wire_bytes = 0
+        self.response_bytes = 0
+        self.response_wire_bytes = 0
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def compress(self, content: bytes) -> Optional[bytes]:
+        """
+        Compress a request body if it is large enough
+
+        :param content: the encoded request body
+        :return: the gzip-compressed body, or None to send it as is
+        """
+        compressed = None
+        if self.min_request_size is not None and len(content) >= self.min_request_size:
+            compressed = gzip.compress(content, compresslevel=self.level, mtime=0)
+            if len(compressed) >= len(content):
+                compressed = None
+        with self._lock:
+            self.request_bytes += len(content)
+            self.request_wire_bytes += len(compressed if compressed is not None else content)
+        return compressed
+
+    def observe(self, response: httpx.Response):
+        """
+        Count the bytes of a response as received and as decoded
+
+        :param response: a response whose body has been read
+        """
+        with self._lock:
+            self.response_bytes += len(response.content)
+            self.response_wire_bytes += response.num_bytes_downloaded
+
+    @staticmethod
+    def _ratio(wire: int, decoded: int) -> Optional[float]:
+        return wire / decoded if decoded else None
+
+    def snapshot(self) -> dict:
+        """
+        Bandwidth counters, for metrics
+
+        A ratio is the bytes sent or received over the bytes before compression, lower is better.
+
+        :return:
+        """
+        with self._lock:
+            return {
+                "request_bytes": self.request_bytes,
+                "request_wire_bytes": self.request_wire_bytes,
+                "request_ratio": self._ratio(self.request_wire_bytes, self.request_bytes),
+                "response_bytes": self.response_bytes,
+                "response_wire_bytes": self.response_wire_bytes,
+                "response_ratio": self._ratio(self.response_wire_bytes, self.response_bytes),
+            }
@@ -0,0 +1,218 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""concurrency.py holds the adaptive (AIMD) concurrency limiter of the request pipeline."""
+import asyncio
+import threading
+from collections import deque
+from typing import Optional
+
+from .fork import register_after_fork
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AdaptiveConcurrencyLimiter bounds the number of in-flight requests and adapts the bound to the server, like TCP AIMD.
+
+    - While latency stays flat and the limit is actually used, the limit grows additively by `increase` per `limit`
+      successful responses (about one step per round trip).
+    - On a timeout, a 5xx or a 429 response, or when the short-term latency exceeds `tolerance` times the long-term
+      latency (server-side queueing), the limit is multiplied by `backoff_ratio`.
+
+    Requests above the limit wait in FIFO order. One limiter is thread-safe and can be shared by async and sync clients.
+    """
+
+    def __init__(self,
+                 initial_limit: int = 20,
+                 min_limit: int = 1,
+                 max_limit: int = 200,
+                 increase: float = 1.0,
+                 backoff_ratio: float = 0.9,
+                 tolerance: float = 2.0,
+                 smoothing: float = 0.2,
+                 baseline_smoothing: float = 0.01,
+                 ):
+        """
+        Init adaptive concurrency limiter
+
+        :param initial_limit: in-flight limit before any response was seen
+        :param min_limit: the limit never drops below this
+        :param max_limit: the limit never grows above this
+        :param increase: additive increase per round of `limit` successful responses
+        :param backoff_ratio: multiplicative decrease on a dropped request or a latency spike
+        :param tolerance: short-term over long-term latency ratio above which the server is considered queueing
+        :param smoothing: EWMA weight of the short-term latency
+        :param baseline_smoothing: EWMA weight of the long-term (baseline) latency
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        if tolerance < 1:
+            raise ValueError("tolerance must be at least 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.rtt: Optional[float] = None
+        self.baseline_rtt: Optional[float] = None
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        # requests in flight and waiting threads of the parent do not exist in the child
+        self.in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def gradient(self) -> float:
+        """Baseline over short-term latency: 1.0 when latency is flat, lower when requests queue up"""
+        if not self.rtt or self.baseline_rtt is None:
+            return 1.0
+        return self.baseline_rtt / self.rtt
+
+    def _try_acquire(self) -> bool:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _grant_waiters(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(_wake, future)
+
+    async def acquire_async(self, timeout: Optional[float] = None):
+        """
+        Wait for an in-flight slot
+
+        :param timeout: maximum seconds to wait, None to wait forever
+        :raises asyncio.TimeoutError: When no slot was free in time
+        """
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    granted = True
+            if granted:
+                self.release()
+            raise
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait for an in-flight slot, blocking the calling thread
+
+        :param timeout: maximum seconds to wait, None to wait forever
+        :raises TimeoutError: When no slot was free in time
+        """
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        if waiter.wait(timeout):
+            return
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                # the slot was granted while timing out
+                return
+        raise TimeoutError("timed out waiting for a concurrency slot")
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False):
+        """
+        Release an in-flight slot and adapt the limit
+
+        :param rtt: latency of the request in seconds, None if unknown (e.g. cancelled)
+        :param dropped: whether the request timed out or was rejected by an overloaded server
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if dropped:
+                self._decrease()
+            elif rtt is not None:
+                self._sample(rtt)
+            self._grant_waiters()
+
+    def _decrease(self):
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+
+    def _sample(self, rtt: float):
+        if self.rtt is None:
+            self.rtt = self.baseline_rtt = rtt
+        else:
+            self.rtt += self.smoothing * (rtt - self.rtt)
+            self.baseline_rtt += self.baseline_smoothing * (rtt - self.baseline_rtt)
+        if self.rtt > self.baseline_rtt * self.tolerance:
+            self._decrease()
+            # do not let the queueing latency become the new baseline
+            self.rtt = self.baseline_rtt * self.tolerance
+        elif (self.in_flight + 1) * 2 >= self.limit:
+            self.limit = min(float(self.max_limit), self.limit + self.increase / self.limit)
+
+    def snapshot(self) -> dict:
+        """
+        Get the current state of the limiter, for dashboards
+
+        :return: {"limit", "in_flight", "queued", "rtt", "baseline_rtt", "gradient"}
+        """
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "rtt": self.rtt,
+                "baseline_rtt": self.baseline_rtt,
+                "gradient": self.gradient,
+            }
@@ -0,0 +1,135 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""deadline.py holds per-call deadlines that cover all attempts, backoff sleeps and waits of a call."""
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Union
+
+import httpx
+
+from .exceptions import LybicDeadlineExceededError
+
+TimeoutTypes = Union[int, float, httpx.Timeout]
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("lybic_deadline", default=None)
+
+
+def timeout_seconds(timeout: TimeoutTypes) -> Optional[float]:
+    """
+    Get a single number of seconds from a timeout setting, for APIs that do not accept httpx.Timeout
+
+    :param timeout: seconds or httpx.Timeout
+    :return: the longest of the timeouts, None if there is none
+    """
+    if not isinstance(timeout, httpx.Timeout):
+        return timeout
+    values = [value for value in (timeout.connect, timeout.read, timeout.write, timeout.pool) if value is not None]
+    return max(values) if values else None
+
+
+class Deadline:
+    """
+    Deadline is a point in time by which a call must complete, including its retries and backoff sleeps.
+
+    Use it as a (sync or async) context manager to give a deadline to every Lybic request made inside the block.
+    Nested deadlines never extend the enclosing one.
+
+        with Deadline(2.5):
+            await client.sandbox.execute_sandbox_action(sandbox_id, action=action)
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Init deadline
+
+        :param seconds: time budget from now, in seconds
+        """
+        if seconds < 0:
+            raise ValueError("seconds cannot be negative")
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._token: Optional[Token] = None
+
+    @staticmethod
+    def current() -> Optional["Deadline"]:
+        """Get the deadline of the current context, if any"""
+        return _current.get()
+
+    def remaining(self) -> float:
+        """Seconds left, negative once expired"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed"""
+        return self.remaining() <= 0
+
+    def check(self):
+        """
+        Raise if the deadline has passed
+
+        :raises LybicDeadlineExceededError:
+        """
+        if self.expired():
+            raise LybicDeadlineExceededError(self.seconds)
+
+    def fits(self, delay: float) -> bool:
+        """Whether waiting `delay` seconds still leaves time before the deadline"""
+        return delay < self.remaining()
+
+    def timeout(self, timeout: TimeoutTypes) -> httpx.Timeout:
+        """
+        Clamp a timeout setting to the remaining time
+
+        :param timeout: seconds or httpx.Timeout
+        :return: a timeout whose connect, read, write and pool timeouts all end by the deadline
+        """
+        timeout = timeout if isinstance(timeout, httpx.Timeout) else httpx.Timeout(timeout)
+        remaining = max(self.remaining(), 0.001)
+
+        def clamp(value: Optional[float]) -> float:
+            return remaining if value is None else min(value, remaining)
+
+        return httpx.Timeout(
+            connect=clamp(timeout.connect), read=clamp(timeout.read),
+            write=clamp(timeout.write), pool=clamp(timeout.pool),
+        )
+
+    def __enter__(self) -> "Deadline":
+        enclosing = _current.get()
+        effective = enclosing if enclosing is not None and enclosing.expires_at <= self.expires_at else self
+        self._token = _current.set(effective)
+        return effective
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.reset(self._token)
+        self._token = None
+
+    async def __aenter__(self) -> "Deadline":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
@@ -194,6 +194,15 @@ class Sandbox(BaseModel):
     status: Optional[SandboxStatus] = Field(None, description="Current sandbox status")
 
 
+class SandboxStatusResponseDto(BaseModel):
+    """
+    Response of getting the status of a sandbox.
+    """
+    model_config = ConfigDict(extra=json_extra_fields_policy)
+
+    status: str = Field(..., description="Current sandbox status (PENDING/RUNNING/STOPPED/ERROR)")
+
+
 class GatewayAddress(BaseModel):
     """
     Details of a gateway address for connecting to a sandbox.
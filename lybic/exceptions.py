@@ -90,3 +90,59 @@ class LybicInternalError(LybicError):
         :param status_code: HTTP status code (5xx)
         """
         super().__init__("internal error occur", status_code)
+
+
+class LybicCircuitOpenError(LybicError):
+    """Exception raised when a call is rejected because the circuit of its endpoint is open.
+
+    The circuit opens after repeated failures (network errors or 5xx responses) of the same
+    endpoint and route, and calls fail fast until it recovers.
+    """
+
+    def __init__(self, endpoint: str, route: str, retry_after: float):
+        """
+        Initialize LybicCircuitOpenError.
+
+        :param endpoint: Base url of the endpoint
+        :param route: Route template of the call
+        :param retry_after: Seconds until the circuit lets a probe call through
+        """
+        self.endpoint = endpoint
+        self.route = route
+        self.retry_after = retry_after
+        super().__init__(f"circuit open for {endpoint}{route}, retry after {retry_after:.1f}s")
+
+
+class LybicDeadlineExceededError(LybicError, TimeoutError):
+    """Exception raised when a call does not complete before its deadline.
+
+    The deadline covers every attempt of the call, the backoff sleeps between them and the waits
+    for rate limit tokens or concurrency slots.
+    """
+
+    def __init__(self, deadline: float):
+        """
+        Initialize LybicDeadlineExceededError.
+
+        :param deadline: The time budget of the call, in seconds
+        """
+        self.deadline = deadline
+        super().__init__(f"deadline of {deadline:.3f}s exceeded")
+
+
+class LybicSandboxNotReadyError(LybicError):
+    """Exception raised when a sandbox created by a SandboxPool does not become RUNNING.
+
+    The sandbox stopped or failed to start, or it was still pending when the pool gave up waiting.
+    """
+
+    def __init__(self, sandbox_id: str, status: Optional[str]):
+        """
+        Initialize LybicSandboxNotReadyError.
+
+        :param sandbox_id: ID of the sandbox
+        :param status: Last status of the sandbox
+        """
+        self.sandbox_id = sandbox_id
+        self.status = status
+        super().__init__(f"sandbox {sandbox_id} did not become RUNNING (last status: {status})")
@@ -0,0 +1,165 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""failover.py holds the selection of the fastest healthy endpoint among equivalent API endpoints."""
+import threading
+import time
+from typing import Optional
+
+from .circuit_breaker import CircuitBreaker
+from .fork import register_after_fork
+
+
+class _Endpoint:
+    __slots__ = ("url", "latency", "error_rate", "failures", "down_until", "requests", "errors")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+
+class EndpointSelector:
+    """
+    EndpointSelector sends traffic to the fastest healthy endpoint of a list of equivalent API endpoints.
+
+    It keeps an EWMA of the latency and of the error rate of each endpoint, from real calls and probes. An endpoint
+    is taken out of rotation for `cooldown` seconds after `failure_threshold` consecutive failures (network errors
+    and 5xx responses). Endpoints that were never measured are tried first, in the order of the list.
+    """
+
+    def __init__(self,
+                 endpoints: list[str],
+                 smoothing: float = 0.2,
+                 error_penalty: float = 10.0,
+                 failure_threshold: int = 1,
+                 cooldown: float = 10.0,
+                 ):
+        """
+        Init endpoint selector
+
+        :param endpoints: base urls of equivalent API endpoints, e.g. one per region
+        :param smoothing: weight of a new sample in the EWMAs, between 0 and 1
+        :param error_penalty: how much the error rate inflates the latency score: latency * (1 + penalty * rate)
+        :param failure_threshold: consecutive failures that take an endpoint out of rotation
+        :param cooldown: seconds an endpoint stays out of rotation
+        """
+        if not endpoints:
+            raise ValueError("endpoints cannot be empty")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.endpoints = [endpoint.rstrip("/") for endpoint in endpoints]
+        self.smoothing = smoothing
+        self.error_penalty = error_penalty
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown = cooldown
+        self._stats = {url: _Endpoint(url) for url in self.endpoints}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _score(self, stats: _Endpoint) -> float:
+        return (stats.latency or 0.0) * (1 + self.error_penalty * stats.error_rate)
+
+    def choose(self, exclude: tuple = ()) -> Optional[str]:
+        """
+        Get the endpoint for the next attempt
+
+        When every endpoint is out of rotation, the one that recovers first is returned anyway.
+
+        :param exclude: endpoints already tried by the call
+        :return: None when every endpoint is excluded
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [stats for stats in self._stats.values() if stats.url not in exclude]
+            if not candidates:
+                return None
+            healthy = [stats for stats in candidates if stats.down_until <= now]
+            if not healthy:
+                return min(candidates, key=lambda stats: stats.down_until).url
+            # min() keeps the first of equal scores, so unmeasured endpoints go in list order
+            return min(healthy, key=self._score).url
+
+    def record(self, endpoint: str, elapsed: Optional[float], error: Optional[Exception] = None):
+        """
+        Record the outcome of an attempt on an endpoint
+
+        :param endpoint: base url of the endpoint
+        :param elapsed: seconds until the response, None if unknown
+        :param error: the error of the attempt, None on success
+        """
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            return
+        failed = CircuitBreaker.is_failure(error)
+        with self._lock:
+            stats.requests += 1
+            if elapsed is not None and not failed:
+                stats.latency = elapsed if stats.latency is None else \
+                    stats.latency + self.smoothing * (elapsed - stats.latency)
+            stats.error_rate += self.smoothing * ((1.0 if failed else 0.0) - stats.error_rate)
+            if not failed:
+                stats.failures = 0
+                return
+            stats.errors += 1
+            stats.failures += 1
+            if stats.failures >= self.failure_threshold:
+                stats.down_until = time.monotonic() + self.cooldown
+
+    def is_healthy(self, endpoint: str) -> bool:
+        """
+        Check whether an endpoint is in rotation
+
+        :param endpoint:
+        :return:
+        """
+        stats = self._stats.get(endpoint)
+        return stats is not None and stats.down_until <= time.monotonic()
+
+    def snapshot(self) -> list[dict]:
+        """
+        Get the state of every endpoint, best first
+
+        :return: [{"endpoint", "healthy", "latency", "error_rate", "requests", "errors"}]
+        """
+        now = time.monotonic()
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=lambda stats: (stats.down_until > now, self._score(stats)))
+            return [{
+                "endpoint": stats.url,
+                "healthy": stats.down_until <= now,
+                "latency": stats.latency,
+                "error_rate": stats.error_rate,
+                "requests": stats.requests,
+                "errors": stats.errors,
+            } for stats in ranked]
@@ -0,0 +1,111 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""fork.py makes clients created before a fork safe to use in the child process.
+
+A forked child inherits the sockets of the parent's connection pools; two processes reading and writing the
+same keep-alive connection interleave their responses. After a fork, the child drops the inherited pools,
+HTTP clients and thread pools without closing them (the parent still uses them), and renews the locks that
+another parent thread may have held while forking. New connections are opened on first use in the child.
+"""
+import os
+import threading
+import uuid
+import weakref
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_registered: "weakref.WeakSet" = weakref.WeakSet()
+_registered_lock = threading.Lock()
+# PerProcess instances of this process, by key
+_instances: dict = {}
+_instances_lock = threading.RLock()
+
+
+def register_after_fork(obj) -> None:
+    """
+    Call `obj._after_fork()` in the child process after each fork
+
+    Only a weak reference is kept.
+
+    :param obj: an object with an `_after_fork` method
+    """
+    with _registered_lock:
+        _registered.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    global _registered_lock, _instances_lock  # pylint: disable=global-statement
+    _registered_lock, _instances_lock = threading.Lock(), threading.RLock()
+    _instances.clear()
+    for obj in list(_registered):
+        obj._after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class PerProcess(Generic[T]):
+    """
+    PerProcess holds one instance per process, e.g. one client per worker of a ProcessPoolExecutor.
+
+    The instance is built on first use in each process, and never inherited by a forked child. PerProcess can
+    be pickled; copies unpickled in the same process share its instance, so it can be a module global or an
+    argument of the tasks sent to pool workers:
+
+        clients = PerProcess(LybicSyncClient, auth=auth)
+
+        def status(sandbox_id):
+            return clients.get().sandbox.get_status(sandbox_id)
+
+        with ProcessPoolExecutor() as pool:
+            statuses = list(pool.map(status, sandbox_ids))
+    """
+
+    def __init__(self, factory: Callable[..., T], *args: Any, **kwargs: Any):
+        """
+        Init with the factory of the instance
+
+        :param factory: e.g. LybicSyncClient
+        :param args: arguments of factory
+        :param kwargs: arguments of factory
+        """
+        self.factory = factory
+        self.args = args
+        self.kwargs = kwargs
+        self.key = uuid.uuid4().hex
+
+    def get(self) -> T:
+        """Get the instance of the current process, building it on first use"""
+        instance = _instances.get(self.key)
+        if instance is None:
+            with _instances_lock:
+                instance = _instances.get(self.key)
+                if instance is None:
+                    instance = _instances[self.key] = self.factory(*self.args, **self.kwargs)
+        return instance
@@ -23,10 +23,15 @@
 """Agentic Lybic Restful API client"""
 import asyncio
 import logging
+import weakref
+from typing import Optional, TYPE_CHECKING
 
 import httpx
 
-from lybic import LybicAuth
+from lybic import LybicAuth, LybicClientRegistry
+from lybic.circuit_breaker import CircuitBreaker
+from lybic.middleware import CallNext, RequestContext, build_chain, default_middlewares
+from lybic.retry import RetryPolicy
 from lybic.gui_agents.models import (
     AgentInfo,
     CommonConfig,
@@ -38,21 +43,78 @@ from lybic.gui_agents.models import (
     QueryTaskStatusResponse
 )
 
+if TYPE_CHECKING:
+    from lybic.lybic import LybicClient
+
+
+# registries of the clients created without a LybicClient, one per event loop as async pools cannot change loops
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LybicClientRegistry]" = weakref.WeakKeyDictionary()
+
+
+def _default_registry() -> LybicClientRegistry:
+    loop = asyncio.get_running_loop()
+    registry = _registries.get(loop)
+    if registry is None:
+        registry = _registries[loop] = LybicClientRegistry()
+    return registry
+
 
 class Client:
     """Agentic Lybic Restful API client"""
-    def __init__(self, auth: LybicAuth,timeout: int = 10,max_retries: int = 3):
-        """Agentic Lybic Restful API client"""
+    def __init__(self, auth: Optional[LybicAuth] = None,timeout: int = 10,max_retries: int = 3,
+                 lybic_client: Optional["LybicClient"] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 registry: Optional[LybicClientRegistry] = None):
+        """
+        Agentic Lybic Restful API client
+
+        :param auth: LybicAuth instance, defaults to the auth of `lybic_client`
+        :param timeout:
+        :param max_retries:
+        :param lybic_client: share the connection pools of this LybicClient
+        :param retry_policy: retry policy, defaults to the policy (and retry budget) of `lybic_client`
+        :param circuit_breaker: circuit breaker, defaults to the circuit breaker of `lybic_client`
+        :param registry: without `lybic_client`, share the connection pools of this registry. Defaults to a
+            registry of the event loop, so that all agent clients of an endpoint share their pools.
+        """
+        if auth is None:
+            if lybic_client is None:
+                raise ValueError("auth is required when lybic_client is not provided")
+            auth = lybic_client.auth
         self.auth = auth
         self.timeout = timeout
-        self.max_retries = max_retries
+        if retry_policy is None:
+            retry_policy = lybic_client.retry_policy if lybic_client is not None else RetryPolicy(max_retries=max_retries)
+        self.retry_policy = retry_policy
+        self.max_retries = retry_policy.max_retries
+        if circuit_breaker is None and lybic_client is not None:
+            circuit_breaker = lybic_client.circuit_breaker
+        self.circuit_breaker = circuit_breaker
+        self.lybic_client = lybic_client
+        self.registry = registry
+        self.middlewares = default_middlewares(retry_policy, circuit_breaker=circuit_breaker)
+        self._chain: Optional[tuple[tuple, CallNext]] = None
         self._httpclient: httpx.AsyncClient | None = None
         self._in_context = False
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def endpoint(self) -> str:
+        """Base url of the requests, the agent service endpoint"""
+        return self.auth.agent_service_endpoint
+
+    @property
+    def org_id(self) -> str:
+        """Organization of the requests"""
+        return self.auth.org_id
+
     def _ensure_client_is_open(self):
         if self._httpclient is None:
-            self._httpclient = httpx.AsyncClient(headers=self.auth.headers, timeout=self.timeout)
+            lybic_client = self.lybic_client
+            if lybic_client is None:
+                lybic_client = (self.registry or _default_registry()).get(self.auth)
+            self._httpclient = lybic_client.make_http_client(headers=self.auth.headers, timeout=self.timeout)
         elif self._httpclient.is_closed:
             raise RuntimeError("The client has been closed and cannot be reused. Please create a new client instance.")
 
@@ -86,24 +148,9 @@ class Client:
         """
         self._ensure_client_is_open()
 
-        url = f"{self.auth.agent_service_endpoint}{path}"
         headers = self.auth.headers.copy()
         headers.pop("Content-Type", None)
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self._httpclient.get(url, headers=headers)
-                response.raise_for_status()
-                return response
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                else:
-                    self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-                await asyncio.sleep(2 ** attempt)
-
-        raise last_exception
+        return await self._send("GET", path, headers=headers)
 
     async def _post(self, path: str, data: dict) -> httpx.Response:
         """
@@ -115,22 +162,31 @@ class Client:
         """
         self._ensure_client_is_open()
 
-        url = f"{self.auth.agent_service_endpoint}{path}"
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self._httpclient.post(url, headers=self.auth.headers,json= data)
-                response.raise_for_status()
-                return response
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                else:
-                    self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-                await asyncio.sleep(2 ** attempt)
-
-        raise last_exception
+        return await self._send("POST", path, headers=self.auth.headers, json=data)
+
+    async def _transmit(self, context: RequestContext) -> httpx.Response:
+        response = await self._httpclient.request(context.method, context.url, **context.kwargs)
+        response.raise_for_status()
+        return response
+
+    def _pipeline(self) -> CallNext:
+        middlewares = tuple(self.middlewares)
+        if self._chain is None or self._chain[0] != middlewares:
+            self._chain = middlewares, build_chain(list(middlewares), self._transmit, sync=False)
+        return self._chain[1]
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the middlewares of the client: retry policy, circuit breaker and logging
+
+        :param method: HTTP method
+        :param path: API endpoint
+        :param kwargs: extra arguments for httpx.AsyncClient.request
+        :return: httpx.Response object
+        :raises LybicAPIError: When the agent service returns a structured error response
+        :raises LybicInternalError: When 5xx error occurs from reverse proxy
+        """
+        return await self._pipeline()(RequestContext(self, method, path, kwargs))
 
     async def _stream(self, path: str, data: dict | None = None):
         """
@@ -0,0 +1,329 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""lease.py keeps sandboxes alive while they are in use, extending each one just before it expires."""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional, TYPE_CHECKING, Union
+
+from lybic import dto
+from lybic.exceptions import LybicAPIError
+
+if TYPE_CHECKING:
+    from lybic.lybic import LybicClient
+
+# total life time limit of a sandbox, see Sandbox.extend_life
+MAX_TOTAL_LIFE_SECONDS = 13 * 24 * 3600
+# shortest life time accepted by Sandbox.extend_life
+MIN_EXTEND_SECONDS = 30
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 date of the API, None when absent or invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class Lease:
+    """The lease of one sandbox: when it expires and how often it was extended."""
+    __slots__ = ("sandbox_id", "expires_at", "created_at", "extensions", "final")
+
+    def __init__(self, sandbox_id: str, expires_at: float, created_at: float):
+        self.sandbox_id = sandbox_id
+        self.expires_at = expires_at
+        self.created_at = created_at
+        self.extensions = 0
+        # the 13-day limit is reached, the sandbox will not be extended again
+        self.final = False
+
+    @property
+    def remaining(self) -> float:
+        """Seconds until the sandbox expires"""
+        return self.expires_at - time.time()
+
+    def __repr__(self):
+        return f"<Lease {self.sandbox_id} remaining={self.remaining:.0f}s extensions={self.extensions}>"
+
+
+class LeaseManager:
+    """
+    LeaseManager extends the life of leased sandboxes just in time, from a heap of their expirations.
+
+        async with LeaseManager(client) as leases:
+            async with leases.lease(sandbox):
+                await run_long_task(sandbox.id)
+
+    A sandbox is extended by `extend_seconds` when less than `margin` seconds (minus a random `jitter`) are left.
+    Sandboxes due within `batch_window` seconds of each other are extended in the same wake-up, with at most
+    `max_concurrent` calls in flight. Extensions stop at the 13-day total life time limit. Released sandboxes are
+    deleted, or left to expire.
+    """
+
+    def __init__(self, client: "LybicClient", extend_seconds: int = 3600, margin: float = 300.0,
+                 jitter: float = 0.2, batch_window: float = 30.0, max_concurrent: int = 8,
+                 retry_delay: float = 10.0, max_total_life_seconds: int = MAX_TOTAL_LIFE_SECONDS):
+        """
+        Init lease manager, it starts when the first sandbox is leased
+
+        :param client:
+        :param extend_seconds: new life time of an extended sandbox, between 30 seconds and 1 day
+        :param margin: seconds before the expiration at which a sandbox is extended
+        :param jitter: fraction of the margin drawn at random and added to it, so that sandboxes created together
+            are not extended together
+        :param batch_window: sandboxes due within this many seconds are extended together
+        :param max_concurrent: extend_life calls in flight at once
+        :param retry_delay: seconds before retrying a failed extension
+        :param max_total_life_seconds: total life time limit of a sandbox, counted from its creation
+        """
+        if not MIN_EXTEND_SECONDS <= extend_seconds <= 86400:
+            raise ValueError("extend_seconds must be between 30 and 86400")
+        if margin >= extend_seconds:
+            raise ValueError("margin must be less than extend_seconds")
+        self.client = client
+        self.extend_seconds = extend_seconds
+        self.margin = margin
+        self.jitter = max(jitter, 0.0)
+        self.batch_window = max(batch_window, 0.0)
+        self.max_concurrent = max(max_concurrent, 1)
+        self.retry_delay = retry_delay
+        self.max_total_life_seconds = max_total_life_seconds
+        self.extended = 0
+        self.failed = 0
+        self.released = 0
+
+        self._leases: dict[str, Lease] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._scheduled: dict[str, int] = {}
+        self._counter = itertools.count()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _ensure_running(self):
+        if self._closed:
+            raise RuntimeError("The lease manager has been closed.")
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _schedule(self, lease: Lease, due: float):
+        # earlier entries of the sandbox stay in the heap and are skipped when popped
+        sequence = self._scheduled[lease.sandbox_id] = next(self._counter)
+        heapq.heappush(self._heap, (due, sequence, lease.sandbox_id))
+        if self._heap[0][2] == lease.sandbox_id and self._wake is not None:
+            self._wake.set()
+
+    def _due(self, lease: Lease) -> float:
+        return lease.expires_at - self.margin * (1 + random.uniform(0, self.jitter))
+
+    def acquire(self, sandbox: Union[dto.Sandbox, str], expires_at: Optional[float] = None,
+                created_at: Optional[float] = None) -> Lease:
+        """
+        Keep a sandbox alive until it is released
+
+        :param sandbox: the sandbox, or its id
+        :param expires_at: unix time at which the sandbox expires, defaults to `sandbox.expiresAt`.
+            When unknown, the sandbox is extended at once.
+        :param created_at: unix time at which the sandbox was created, defaults to `sandbox.createdAt` or now
+        :return: the lease, the same one if the sandbox is already leased
+        """
+        sandbox_id = sandbox if isinstance(sandbox, str) else sandbox.id
+        lease = self._leases.get(sandbox_id)
+        if lease is not None:
+            return lease
+        self._ensure_running()
+        now = time.time()
+        if not isinstance(sandbox, str):
+            expires_at = expires_at if expires_at is not None else _timestamp(sandbox.expiresAt)
+            created_at = created_at if created_at is not None else _timestamp(sandbox.createdAt)
+        lease = self._leases[sandbox_id] = Lease(sandbox_id, expires_at if expires_at is not None else now,
+                                                 created_at if created_at is not None else now)
+        self._schedule(lease, self._due(lease))
+        return lease
+
+    async def release(self, sandbox_id: str, delete: bool = True):
+        """
+        Stop extending a sandbox
+
+        :param sandbox_id:
+        :param delete: delete the sandbox, so that it is reclaimed at once instead of when it expires
+        """
+        if self._leases.pop(sandbox_id, None) is None:
+            return
+        self._scheduled.pop(sandbox_id, None)
+        self.released += 1
+        if delete:
+            try:
+                await self.client.sandbox.delete(sandbox_id)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.client.logger.warning("Lease manager failed to delete sandbox %s: %s", sandbox_id, e)
+
+    @contextlib.asynccontextmanager
+    async def lease(self, sandbox: Union[dto.Sandbox, str], delete: bool = True) -> AsyncIterator[Lease]:
+        """
+        Keep a sandbox alive for the time of the block
+
+        :param sandbox: the sandbox, or its id
+        :param delete: delete the sandbox at the end of the block
+        """
+        lease = self.acquire(sandbox)
+        try:
+            yield lease
+        finally:
+            await self.release(lease.sandbox_id, delete=delete)
+
+    def get(self, sandbox_id: str) -> Optional[Lease]:
+        """
+        Get the lease of a sandbox
+
+        :param sandbox_id:
+        :return: None if the sandbox is not leased
+        """
+        return self._leases.get(sandbox_id)
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+    def __contains__(self, sandbox_id: str) -> bool:
+        return sandbox_id in self._leases
+
+    def _pop_due(self, horizon: float) -> list[Lease]:
+        """Pop the leases due before `horizon`, skipping the entries of released or rescheduled leases"""
+        due = []
+        while self._heap and self._heap[0][0] <= horizon:
+            _, sequence, sandbox_id = heapq.heappop(self._heap)
+            if self._scheduled.get(sandbox_id) == sequence:
+                del self._scheduled[sandbox_id]
+                due.append(self._leases[sandbox_id])
+        return due
+
+    async def _extend(self, lease: Lease):
+        now = time.time()
+        seconds = min(self.extend_seconds, int(lease.created_at + self.max_total_life_seconds - now))
+        if seconds < MIN_EXTEND_SECONDS:
+            lease.final = True
+            self.client.logger.warning("Sandbox %s reached its total life time limit and will expire",
+                                       lease.sandbox_id)
+            return
+        try:
+            async with self._semaphore:
+                await self.client.sandbox.extend_life(lease.sandbox_id, seconds)
+        except LybicAPIError as e:
+            if e.status_code == 404 and self._leases.get(lease.sandbox_id) is lease:
+                self.client.logger.warning("Leased sandbox %s is gone", lease.sandbox_id)
+                self._leases.pop(lease.sandbox_id, None)
+                self._scheduled.pop(lease.sandbox_id, None)
+            else:
+                self._retry(lease, e)
+            return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._retry(lease, e)
+            return
+        if self._leases.get(lease.sandbox_id) is not lease:
+            return
+        self.extended += 1
+        lease.extensions += 1
+        lease.expires_at = now + seconds
+        if seconds < self.extend_seconds:
+            # the next extension would go past the total life time limit
+            lease.final = True
+            return
+        self._schedule(lease, self._due(lease))
+
+    def _retry(self, lease: Lease, error: Exception):
+        if self._leases.get(lease.sandbox_id) is not lease:
+            return
+        self.failed += 1
+        self.client.logger.warning("Failed to extend sandbox %s: %s", lease.sandbox_id, error)
+        # retry after retry_delay, or right before the sandbox expires if that comes first
+        now = time.time()
+        due = now + self.retry_delay
+        if now < lease.expires_at - 1:
+            due = min(due, lease.expires_at - 1)
+        self._schedule(lease, due)
+
+    async def _run(self):
+        while not self._closed:
+            self._wake.clear()
+            now = time.time()
+            if not self._heap or self._heap[0][0] > now:
+                timeout = self._heap[0][0] - now if self._heap else None
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                continue
+            due = self._pop_due(now + self.batch_window)
+            await asyncio.gather(*[self._extend(lease) for lease in due])
+
+    def stats(self) -> dict:
+        """
+        Get the lease metrics
+
+        :return: {"leased", "extended", "failed", "released", "final", "next_extension_seconds"}
+        """
+        pending = [due for due, sequence, sandbox_id in self._heap if self._scheduled.get(sandbox_id) == sequence]
+        return {
+            "leased": len(self._leases),
+            "extended": self.extended,
+            "failed": self.failed,
+            "released": self.released,
+            "final": sum(lease.final for lease in self._leases.values()),
+            "next_extension_seconds": max(min(pending) - time.time(), 0.0) if pending else None,
+        }
+
+    async def close(self, delete: bool = False):
+        """
+        Stop extending the leased sandboxes
+
+        :param delete: delete the leased sandboxes, instead of leaving them to expire
+        """
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        sandbox_ids = list(self._leases)
+        if delete:
+            await asyncio.gather(*[self.release(sandbox_id) for sandbox_id in sandbox_ids])
+        self._leases.clear()
+        self._scheduled.clear()
+        self._heap.clear()
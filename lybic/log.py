@@ -0,0 +1,124 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""log.py holds the lazy log arguments and the structured HTTP log of the SDK.
+
+Log arguments are rendered by the logging module only when a record is actually emitted, so debug
+logging costs nothing on the request hot path while the level is disabled.
+"""
+import logging
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel
+
+# Maximum number of characters of a body rendered in a log record, None for no limit
+MAX_LOGGED_BODY: Optional[int] = 2048
+
+http_logger = logging.getLogger("lybic.http")
+
+
+def _truncate(text: str, limit: Optional[int]) -> str:
+    if limit is None or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+class LazyBody:
+    """The body of a response, decoded when the log record is formatted."""
+    __slots__ = ("response", "limit")
+
+    def __init__(self, response: httpx.Response, limit: Optional[int] = None):
+        self.response = response
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return _truncate(self.response.text, self.limit if self.limit is not None else MAX_LOGGED_BODY)
+
+
+class LazyModel:
+    """A DTO, serialized to JSON when the log record is formatted."""
+    __slots__ = ("model", "limit")
+
+    def __init__(self, model: BaseModel, limit: Optional[int] = None):
+        self.model = model
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.model.model_dump_json(exclude_none=True)
+        return _truncate(text, self.limit if self.limit is not None else MAX_LOGGED_BODY)
+
+
+def log_body(response: httpx.Response, limit: Optional[int] = None) -> LazyBody:
+    """
+    Log argument for the body of a response
+
+    :param response:
+    :param limit: maximum number of characters, defaults to MAX_LOGGED_BODY
+    :return:
+    """
+    return LazyBody(response, limit)
+
+
+def log_model(model: BaseModel, limit: Optional[int] = None) -> LazyModel:
+    """
+    Log argument for a DTO
+
+    :param model:
+    :param limit: maximum number of characters, defaults to MAX_LOGGED_BODY
+    :return:
+    """
+    return LazyModel(model, limit)
+
+
+def log_exchange(method: str, url: str, elapsed: float,
+                 response: Optional[httpx.Response] = None, error: Optional[BaseException] = None):
+    """
+    Emit one structured DEBUG record for an HTTP attempt on the `lybic.http` logger
+
+    Callers check `http_logger.isEnabledFor(logging.DEBUG)` first. The fields are attached to the record
+    as `record.lybic`, for JSON log formatters.
+
+    :param method:
+    :param url:
+    :param elapsed: seconds spent on the attempt
+    :param response: the response, if any
+    :param error: the error, if the attempt failed without a response
+    """
+    fields = {
+        "method": method,
+        "url": url,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "status": response.status_code if response is not None else None,
+        "error": type(error).__name__ if error is not None else None,
+    }
+    if response is not None:
+        fields["response_bytes"] = len(response.content)
+        fields["response_body"] = str(LazyBody(response))
+    http_logger.debug(
+        "%s %s -> %s in %.1fms", method, url, fields["status"] or fields["error"], fields["elapsed_ms"],
+        extra={"lybic": fields},
+    )
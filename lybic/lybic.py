@@ -26,7 +26,6 @@
 
 """lybic.py is the main entry point for Lybic API."""
 import asyncio
-import json
 from typing import Optional
 import httpx
 
@@ -37,17 +36,42 @@ from .sandbox import Sandbox
 from .stream_shell import StreamShell
 from .authentication import LybicAuth
 from .base import _LybicBaseClient
-from .exceptions import LybicAPIError, LybicInternalError
+from .exceptions import LybicDeadlineExceededError
+from .fork import register_after_fork
 from .tools import Tools
+from .cache import ResponseCache, RevalidationCache
+from .circuit_breaker import CircuitBreaker
+from .compression import Compression
+from .concurrency import AdaptiveConcurrencyLimiter
+from .deadline import Deadline, TimeoutTypes
+from .failover import EndpointSelector
+from .sandbox_registry import SandboxRegistry
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .middleware import CallNext, Middleware, RequestContext, build_chain
+from .transport import TransportConfig, AsyncPooledTransport
+from .warmup import warmup_reports, warmup_request_async, warmup_targets
 
 
 class LybicClient(_LybicBaseClient):
     """LybicAsyncClient is a client for all Lybic API."""
 
-    def __init__(self,
+    def __init__(self,  # pylint: disable=too-many-locals
                  auth: Optional[LybicAuth] = None,
-                 timeout: int = 10,
+                 timeout: TimeoutTypes = 10,
                  max_retries: int = 3,
+                 transport: Optional[TransportConfig] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 singleflight: bool = False,
+                 cache: Optional[ResponseCache] = None,
+                 revalidation: Optional[RevalidationCache] = None,
+                 compression: Optional[Compression] = None,
+                 middlewares: Optional[list[Middleware]] = None,
+                 failover: Optional[EndpointSelector] = None,
+                 sandbox_registry: Optional[SandboxRegistry] = None,
                  ):
         """
         Init lybic client with org_id, api_key and endpoint
@@ -56,14 +80,38 @@ class LybicClient(_LybicBaseClient):
         :param org_id:
         :param api_key:
         :param endpoint:
+        :param timeout: seconds, or httpx.Timeout with separate connect/read/write/pool timeouts
         :param max_retries: maximum number of retries for failed requests
+        :param transport: connection pool limits, keep-alive, HTTP/2 and custom transport settings
+        :param retry_policy: retry policy (jitter, Retry-After, retryable statuses, retry budget), overrides max_retries
+        :param circuit_breaker: fail fast while an endpoint and route keeps failing, disabled if None
+        :param rate_limiter: token-bucket limiter per org and route class, shared by all workers of an org
+        :param concurrency_limiter: AIMD limiter of in-flight requests, adapting to latency and overload errors
+        :param singleflight: coalesce identical concurrent GET requests into one HTTP request
+        :param cache: TTL response cache of slow-changing routes (shapes, machine images, MCP servers, projects)
+        :param revalidation: send If-None-Match / If-Modified-Since for polled routes and reuse the DTO on 304
+        :param compression: negotiate gzip/brotli/zstd responses, gzip large request bodies and count the bytes saved
+        :param middlewares: custom middlewares run on every attempt (timing, tracing, headers, fault injection)
+        :param failover: send each attempt to the fastest healthy of several equivalent API endpoints, failing over
+            between them, disabled if None
+        :param sandbox_registry: keep sandbox metadata (shape, connection details) by id, so that OS checks and
+            connection details are not fetched on every call, disabled if None
         """
         super().__init__(
-            auth=auth, timeout=timeout, max_retries=max_retries
+            auth=auth, timeout=timeout, max_retries=max_retries, transport=transport,
+            retry_policy=retry_policy, circuit_breaker=circuit_breaker, rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter, cache=cache, revalidation=revalidation,
+            compression=compression, singleflight=singleflight, middlewares=middlewares, failover=failover,
+            sandbox_registry=sandbox_registry,
         )
 
         self.client: httpx.AsyncClient | None = None
+        self.transport = AsyncPooledTransport(
+            self.transport_config, self.endpoint, self.auth.agent_service_endpoint,
+            failover.endpoints if failover is not None else None)
         self._in_context = False
+        self._chain = None
+        register_after_fork(self)
 
         self.sandbox = Sandbox(self)
         self.project = Project(self)
@@ -74,10 +122,25 @@ class LybicClient(_LybicBaseClient):
 
     def _ensure_client_is_open(self):
         if self.client is None:
-            self.client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout)
+            self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
         elif self.client.is_closed:
             raise RuntimeError("The client has been closed and cannot be reused. Please create a new client instance.")
 
+    def _after_fork(self):
+        # the httpx client of the parent is dropped, not closed: its connections are still in use there
+        self.client = None
+
+    def make_http_client(self, **kwargs) -> httpx.AsyncClient:
+        """
+        Create an httpx.AsyncClient that shares the connection pools of this client.
+        Closing the returned client does not close the shared pools.
+
+        :param kwargs: extra arguments for httpx.AsyncClient
+        :return:
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return httpx.AsyncClient(transport=self.transport.shared(), **kwargs)
+
     async def __aenter__(self):
         if self._in_context:
             raise RuntimeError("Cannot re-enter context.")
@@ -99,82 +162,107 @@ class LybicClient(_LybicBaseClient):
         if self.client:
             await self.client.aclose()
 
+    async def warmup(self, connections: int = 4, urls: Optional[list[str]] = None) -> list[dict]:
+        """
+        Open keep-alive connections ahead of the first call, e.g. before an autoscaled worker gets traffic
+
+        `connections` concurrent HEAD requests, without credentials, are sent to the API endpoint, the agent
+        service endpoint and each of `urls` (e.g. the screenshot host), so the DNS, TCP and TLS setup is paid
+        here. Connections are capped by the keep-alive limit of each pool; HTTP/2 pools open one.
+
+        :param connections: connections to open per host
+        :param urls: other hosts to warm up, only their origin is used
+        :return: one report per host: {"url", "connections", "failed", "seconds", "error"}
+        """
+        self._ensure_client_is_open()
+        targets = warmup_targets(self.transport, [self.endpoint, self.auth.agent_service_endpoint, *(urls or ())],
+                                 connections)
+        outcomes = await asyncio.gather(*[
+            warmup_request_async(self.client, origin, self.timeout) for origin, count in targets for _ in range(count)
+        ])
+        return warmup_reports(targets, outcomes)
+
+    async def probe_endpoints(self) -> list[dict]:
+        """
+        Measure the latency of every failover endpoint with one HEAD request each, without credentials
+
+        Traffic keeps the measures up to date; probing ranks the endpoints before the first calls, or again
+        after a network change.
+
+        :return: the state of every endpoint, best first, see EndpointSelector.snapshot
+        """
+        if self.failover is None:
+            raise RuntimeError("No failover endpoints are configured.")
+        self._ensure_client_is_open()
+        endpoints = self.failover.endpoints
+        outcomes = await asyncio.gather(*[
+            warmup_request_async(self.client, endpoint, self.timeout) for endpoint in endpoints
+        ])
+        for endpoint, (seconds, error) in zip(endpoints, outcomes):
+            self.failover.record(endpoint, seconds, error)
+        return self.failover.snapshot()
+
+    async def download(self, url: str) -> httpx.Response:
+        """
+        Download an absolute url, such as a screenshot, through the shared connection pools.
+        Lybic credentials are not sent.
+
+        :param url:
+        :return:
+        :raises httpx.HTTPStatusError: When the download fails
+        """
+        self._ensure_client_is_open()
+        response = await self.client.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    async def _send(self, context: RequestContext) -> httpx.Response:
+        """The terminal step of the middleware chain: send one HTTP request"""
+        kwargs = context.kwargs
+        deadline = context.deadline
+        if deadline is not None and "timeout" not in kwargs:
+            kwargs = dict(kwargs, timeout=deadline.timeout(self.timeout))
+        try:
+            response = await self.client.request(context.method, context.url, **kwargs)
+        except httpx.TimeoutException as e:
+            # timeouts are clamped to the deadline, allow for timer granularity
+            if deadline is None or deadline.remaining() > 0.01:
+                raise
+            raise LybicDeadlineExceededError(deadline.seconds) from e
+        if response.status_code != 304:
+            response.raise_for_status()
+        response.extensions["lybic_context"] = context
+        return response
+
+    def _pipeline(self) -> CallNext:
+        middlewares = tuple(self.middlewares)
+        if self._chain is None or self._chain[0] != middlewares:
+            self._chain = middlewares, build_chain(list(middlewares), self._send, sync=False)
+        return self._chain[1]
+
     async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
         """
         Make a request to Lybic Restful API
 
+        The call runs through `self.middlewares`: with a cache, GET requests of cached routes are served
+        from the cache while fresh, and mutations invalidate the routes they make stale. With revalidation,
+        GET requests of polled routes are sent as conditional requests and a 304 Not Modified returns the
+        previous response. With singleflight enabled,
+        identical concurrent GET requests (same path and params) share one HTTP request and its response.
+
         :param method:
         :param path:
-        :param kwargs:
+        :param kwargs: extra arguments for httpx, plus `deadline`: seconds for the whole call, retries included
         :return:
         :raises LybicAPIError: When API returns structured error response
         :raises LybicInternalError: When 5xx error occurs from reverse proxy
         :raises httpx.RequestError: When network-level error occurs
+        :raises LybicDeadlineExceededError: When the call does not complete before its deadline
         """
-        self._ensure_client_is_open()
+        deadline = kwargs.pop("deadline", None)
+        if deadline is not None:
+            async with Deadline(deadline):
+                return await self.request(method, path, **kwargs)
 
-        url = f"{self.endpoint}{path}"
-        headers = self.headers.copy()
-        if method.upper() != "POST":
-            headers.pop("Content-Type", None)
-
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self.client.request(method, url, headers=headers, **kwargs)
-                response.raise_for_status()
-                return response
-            except httpx.HTTPStatusError as e:
-                # Check if this is the last attempt
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                    last_exception = e
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-
-                # Last attempt, convert to custom exception
-                self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-
-                # Check if it's a 5xx error from reverse proxy
-                if e.response.status_code >= 500:
-                    # Try to parse JSON response
-                    try:
-                        error_data = e.response.json()
-                        if isinstance(error_data, dict) and "message" in error_data:
-                            # Structured API error response
-                            raise LybicAPIError(
-                                message=error_data.get("message", "Unknown error"),
-                                code=error_data.get("code"),
-                                status_code=e.response.status_code,
-                            ) from e
-                    except (json.JSONDecodeError, ValueError):
-                        # Not a JSON response, likely HTML from reverse proxy
-                        pass
-
-                    # If we got here, it's a reverse proxy error
-                    raise LybicInternalError(status_code=e.response.status_code) from e
-
-                # For 4xx errors, try to parse structured error response
-                try:
-                    error_data = e.response.json()
-                    if isinstance(error_data, dict) and "message" in error_data:
-                        raise LybicAPIError(
-                            message=error_data.get("message", "Unknown error"),
-                            code=error_data.get("code"),
-                            status_code=e.response.status_code,
-                        ) from e
-                except (json.JSONDecodeError, ValueError):
-                    # Not a JSON response, re-raise original exception
-                    pass
-
-                # If we couldn't parse it as a structured error, re-raise original
-                raise
-            except httpx.RequestError as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                else:
-                    self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-                await asyncio.sleep(2 ** attempt)
-
-        raise last_exception
+        self._ensure_client_is_open()
+        return await self._pipeline()(self._context(method, path, kwargs))
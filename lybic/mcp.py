@@ -31,6 +31,8 @@ from typing import overload, TYPE_CHECKING
 import httpx
 
 from lybic import dto
+from lybic.log import log_body, log_model
+from lybic.deadline import timeout_seconds
 
 if TYPE_CHECKING:
     from lybic.lybic import LybicClient
@@ -67,8 +69,8 @@ class Mcp:
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/mcp-servers")
-        self.client.logger.debug(f"List MCP servers response: {response.text}")
-        return dto.ListMcpServerResponse.model_validate_json(response.text)
+        self.client.logger.debug("List MCP servers response: %s", log_body(response))
+        return self.client.parse(response, dto.ListMcpServerResponse)
 
     @overload
     async def create(self, data: dto.CreateMcpServerDto) -> dto.McpServerResponseDto: ...
@@ -89,13 +91,13 @@ class Mcp:
             data = kwargs["data"]
         else:
             data = dto.CreateMcpServerDto(**kwargs)
-        self.client.logger.debug(f"Create MCP server request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Create MCP server request: %s", log_model(data))
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/mcp-servers",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create MCP server response: {response.text}")
-        return dto.McpServerResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create MCP server response: %s", log_body(response))
+        return self.client.parse(response, dto.McpServerResponseDto)
 
     async def get_default(self) -> dto.McpServerResponseDto:
         """
@@ -107,8 +109,8 @@ class Mcp:
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/mcp-servers/default")
-        self.client.logger.debug(f"Get default MCP server response: {response.text}")
-        return dto.McpServerResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get default MCP server response: %s", log_body(response))
+        return self.client.parse(response, dto.McpServerResponseDto)
 
     async def delete(self, mcp_server_id: str) -> None:
         """
@@ -117,7 +119,7 @@ class Mcp:
         :param mcp_server_id:
         :return:
         """
-        self.client.logger.debug(f"Delete MCP server request: {mcp_server_id}")
+        self.client.logger.debug("Delete MCP server request: %s", mcp_server_id)
         await self.client.request("DELETE", f"/api/orgs/{self.client.org_id}/mcp-servers/{mcp_server_id}")
 
     async def set_sandbox(self, mcp_server_id: str, sandbox_id: str) -> None:
@@ -129,11 +131,16 @@ class Mcp:
         :return: None
         """
         data = dto.SetMcpServerToSandboxResponseDto(sandboxId=sandbox_id)
-        self.client.logger.debug(f"Set MCP server to sandbox request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Set MCP server to sandbox request: %s", log_model(data))
         await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/mcp-servers/{mcp_server_id}/sandbox",
-            json=data.model_dump(exclude_none=True))
+            json=data)
+
+    def _http_client_factory(self, headers: dict = None, timeout: httpx.Timeout = None,
+                             auth: httpx.Auth = None) -> httpx.AsyncClient:
+        """Build the MCP http client on top of the connection pools of the lybic client"""
+        return self.client.make_http_client(headers=headers, timeout=timeout, auth=auth, follow_redirects=True)
 
     async def call_tool_async(self,
                               mcp_server_id: str,
@@ -149,14 +156,17 @@ class Mcp:
         """
         if not MCP_INSTALLED:
             raise ImportError("mcp is not installed. Please install it with `pip install 'lybic[mcp]'`")
-        self.client.logger.debug(f"Call tool request: {tool_name} with arguments: {tool_args}")
+        self.client.logger.debug("Call tool request: %s with arguments: %s", tool_name, tool_args)
 
-        last_exception = None
-        for attempt in range(self.client.max_retries + 1):
+        retry_policy = self.client.retry_policy
+        retry_policy.record_request()
+        attempt, delay = 0, None
+        while True:
             try:
                 async with streamablehttp_client(self.client.make_mcp_endpoint(mcp_server_id),
                                                  headers=self.client.headers,
-                                                 timeout=self.client.timeout
+                                                 timeout=timeout_seconds(self.client.timeout),
+                                                 httpx_client_factory=self._http_client_factory,
                 ) as (
                         read_stream,
                         write_stream,
@@ -165,15 +175,15 @@ class Mcp:
                     async with ClientSession(read_stream, write_stream) as session:
                         await session.initialize()
                         result = await session.call_tool(tool_name, tool_args)
-                        self.client.logger.debug(f"Call tool response: {result.model_dump_json()}")
+                        self.client.logger.debug("Call tool response: %s", log_model(result))
                         return result
 
             except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                last_exception = e
-                if attempt < self.client.max_retries:
-                    self.client.logger.debug(f"Call tool failed (attempt {attempt + 1}/{self.client.max_retries + 1}): {str(e)}")
-                    await asyncio.sleep(2 ** attempt)
-                else:
-                    self.client.logger.error(f"Call tool failed after {self.client.max_retries + 1} attempts")
-
-        raise RuntimeError(f"Failed to call tool: {last_exception}") from last_exception
+                # Tool calls have side effects, so they are retried like a POST request
+                delay = retry_policy.next_delay("POST", attempt, e, delay)
+                if delay is None:
+                    self.client.logger.error("Call tool failed after %s attempts", attempt + 1)
+                    raise RuntimeError(f"Failed to call tool: {e}") from e
+                self.client.logger.debug("Call tool failed (attempt %s/%s): %s", attempt + 1, retry_policy.max_retries + 1, e)
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,641 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""middleware.py holds the request pipeline of LybicClient and LybicSyncClient.
+
+Every call of `client.request` runs through an ordered chain of middlewares before reaching the HTTP transport.
+Middlewares placed before the RetryMiddleware see each call once, the ones after it see every attempt.
+"""
+import asyncio
+import functools
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, TYPE_CHECKING, Union
+
+import httpx
+
+from lybic.cache import ResponseCache, RevalidationCache
+from lybic.circuit_breaker import CircuitBreaker
+from lybic.compression import Compression
+from lybic.concurrency import AdaptiveConcurrencyLimiter
+from lybic.deadline import Deadline
+from lybic.exceptions import (
+    LybicAPIError, LybicInternalError, LybicDeadlineExceededError, LybicCircuitOpenError,
+)
+from lybic.failover import EndpointSelector
+from lybic.log import http_logger, log_exchange
+from lybic.rate_limit import RateLimiter
+from lybic.retry import RetryPolicy
+from lybic.routes import Route, match_route, route_class
+from lybic.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from lybic.base import _LybicBaseClient
+    from lybic_sync.base import _LybicSyncBaseClient
+
+CallNext = Callable[["RequestContext"], Union[httpx.Response, Awaitable[httpx.Response]]]
+
+
+class RequestContext:
+    """A call of `client.request`, as seen by the middlewares."""
+    __slots__ = ("client", "method", "path", "endpoint", "url", "route", "kwargs", "key", "deadline", "attempt",
+                 "state")
+
+    def __init__(self, client: Union["_LybicBaseClient", "_LybicSyncBaseClient"], method: str, path: str,
+                 kwargs: dict, key: Optional[tuple] = None):
+        """
+        :param client: the client making the call
+        :param method: HTTP method
+        :param path: request path, without host
+        :param kwargs: arguments for httpx, the prepared `headers` and encoded `content` included
+        :param key: key of the call for caching and coalescing, None when the call cannot be shared
+        """
+        self.client = client
+        self.method = method.upper()
+        self.path = path
+        self.endpoint = client.endpoint  # base url of the attempt, changed by failover
+        self.url = f"{client.endpoint}{path}"
+        self.route: Route = match_route(path)
+        self.kwargs = kwargs
+        self.key = key
+        self.deadline = Deadline.current()
+        self.attempt = 0
+        self.state: dict[str, Any] = {}  # free for middlewares to share data between their hooks
+
+    @property
+    def template(self) -> str:
+        """Route template of the call, e.g. `/api/orgs/{org_id}/sandboxes/{sandbox_id}`"""
+        return self.route.template
+
+    @property
+    def sandbox_id(self) -> Optional[str]:
+        """Sandbox id of the call, if any"""
+        return self.route.sandbox_id
+
+
+class Middleware:
+    """
+    A step of the request pipeline
+
+    Simple steps override the `before`, `after` and `on_error` hooks, which then run in both LybicClient and
+    LybicSyncClient. Steps that need to wrap the rest of the chain, e.g. to retry it or skip it, override
+    `handle` and `handle_sync`.
+    """
+
+    def before(self, context: RequestContext):
+        """
+        Called before the rest of the chain, e.g. to add headers to `context.kwargs["headers"]`
+
+        :param context:
+        """
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        """
+        Called with the response of the rest of the chain
+
+        :param context:
+        :param response:
+        """
+
+    def on_error(self, context: RequestContext, error: Exception):
+        """
+        Called when the rest of the chain raises, the error is raised again afterwards
+
+        :param context:
+        :param error:
+        """
+
+    def on_parsed(self, context: RequestContext, model: Any):
+        """
+        Called when a response is parsed into a DTO by the SDK
+
+        `context` is the call that fetched the response, which differs from the current call for cached and
+        coalesced responses.
+
+        :param context:
+        :param model: the parsed DTO
+        """
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        """
+        Run this step in LybicClient
+
+        :param context:
+        :param call_next: the rest of the chain
+        :return:
+        """
+        self.before(context)
+        try:
+            response = await call_next(context)
+        except Exception as e:
+            self.on_error(context, e)
+            raise
+        self.after(context, response)
+        return response
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        """
+        Run this step in LybicSyncClient
+
+        :param context:
+        :param call_next: the rest of the chain
+        :return:
+        """
+        self.before(context)
+        try:
+            response = call_next(context)
+        except Exception as e:
+            self.on_error(context, e)
+            raise
+        self.after(context, response)
+        return response
+
+
+def build_chain(middlewares: list, terminal: CallNext, sync: bool = False) -> CallNext:
+    """
+    Chain middlewares in front of a terminal step
+
+    :param middlewares: middlewares, outermost first
+    :param terminal: the step sending the HTTP request
+    :param sync: chain `handle_sync` instead of `handle`
+    :return: a callable taking a RequestContext
+    """
+    call_next = terminal
+    for middleware in reversed(middlewares):
+        call_next = functools.partial(middleware.handle_sync if sync else middleware.handle, call_next=call_next)
+    return call_next
+
+
+def _api_error(error: httpx.HTTPStatusError) -> Optional[Exception]:
+    """Convert the error of the last attempt to LybicAPIError or LybicInternalError, None to raise it as is"""
+    try:
+        error_data = error.response.json()
+        if isinstance(error_data, dict) and "message" in error_data:
+            # Structured API error response
+            return LybicAPIError(
+                message=error_data.get("message", "Unknown error"),
+                code=error_data.get("code"),
+                status_code=error.response.status_code,
+            )
+    except (json.JSONDecodeError, ValueError):
+        # Not a JSON response, e.g. an HTML error page from a reverse proxy
+        pass
+    if error.response.status_code >= 500:
+        return LybicInternalError(status_code=error.response.status_code)
+    return None
+
+
+class RetryMiddleware(Middleware):
+    """Retries failed attempts according to a RetryPolicy, within the deadline of the call."""
+
+    def __init__(self, policy: RetryPolicy):
+        """
+        :param policy:
+        """
+        self.policy = policy
+
+    def _next_delay(self, context: RequestContext, error: Exception, previous: Optional[float]) -> Optional[float]:
+        delay = self.policy.next_delay(context.method, context.attempt, error, previous)
+        if delay is not None and context.deadline is not None and not context.deadline.fits(delay):
+            delay = None
+        if delay is None:
+            context.client.logger.error("Request failed after %d attempts", context.attempt + 1)
+            if isinstance(error, httpx.HTTPStatusError):
+                converted = _api_error(error)
+                if converted is not None:
+                    raise converted from error
+            return None
+        context.client.logger.debug(
+            "Request failed (attempt %s/%s): %s", context.attempt + 1, self.policy.max_retries + 1, error)
+        context.attempt += 1
+        return delay
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        self.policy.record_request()
+        delay = None
+        while True:
+            if context.deadline is not None:
+                context.deadline.check()
+            try:
+                return await call_next(context)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                delay = self._next_delay(context, e, delay)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        self.policy.record_request()
+        delay = None
+        while True:
+            if context.deadline is not None:
+                context.deadline.check()
+            try:
+                return call_next(context)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                delay = self._next_delay(context, e, delay)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+
+class CacheMiddleware(Middleware):
+    """Serves GET requests of cached routes from a ResponseCache, and invalidates it on mutations."""
+
+    def __init__(self, cache: ResponseCache):
+        """
+        :param cache:
+        """
+        self.cache = cache
+
+    def _lookup(self, context: RequestContext) -> Optional[httpx.Response]:
+        if context.key is None or not self.cache.is_cacheable(context.method, context.template):
+            return None
+        return self.cache.get(context.key)
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        org_id = context.route.params.get("org_id")
+        if context.method != "GET":
+            self.cache.invalidate(context.template, org_id)
+        elif context.key is not None:
+            self.cache.put(context.key, context.template, org_id, response)
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        response = self._lookup(context)
+        if response is None:
+            response = await call_next(context)
+            self.after(context, response)
+        return response
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        response = self._lookup(context)
+        if response is None:
+            response = call_next(context)
+            self.after(context, response)
+        return response
+
+
+class SingleFlightMiddleware(Middleware):
+    """Coalesces identical concurrent GET requests of LybicClient into one call."""
+
+    def __init__(self, flight: Optional[SingleFlight] = None):
+        """
+        :param flight:
+        """
+        self.flight = flight or SingleFlight()
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        if context.key is None:
+            return await call_next(context)
+        flight = self.flight.do(context.key, lambda: call_next(context))
+        if context.deadline is None:
+            return await flight
+        # the call runs within the deadline of the caller that started it; each caller waits within its own
+        try:
+            return await asyncio.wait_for(flight, max(context.deadline.remaining(), 0.0))
+        except asyncio.TimeoutError as e:
+            raise LybicDeadlineExceededError(context.deadline.seconds) from e
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        return call_next(context)
+
+
+class RevalidationMiddleware(Middleware):
+    """Sends GET requests of polled routes as conditional requests, a 304 returns the previous response."""
+
+    def __init__(self, revalidation: RevalidationCache):
+        """
+        :param revalidation:
+        """
+        self.revalidation = revalidation
+
+    def before(self, context: RequestContext):
+        previous = None
+        if context.key is not None:
+            previous = self.revalidation.get(context.key, context.template)
+        if previous is not None:
+            context.kwargs["headers"].update(self.revalidation.conditional_headers(previous))
+        context.state["revalidation_previous"] = previous
+
+    def _resolve(self, context: RequestContext, response: httpx.Response) -> httpx.Response:
+        if context.key is None:
+            return response
+        previous = context.state.pop("revalidation_previous", None)
+        return self.revalidation.resolve(context.key, context.template, response, previous)
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        self.before(context)
+        return self._resolve(context, await call_next(context))
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        self.before(context)
+        return self._resolve(context, call_next(context))
+
+
+class CompressionMiddleware(Middleware):
+    """Negotiates response encodings, compresses large request bodies and counts the bytes of both."""
+
+    def __init__(self, compression: Compression):
+        """
+        :param compression:
+        """
+        self.compression = compression
+
+    def before(self, context: RequestContext):
+        headers = context.kwargs["headers"]
+        headers["Accept-Encoding"] = self.compression.accept_encoding
+        content = context.kwargs.get("content")
+        if isinstance(content, bytes):
+            compressed = self.compression.compress(content)
+            if compressed is not None:
+                context.kwargs["content"] = compressed
+                headers["Content-Encoding"] = "gzip"
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        self.compression.observe(response)
+
+
+class FailoverMiddleware(Middleware):
+    """
+    Sends each attempt to the fastest healthy endpoint of an EndpointSelector.
+
+    When an endpoint fails in a way the retry policy deems safe to retry (e.g. it refused the connection, or a GET
+    got a 503), the attempt moves on to the next endpoint at once, without a backoff sleep.
+    """
+
+    def __init__(self, selector: EndpointSelector):
+        """
+        :param selector:
+        """
+        self.selector = selector
+
+    def _route(self, context: RequestContext, tried: list):
+        if tried and context.deadline is not None:
+            context.deadline.check()
+        # never None: the endpoints are not all tried yet
+        endpoint = self.selector.choose(tuple(tried))
+        context.endpoint = endpoint
+        context.url = f"{endpoint}{context.path}"
+        tried.append(endpoint)
+
+    def _fails_over(self, context: RequestContext, error: Exception, elapsed: float) -> bool:
+        self.selector.record(context.endpoint, elapsed, error)
+        if not CircuitBreaker.is_failure(error) or not context.client.retry_policy.is_retryable(context.method, error):
+            return False
+        context.client.logger.warning("Endpoint %s failed, failing over: %s", context.endpoint, error)
+        return True
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        tried = []
+        while True:
+            self._route(context, tried)
+            started = time.monotonic()
+            try:
+                response = await call_next(context)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                if not self._fails_over(context, e, time.monotonic() - started) or \
+                        len(tried) == len(self.selector.endpoints):
+                    raise
+                continue
+            except LybicCircuitOpenError:
+                # the circuit of this endpoint is open, another endpoint may take the call
+                if len(tried) == len(self.selector.endpoints):
+                    raise
+                continue
+            self.selector.record(context.endpoint, time.monotonic() - started)
+            return response
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        tried = []
+        while True:
+            self._route(context, tried)
+            started = time.monotonic()
+            try:
+                response = call_next(context)
+            except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                if not self._fails_over(context, e, time.monotonic() - started) or \
+                        len(tried) == len(self.selector.endpoints):
+                    raise
+                continue
+            except LybicCircuitOpenError:
+                # the circuit of this endpoint is open, another endpoint may take the call
+                if len(tried) == len(self.selector.endpoints):
+                    raise
+                continue
+            self.selector.record(context.endpoint, time.monotonic() - started)
+            return response
+
+
+class CircuitBreakerMiddleware(Middleware):
+    """Fails fast while the endpoint and route of an attempt keep failing."""
+
+    def __init__(self, breaker: CircuitBreaker):
+        """
+        :param breaker:
+        """
+        self.breaker = breaker
+
+    def before(self, context: RequestContext):
+        self.breaker.before_call(context.endpoint, context.template)
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        self.breaker.record(context.endpoint, context.template)
+
+    def on_error(self, context: RequestContext, error: Exception):
+        if isinstance(error, (httpx.HTTPStatusError, httpx.RequestError)):
+            self.breaker.record(context.endpoint, context.template, error)
+
+
+class RateLimitMiddleware(Middleware):
+    """Waits for a token of the org and route class before each attempt."""
+
+    def __init__(self, limiter: RateLimiter):
+        """
+        :param limiter:
+        """
+        self.limiter = limiter
+
+    def _reserve(self, context: RequestContext) -> float:
+        # a call that cannot get its token before the deadline leaves the token to the others
+        max_wait = context.deadline.remaining() if context.deadline is not None else None
+        wait = self.limiter.reserve(context.client.org_id, route_class(context.template), max_wait)
+        if wait is None:
+            raise LybicDeadlineExceededError(context.deadline.seconds)
+        return wait
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        self.limiter.on_success(context.client.org_id, route_class(context.template))
+
+    def on_error(self, context: RequestContext, error: Exception):
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            self.limiter.on_throttled(
+                context.client.org_id, route_class(context.template), RetryPolicy.retry_after(error.response))
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        wait = self._reserve(context)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return await super().handle(context, call_next)
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        wait = self._reserve(context)
+        if wait > 0:
+            time.sleep(wait)
+        return super().handle_sync(context, call_next)
+
+
+class ConcurrencyLimitMiddleware(Middleware):
+    """Holds a slot of an AdaptiveConcurrencyLimiter during each attempt."""
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter):
+        """
+        :param limiter:
+        """
+        self.limiter = limiter
+
+    @staticmethod
+    def _timeout(context: RequestContext) -> Optional[float]:
+        return context.deadline.remaining() if context.deadline is not None else None
+
+    @staticmethod
+    def _is_dropped(response: httpx.Response) -> bool:
+        return response.status_code >= 500 or response.status_code == 429
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        try:
+            await self.limiter.acquire_async(self._timeout(context))
+        except asyncio.TimeoutError as e:
+            raise LybicDeadlineExceededError(context.deadline.seconds) from e
+        rtt, dropped = None, False
+        started = time.monotonic()
+        try:
+            response = await call_next(context)
+            rtt = time.monotonic() - started
+            return response
+        except httpx.HTTPStatusError as e:
+            rtt, dropped = time.monotonic() - started, self._is_dropped(e.response)
+            raise
+        except (httpx.TimeoutException, LybicDeadlineExceededError):
+            dropped = True
+            raise
+        finally:
+            self.limiter.release(rtt, dropped)
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        try:
+            self.limiter.acquire(self._timeout(context))
+        except TimeoutError as e:
+            raise LybicDeadlineExceededError(context.deadline.seconds) from e
+        rtt, dropped = None, False
+        started = time.monotonic()
+        try:
+            response = call_next(context)
+            rtt = time.monotonic() - started
+            return response
+        except httpx.HTTPStatusError as e:
+            rtt, dropped = time.monotonic() - started, self._is_dropped(e.response)
+            raise
+        except (httpx.TimeoutException, LybicDeadlineExceededError):
+            dropped = True
+            raise
+        finally:
+            self.limiter.release(rtt, dropped)
+
+
+class LoggingMiddleware(Middleware):
+    """Emits one structured record per attempt on the `lybic.http` logger, when it is enabled for DEBUG."""
+
+    async def handle(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        if not http_logger.isEnabledFor(logging.DEBUG):
+            return await call_next(context)
+        context.state["log_started"] = time.monotonic()
+        return await super().handle(context, call_next)
+
+    def handle_sync(self, context: RequestContext, call_next: CallNext) -> httpx.Response:
+        if not http_logger.isEnabledFor(logging.DEBUG):
+            return call_next(context)
+        context.state["log_started"] = time.monotonic()
+        return super().handle_sync(context, call_next)
+
+    def after(self, context: RequestContext, response: httpx.Response):
+        elapsed = time.monotonic() - context.state["log_started"]
+        log_exchange(context.method, context.url, elapsed, response=response)
+
+    def on_error(self, context: RequestContext, error: Exception):
+        elapsed = time.monotonic() - context.state["log_started"]
+        log_exchange(context.method, context.url, elapsed, error=error)
+
+
+def default_middlewares(retry_policy: RetryPolicy,
+                        middlewares: Optional[list] = None,
+                        cache: Optional[ResponseCache] = None,
+                        singleflight: bool = False,
+                        revalidation: Optional[RevalidationCache] = None,
+                        compression: Optional[Compression] = None,
+                        circuit_breaker: Optional[CircuitBreaker] = None,
+                        rate_limiter: Optional[RateLimiter] = None,
+                        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                        failover: Optional[EndpointSelector] = None) -> list:
+    """
+    Build the middleware chain of a client from its features
+
+    Custom middlewares run once per attempt, after the circuit breaker and the limiters, so the faults they
+    inject are seen by those.
+
+    :param retry_policy:
+    :param middlewares: custom middlewares
+    :param cache:
+    :param singleflight:
+    :param revalidation:
+    :param compression:
+    :param circuit_breaker:
+    :param rate_limiter:
+    :param concurrency_limiter:
+    :param failover:
+    :return: the middlewares, outermost first
+    """
+    chain = []
+    if cache is not None:
+        chain.append(CacheMiddleware(cache))
+    if singleflight:
+        chain.append(SingleFlightMiddleware())
+    if revalidation is not None:
+        chain.append(RevalidationMiddleware(revalidation))
+    if compression is not None:
+        chain.append(CompressionMiddleware(compression))
+    chain.append(RetryMiddleware(retry_policy))
+    if failover is not None:
+        chain.append(FailoverMiddleware(failover))
+    if circuit_breaker is not None:
+        chain.append(CircuitBreakerMiddleware(circuit_breaker))
+    if rate_limiter is not None:
+        chain.append(RateLimitMiddleware(rate_limiter))
+    if concurrency_limiter is not None:
+        chain.append(ConcurrencyLimitMiddleware(concurrency_limiter))
+    chain.extend(middlewares or ())
+    chain.append(LoggingMiddleware())
+    return chain
@@ -0,0 +1,200 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""rate_limit.py holds the client-side token-bucket rate limiter."""
+import threading
+import time
+from typing import Optional
+
+from .fork import register_after_fork
+
+
+class RateLimit:
+    """RateLimit is the quota of one route class: `rate` requests per second with bursts of up to `burst` requests."""
+    rate: float
+    burst: float
+    min_rate: float
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: Optional[float] = None):
+        """
+        Init rate limit
+
+        :param rate: sustained requests per second
+        :param burst: bucket size, defaults to max(rate, 1)
+        :param min_rate: the rate never drops below this when adapting to 429 responses, defaults to rate / 10
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        if not 0 < self.min_rate <= rate:
+            raise ValueError("min_rate must be positive and not greater than rate")
+
+
+class _Bucket:
+    __slots__ = ("limit", "rate", "tokens", "updated_at")
+
+    def __init__(self, limit: RateLimit, now: float):
+        self.limit = limit
+        self.rate = limit.rate
+        self.tokens = limit.burst
+        self.updated_at = now
+
+    def refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """
+    RateLimiter is a token-bucket limiter with one bucket per (org_id, route class).
+
+    Route classes are "actions", "lifecycle", "files" and "default" (see lybic.routes.ROUTE_CLASSES).
+    Requests wait for a token before they are sent, so bursts are smoothed before they reach the platform.
+    A 429 response halves the rate of its bucket (down to `min_rate`) and holds the bucket for the Retry-After
+    delay; every successful response then recovers a fraction of the configured rate.
+
+    One limiter is thread-safe and can be shared by the async and sync clients of all workers of a process.
+    """
+
+    def __init__(self,
+                 limits: Optional[dict[str, RateLimit]] = None,
+                 org_limits: Optional[dict[str, dict[str, RateLimit]]] = None,
+                 decrease_factor: float = 0.5,
+                 recovery: float = 0.05,
+                 ):
+        """
+        Init rate limiter
+
+        :param limits: rate limit per route class, the "default" class applies to the classes not listed.
+            Route classes without a limit are not limited.
+        :param org_limits: rate limits per org_id, overriding `limits` for this org
+        :param decrease_factor: the rate is multiplied by this on a 429 response
+        :param recovery: fraction of the configured rate recovered by each successful response
+        """
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.limits = limits or {}
+        self.org_limits = org_limits or {}
+        self.decrease_factor = decrease_factor
+        self.recovery = recovery
+        self._buckets: dict[tuple[str, str], Optional[_Bucket]] = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _limit(self, org_id: str, route_class: str) -> Optional[RateLimit]:
+        limits = self.org_limits.get(org_id, self.limits)
+        return limits.get(route_class, limits.get("default"))
+
+    def _bucket(self, org_id: str, route_class: str, now: float) -> Optional[_Bucket]:
+        key = (org_id, route_class)
+        try:
+            return self._buckets[key]
+        except KeyError:
+            limit = self._limit(org_id, route_class)
+            bucket = self._buckets[key] = _Bucket(limit, now) if limit is not None else None
+            return bucket
+
+    def reserve(self, org_id: str, route_class: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token, possibly in advance
+
+        :param org_id:
+        :param route_class:
+        :param max_wait: take no token if the request would have to wait this many seconds or more
+        :return: seconds to wait before sending the request, None if that is beyond `max_wait`
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(org_id, route_class, now)
+            if bucket is None:
+                return 0.0
+            bucket.refill(now)
+            wait = (1 - bucket.tokens) / bucket.rate if bucket.tokens < 1 else 0.0
+            if wait > 0 and max_wait is not None and wait >= max_wait:
+                return None
+            bucket.tokens -= 1
+            return wait
+
+    def on_success(self, org_id: str, route_class: str):
+        """
+        Recover the rate of a bucket after a successful response
+
+        :param org_id:
+        :param route_class:
+        """
+        with self._lock:
+            bucket = self._buckets.get((org_id, route_class))
+            if bucket is not None and bucket.rate < bucket.limit.rate:
+                bucket.refill(time.monotonic())
+                bucket.rate = min(bucket.limit.rate, bucket.rate + bucket.limit.rate * self.recovery)
+
+    def on_throttled(self, org_id: str, route_class: str, retry_after: Optional[float] = None):
+        """
+        Slow a bucket down after a 429 response
+
+        :param org_id:
+        :param route_class:
+        :param retry_after: the Retry-After delay of the response, in seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(org_id, route_class, now)
+            if bucket is None:
+                return
+            bucket.refill(now)
+            bucket.rate = max(bucket.limit.min_rate, bucket.rate * self.decrease_factor)
+            # a token debt of retry_after seconds holds every caller of the bucket until the quota resets
+            bucket.tokens = min(bucket.tokens, 0.0, -(retry_after or 0.0) * bucket.rate)
+
+    def snapshot(self) -> list[dict]:
+        """
+        Get the state of every limited bucket, for metrics
+
+        :return: a list of {"org_id", "route_class", "rate", "configured_rate", "tokens"}
+        """
+        now = time.monotonic()
+        with self._lock:
+            result = []
+            for (org_id, route_class), bucket in self._buckets.items():
+                if bucket is None:
+                    continue
+                bucket.refill(now)
+                result.append({
+                    "org_id": org_id,
+                    "route_class": route_class,
+                    "rate": bucket.rate,
+                    "configured_rate": bucket.limit.rate,
+                    "tokens": bucket.tokens,
+                })
+            return result
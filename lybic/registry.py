@@ -0,0 +1,160 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""registry.py holds the multi-tenant client registry, sharing connection pools across LybicAuth instances."""
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from .authentication import LybicAuth
+from .lybic import LybicClient
+from .transport import AsyncPooledTransport, TransportConfig
+
+ClientT = TypeVar("ClientT")
+
+
+class _ClientRegistry(Generic[ClientT]):
+    """_ClientRegistry keeps one client per tenant and one set of connection pools per endpoint."""
+
+    _client_class: type
+    _transport_class: type
+
+    def __init__(self,
+                 transport: Optional[TransportConfig] = None,
+                 options: Optional[Callable[[LybicAuth], dict]] = None,
+                 **client_kwargs: Any):
+        """
+        Init the registry
+
+        :param transport: connection pool settings, shared by all tenants of an endpoint
+        :param options: extra client arguments of a tenant, e.g. its own rate limiter or concurrency limiter
+        :param client_kwargs: client arguments common to all tenants, e.g. timeout
+        """
+        if "auth" in client_kwargs:
+            raise TypeError("auth is given per tenant, see get()")
+        self.transport_config = transport or TransportConfig()
+        self.options = options
+        self.client_kwargs = client_kwargs
+        self._clients: dict[tuple, ClientT] = {}
+        self._pools: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(auth: LybicAuth) -> tuple:
+        return auth.endpoint, auth.agent_service_endpoint, auth.org_id, tuple(sorted(auth.headers.items()))
+
+    def _tenant_transport(self, auth: LybicAuth) -> TransportConfig:
+        """Pool settings of a tenant client: the limits of the registry over the shared pools of its endpoint"""
+        key = auth.endpoint, auth.agent_service_endpoint
+        pools = self._pools.get(key)
+        if pools is None:
+            pools = self._pools[key] = self._transport_class(self.transport_config, *key)
+        config = self.transport_config
+        return TransportConfig(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+            http2=config.http2,
+            transport=pools.shared(),
+            agent_service=config.agent_service,
+            downloads=config.downloads,
+        )
+
+    def get(self, auth: LybicAuth) -> ClientT:
+        """
+        Get the client of a tenant, created on first use
+
+        Tenants are told apart by endpoint, org_id and headers (including the API key). Each client has its
+        own headers, retry budget, limiters and counters; the connection pools of an endpoint are shared.
+
+        :param auth:
+        :return:
+        """
+        key = self._key(auth)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    kwargs = dict(self.client_kwargs)
+                    if self.options is not None:
+                        kwargs.update(self.options(auth))
+                    kwargs["transport"] = self._tenant_transport(auth)
+                    client = self._clients[key] = self._client_class(auth, **kwargs)
+        return client
+
+    def discard(self, auth: LybicAuth) -> Optional[ClientT]:
+        """
+        Remove the client of a tenant, the shared connection pools are kept
+
+        :param auth:
+        :return: the removed client, for the caller to close, None if there was none
+        """
+        with self._lock:
+            return self._clients.pop(self._key(auth), None)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, auth: LybicAuth) -> bool:
+        return self._key(auth) in self._clients
+
+    @property
+    def pool_count(self) -> int:
+        """Number of shared connection pool sets, one per endpoint"""
+        return len(self._pools)
+
+    def _take_all(self) -> tuple[list, list]:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            pools, self._pools = list(self._pools.values()), {}
+        return clients, pools
+
+
+class LybicClientRegistry(_ClientRegistry[LybicClient]):
+    """
+    LybicClientRegistry hands out one LybicClient per tenant, all tenants of an endpoint sharing its pools.
+
+        registry = LybicClientRegistry(timeout=30, options=lambda auth: {"rate_limiter": limiters[auth.org_id]})
+        client = registry.get(LybicAuth(org_id=org_id, api_key=api_key))
+        await client.sandbox.list()
+    """
+
+    _client_class = LybicClient
+    _transport_class = AsyncPooledTransport
+
+    async def close(self):
+        """Close the clients of all tenants and the shared connection pools"""
+        clients, pools = self._take_all()
+        for client in clients:
+            await client.close()
+        for pool in pools:
+            await pool.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
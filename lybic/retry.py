@@ -0,0 +1,211 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""retry.py holds the retry policy shared by all request paths of the SDK."""
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from .fork import register_after_fork
+
+# Requests that fail with these errors never reached the server, so they are safe to retry for any method
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryBudget:
+    """
+    RetryBudget caps the number of retries to a fraction of the requests sent by a client,
+    so that a fleet of clients does not multiply the load of an upstream that is already failing.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 10, window: float = 10.0):
+        """
+        Init retry budget
+
+        :param ratio: retries allowed per request sent in the window, e.g. 0.2 allows 1 retry per 5 requests
+        :param min_retries_per_second: retries always allowed regardless of traffic, so that low traffic clients can retry
+        :param window: sliding window in seconds
+        """
+        if ratio < 0:
+            raise ValueError("ratio cannot be negative")
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        horizon = now - self.window
+        while self._requests and self._requests[0] < horizon:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < horizon:
+            self._retries.popleft()
+
+    def record_request(self):
+        """Record a request that was sent for the first time"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """
+        Try to spend one retry from the budget
+
+        :return: False when the budget is exhausted
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            allowed = self.ratio * len(self._requests) + self.min_retries_per_second * self.window
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """RetryPolicy decides whether and when a failed request is retried."""
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 retry_statuses: frozenset = frozenset({408, 425, 429, 500, 502, 503, 504}),
+                 idempotent_methods: frozenset = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+                 respect_retry_after: bool = True,
+                 budget: Optional[RetryBudget] = None,
+                 ):
+        """
+        Init retry policy
+
+        :param max_retries: maximum number of retries for one call
+        :param base_delay: minimum delay between attempts in seconds
+        :param max_delay: maximum delay between attempts in seconds
+        :param retry_statuses: HTTP status codes that are worth retrying
+        :param idempotent_methods: methods that can be retried after the request reached the server.
+            Other methods (e.g. POST) are only retried when the request was never sent or was rejected with 429.
+        :param respect_retry_after: wait for the `Retry-After` response header when present
+        :param budget: client-wide retry budget, defaults to a RetryBudget() with its default ratio
+        """
+        self.max_retries = max(max_retries, 0)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(m.upper() for m in idempotent_methods)
+        self.respect_retry_after = respect_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def record_request(self):
+        """Record a new logical call in the retry budget"""
+        self.budget.record_request()
+
+    def is_retryable(self, method: str, error: Exception) -> bool:
+        """
+        Check whether an error is worth retrying for the given method
+
+        :param method: HTTP method of the request
+        :param error: httpx.HTTPStatusError or httpx.RequestError
+        :return:
+        """
+        if isinstance(error, _NOT_SENT_ERRORS):
+            return True
+        idempotent = method.upper() in self.idempotent_methods
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            if status_code not in self.retry_statuses:
+                return False
+            return idempotent or status_code == 429
+        if isinstance(error, httpx.RequestError):
+            return idempotent
+        return False
+
+    @staticmethod
+    def retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+        """
+        Parse the `Retry-After` header of a response
+
+        :param response:
+        :return: delay in seconds, or None when the header is absent or invalid
+        """
+        headers = getattr(response, "headers", None)
+        if headers is None:
+            return None
+        value = headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, previous_delay: Optional[float]) -> float:
+        """
+        Compute the next delay with decorrelated jitter
+
+        :param previous_delay: the delay used before the previous attempt, None for the first retry
+        :return:
+        """
+        upper = max((previous_delay or self.base_delay) * 3, self.base_delay)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def next_delay(self, method: str, attempt: int, error: Exception,
+                   previous_delay: Optional[float] = None) -> Optional[float]:
+        """
+        Decide whether a failed attempt is retried
+
+        :param method: HTTP method of the request
+        :param attempt: zero-based number of the attempt that failed
+        :param error: the error of the attempt
+        :param previous_delay: the delay returned for the previous attempt
+        :return: seconds to wait before the next attempt, or None when the error should be raised
+        """
+        if attempt >= self.max_retries or not self.is_retryable(method, error):
+            return None
+        delay = self.backoff(previous_delay)
+        if self.respect_retry_after:
+            retry_after = self.retry_after(getattr(error, "response", None))
+            if retry_after is not None:
+                if retry_after > self.max_delay:
+                    return None
+                delay = max(delay, retry_after)
+        if not self.budget.try_acquire():
+            return None
+        return delay
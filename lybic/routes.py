@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""routes.py maps request paths to the route templates of the Lybic API."""
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Literal routes must come before the parameterized routes they overlap with,
+# e.g. `sandboxes/from-image` before `sandboxes/{sandbox_id}`.
+ROUTE_TEMPLATES = (
+    "/api/orgs/{org_id}/sandboxes",
+    "/api/orgs/{org_id}/sandboxes/from-image",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/actions/execute",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/apps/{app_id}",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/extend",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/file/copy",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/mappings",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/mappings/{target_endpoint}",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/operations/{operation_id}",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/preview",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/process",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/restart",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/stream",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/finish",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/read",
+    "/api/orgs/{org_id}/sandboxes/{sandbox_id}/status",
+    "/api/orgs/{org_id}/shapes",
+    "/api/orgs/{org_id}/machine-images",
+    "/api/orgs/{org_id}/machine-images/{image_id}",
+    "/api/orgs/{org_id}/mcp-servers",
+    "/api/orgs/{org_id}/mcp-servers/default",
+    "/api/orgs/{org_id}/mcp-servers/{mcp_server_id}",
+    "/api/orgs/{org_id}/mcp-servers/{mcp_server_id}/sandbox",
+    "/api/orgs/{org_id}/projects",
+    "/api/orgs/{org_id}/projects/{project_id}",
+    "/api/orgs/{org_id}/stats",
+    "/api/computer-use/parse/{model}",
+    "/api/mobile-use/parse/{model}",
+    "/api/mcp/{mcp_server_id}",
+    "/api/agent/info",
+    "/api/agent/config/global",
+    "/api/agent/config/global/llm",
+    "/api/agent/config/global/grounding-llm",
+    "/api/agent/config/global/embedding-llm",
+    "/api/agent/config/{config_id}",
+    "/api/agent/run",
+    "/api/agent/run-async",
+    "/api/agent/tasks/{task_id}/status",
+    "/api/agent/tasks/{task_id}/stream",
+)
+
+
+# Route classes share a rate limit, see lybic.rate_limit
+ROUTE_CLASSES = {
+    "actions": (
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/actions/execute",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/process",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/stream",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/finish",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/read",
+    ),
+    "lifecycle": (
+        "/api/orgs/{org_id}/sandboxes",
+        "/api/orgs/{org_id}/sandboxes/from-image",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/extend",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/restart",
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/status",
+    ),
+    "files": (
+        "/api/orgs/{org_id}/sandboxes/{sandbox_id}/file/copy",
+    ),
+}
+
+_TEMPLATE_CLASSES = {template: name for name, templates in ROUTE_CLASSES.items() for template in templates}
+
+
+def route_class(template: str) -> str:
+    """
+    Get the route class of a route template
+
+    :param template: route template, see match_route
+    :return: "actions", "lifecycle", "files" or "default"
+    """
+    return _TEMPLATE_CLASSES.get(template, "default")
+
+
+def _compile(template: str) -> re.Pattern:
+    pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(template))
+    return re.compile(f"^{pattern}$")
+
+
+_COMPILED_ROUTES = tuple((template, _compile(template)) for template in ROUTE_TEMPLATES)
+
+
+class Route(NamedTuple):
+    """A request path resolved to its route template."""
+    template: str
+    params: dict
+
+    @property
+    def sandbox_id(self) -> Optional[str]:
+        """The sandbox id of the path, if any"""
+        return self.params.get("sandbox_id")
+
+
+@lru_cache(maxsize=4096)
+def match_route(path: str) -> Route:
+    """
+    Resolve a request path to its route template
+
+    Unknown paths are their own template.
+
+    :param path: request path without host, e.g. `/api/orgs/org/sandboxes/SBX-1/actions/execute`
+    :return:
+    """
+    path = path.split("?", 1)[0]
+    for template, pattern in _COMPILED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return Route(template, match.groupdict())
+    return Route(path, {})
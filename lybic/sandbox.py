@@ -26,16 +26,15 @@
 
 """sandbox.py provides the Sandbox API"""
 import base64
-import json
 from io import BytesIO
-from typing import Tuple, overload, TYPE_CHECKING, Literal
-
-import httpx
+from typing import Iterable, Optional, Tuple, Union, overload, TYPE_CHECKING, Literal
 
 from PIL import Image
 from PIL.WebPImagePlugin import WebPImageFile
 
 from lybic import dto
+from lybic.bulk import DEFAULT_BULK_CONCURRENCY, BulkOperation
+from lybic.log import log_body, log_model
 
 if TYPE_CHECKING:
     from lybic.lybic import LybicClient
@@ -53,8 +52,11 @@ class Sandbox:
         """
         self.client.logger.debug("Listing sandboxes requests")
         response = await self.client.request("GET", f"/api/orgs/{self.client.org_id}/sandboxes")
-        self.client.logger.debug(f"Listing sandboxes response: {response.text}")
-        return dto.SandboxListResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Listing sandboxes response: %s", log_body(response))
+        sandboxes = self.client.parse(response, dto.SandboxListResponseDto)
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.refresh(sandboxes, self.client.org_id)
+        return sandboxes
 
     @overload
     async def create(self, data: dto.CreateSandboxDto) -> dto.Sandbox: ...
@@ -72,43 +74,65 @@ class Sandbox:
             data = kwargs["data"]
         else:
             data = dto.CreateSandboxDto(**kwargs)
-        self.client.logger.debug(f"Creating sandbox with data: {data}")
+        self.client.logger.debug("Creating sandbox with data: %s", data)
         response = await self.client.request(
             "POST",
-            f"/api/orgs/{self.client.org_id}/sandboxes", json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create sandbox response: {response.text}")
-        return dto.Sandbox.model_validate_json(response.text)
+            f"/api/orgs/{self.client.org_id}/sandboxes", json=data)
+        self.client.logger.debug("Create sandbox response: %s", log_body(response))
+        return self.client.parse(response, dto.Sandbox)
 
     async def get(self, sandbox_id: str) -> dto.GetSandboxResponseDto:
         """
         Get a sandbox
         """
-        self.client.logger.debug(f"Get sandbox {sandbox_id}")
+        self.client.logger.debug("Get sandbox %s", sandbox_id)
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}")
-        self.client.logger.debug(f"Get sandbox response: {response.text}")
-        return dto.GetSandboxResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get sandbox response: %s", log_body(response))
+        details = self.client.parse(response, dto.GetSandboxResponseDto)
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.put(details, self.client.org_id)
+        return details
+
+    async def get_metadata(self, sandbox_id: str) -> dto.GetSandboxResponseDto:
+        """
+        Get a sandbox from the sandbox registry of the client, fetching it on a miss
+
+        Use it to read what does not change while the sandbox lives (shape, OS, connection details); use `get`
+        for the current status. Without a sandbox registry, this is `get`.
+        """
+        registry = self.client.sandbox_registry
+        if registry is not None:
+            details = registry.get(sandbox_id)
+            if details is not None:
+                return details
+        return await self.get(sandbox_id)
 
     async def delete(self, sandbox_id: str) -> None:
         """
         Delete a sandbox
         """
-        self.client.logger.debug(f"Delete sandbox {sandbox_id}")
+        self.client.logger.debug("Delete sandbox %s", sandbox_id)
         await self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}")
+        self._invalidate(sandbox_id)
+
+    def _invalidate(self, sandbox_id: str):
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.invalidate(sandbox_id)
 
     async def preview(self, sandbox_id: str) -> dto.SandboxActionResponseDto:
         """
         Preview a sandbox
         """
-        self.client.logger.debug(f"Previewing sandbox {sandbox_id}")
+        self.client.logger.debug("Previewing sandbox %s", sandbox_id)
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/preview")
-        self.client.logger.debug(f"Previewed sandbox {sandbox_id}")
-        return dto.SandboxActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Previewed sandbox %s", sandbox_id)
+        return self.client.parse(response, dto.SandboxActionResponseDto)
 
     async def extend_life(self, sandbox_id: str, seconds: int = 3600) -> None:
         """Extend the life of a sandbox.
@@ -121,18 +145,19 @@ class Sandbox:
                      than 30 seconds or more than 24 hours. Note that the total maximum lifetime of a sandbox should
                      not longer than 13 days.
         """
-        self.client.logger.debug(f"Extending life of sandbox {sandbox_id}")
+        self.client.logger.debug("Extending life of sandbox %s", sandbox_id)
         data = dto.ExtendSandboxDto(maxLifeSeconds=seconds)
         await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/extend",
-            json=data.model_dump(exclude_none=True))
+            json=data)
+        self._invalidate(sandbox_id)
 
     async def get_connection_details(self, sandbox_id: str)-> dto.ConnectDetails:
         """
         Get stream connection details for a sandbox
         """
-        sandbox = await self.get(sandbox_id)
+        sandbox = await self.get_metadata(sandbox_id)
         return sandbox.connectDetails
 
     async def get_screenshot(self, sandbox_id: str) -> Tuple[str, Image.Image, str]:
@@ -144,20 +169,15 @@ class Sandbox:
         result = await self.preview(sandbox_id)
         screenshot_url = result.screenShot
 
-        async with httpx.AsyncClient() as client:
-            screenshot_response = await client.get(
-                screenshot_url,
-                timeout=self.client.timeout
-            )
-            screenshot_response.raise_for_status()
+        screenshot_response = await self.client.download(screenshot_url)
 
-            img = Image.open(BytesIO(screenshot_response.content))
-            base64_str=''
+        img = Image.open(BytesIO(screenshot_response.content))
+        base64_str=''
 
-            if isinstance(img, WebPImageFile):
-                buffer = BytesIO()
-                img.save(buffer, format="WebP")
-                base64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        if isinstance(img, WebPImageFile):
+            buffer = BytesIO()
+            img.save(buffer, format="WebP")
+            base64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
 
         return screenshot_url,img,base64_str
 
@@ -180,11 +200,11 @@ class Sandbox:
             "GET",
             f"/api/orgs/{self.client.org_id}/shapes"
         )
-        self.client.logger.debug(f"Get shapes response: {response.text}")
-        return dto.GetShapesResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get shapes response: %s", log_body(response))
+        return self.client.parse(response, dto.GetShapesResponseDto)
 
     @overload
-    async def execute_sandbox_action(self, sandbox_id: str, data: dto.ExecuteSandboxActionDto) -> dto.SandboxActionResponseDto: ...
+    async def execute_sandbox_action(self, sandbox_id: str, data: dto.ExecuteSandboxActionDto, deadline: Optional[float] = None) -> dto.SandboxActionResponseDto: ...
 
     @overload
     async def execute_sandbox_action(self, sandbox_id: str, **kwargs) -> dto.SandboxActionResponseDto: ...
@@ -193,7 +213,10 @@ class Sandbox:
         """
         Executes a computer use or mobile use action on the sandbox.
         The action can be either a computer use or mobile use action.
+
+        :param deadline: seconds for the whole call, retries included
         """
+        deadline = kwargs.pop("deadline", None)
         if args and isinstance(args[0], dto.ExecuteSandboxActionDto):
             data = args[0]
         elif "data" in kwargs:
@@ -206,12 +229,12 @@ class Sandbox:
                 raise TypeError(f"The 'data' argument must be of type {dto.ExecuteSandboxActionDto.__name__} or dict")
         else:
             data = dto.ExecuteSandboxActionDto(**kwargs)
-        self.client.logger.debug(f"Execute sandbox action request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Execute sandbox action request: %s", log_model(data))
         response = await self.client.request("POST",
                                              f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/actions/execute",
-                                             json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Execute sandbox action response: {response.text}")
-        return dto.SandboxActionResponseDto.model_validate_json(response.text)
+                                             json=data, deadline=deadline)
+        self.client.logger.debug("Execute sandbox action response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxActionResponseDto)
 
     @overload
     async def copy_files(self, sandbox_id: str, data: dto.SandboxFileCopyRequestDto) -> dto.SandboxFileCopyResponseDto: ...
@@ -235,16 +258,16 @@ class Sandbox:
                 raise TypeError(f"The 'data' argument must be of type {dto.SandboxFileCopyRequestDto.__name__} or dict")
         else:
             data = dto.SandboxFileCopyRequestDto(**kwargs)
-        self.client.logger.debug(f"Copying files for sandbox {sandbox_id} with data {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Copying files for sandbox %s with data %s", sandbox_id, log_model(data))
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/file/copy",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Copy files response: {response.text}")
-        return dto.SandboxFileCopyResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Copy files response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxFileCopyResponseDto)
 
     @overload
-    async def execute_process(self, sandbox_id: str, data: dto.SandboxProcessRequestDto) -> dto.SandboxProcessResponseDto: ...
+    async def execute_process(self, sandbox_id: str, data: dto.SandboxProcessRequestDto, deadline: Optional[float] = None) -> dto.SandboxProcessResponseDto: ...
 
     @overload
     async def execute_process(self, sandbox_id: str, **kwargs) -> dto.SandboxProcessResponseDto: ...
@@ -252,7 +275,10 @@ class Sandbox:
     async def execute_process(self, sandbox_id: str, *args, **kwargs) -> dto.SandboxProcessResponseDto:
         """
         Execute a process inside sandbox.
+
+        :param deadline: seconds for the whole call, retries included
         """
+        deadline = kwargs.pop("deadline", None)
         if args and isinstance(args[0], dto.SandboxProcessRequestDto):
             data = args[0]
         elif "data" in kwargs:
@@ -265,13 +291,13 @@ class Sandbox:
                 raise TypeError(f"The 'data' argument must be of type {dto.SandboxProcessRequestDto.__name__} or dict")
         else:
             data = dto.SandboxProcessRequestDto(**kwargs)
-        self.client.logger.debug(f"Executing process in sandbox {sandbox_id}")
+        self.client.logger.debug("Executing process in sandbox %s", sandbox_id)
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/process",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Execute process response: {response.text}")
-        return dto.SandboxProcessResponseDto.model_validate_json(response.text)
+            json=data, deadline=deadline)
+        self.client.logger.debug("Execute process response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxProcessResponseDto)
 
     @overload
     async def create_from_image(self, data: dto.CreateSandboxFromImageDto) -> dto.CreateSandboxFromImageResponseDto: ...
@@ -289,25 +315,24 @@ class Sandbox:
             data = kwargs["data"]
         else:
             data = dto.CreateSandboxFromImageDto(**kwargs)
-        self.client.logger.debug(f"Creating sandbox from image with data: {data}")
+        self.client.logger.debug("Creating sandbox from image with data: %s", data)
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/from-image",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create sandbox from image response: {response.text}")
-        return dto.CreateSandboxFromImageResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create sandbox from image response: %s", log_body(response))
+        return self.client.parse(response, dto.CreateSandboxFromImageResponseDto)
 
     async def get_status(self, sandbox_id: str) -> dto.SandboxStatus:
         """
         Get the status of a sandbox (PENDING/RUNNING/STOPPED/ERROR)
         """
-        self.client.logger.debug(f"Getting status for sandbox {sandbox_id}")
+        self.client.logger.debug("Getting status for sandbox %s", sandbox_id)
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/status")
-        self.client.logger.debug(f"Get sandbox status response: {response.text}")
-        json_response = json.loads(response.text)
-        return json_response['status']
+        self.client.logger.debug("Get sandbox status response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxStatusResponseDto).status
 
 
     @overload
@@ -326,13 +351,13 @@ class Sandbox:
             data = kwargs["data"]
         else:
             data = dto.CreateMachineImageDto(**kwargs)
-        self.client.logger.debug(f"Creating machine image with data: {data}")
+        self.client.logger.debug("Creating machine image with data: %s", data)
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/machine-images",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create machine image response: {response.text}")
-        return dto.MachineImageResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create machine image response: %s", log_body(response))
+        return self.client.parse(response, dto.MachineImageResponseDto)
 
     async def list_machine_images(self, scope: Literal["org", "public", "all"] = "org") -> dto.MachineImagesResponseDto:
         """List all machine images.
@@ -344,14 +369,14 @@ class Sandbox:
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/machine-images", params={"scope": scope})
-        self.client.logger.debug(f"List machine images response: {response.text}")
-        return dto.MachineImagesResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("List machine images response: %s", log_body(response))
+        return self.client.parse(response, dto.MachineImagesResponseDto)
 
     async def delete_machine_image(self, image_id: str) -> None:
         """
         Delete a machine image
         """
-        self.client.logger.debug(f"Deleting machine image {image_id}")
+        self.client.logger.debug("Deleting machine image %s", image_id)
         await self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/machine-images/{image_id}")
@@ -360,10 +385,51 @@ class Sandbox:
         """
         Restart a sandbox
         """
-        self.client.logger.debug(f"Restarting sandbox {sandbox_id}")
+        self.client.logger.debug("Restarting sandbox %s", sandbox_id)
         await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/restart")
+        self._invalidate(sandbox_id)
+
+    def create_many(self, specs: Iterable[Union[dto.CreateSandboxDto, dto.CreateSandboxFromImageDto, dict]],
+                    concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperation[dto.Sandbox]:
+        """
+        Create many sandboxes, at most `concurrency` at once
+
+        :param specs: CreateSandboxDto, CreateSandboxFromImageDto, or the keyword arguments of `create`
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperation, await it for the report or iterate over the results as they finish
+        """
+        return BulkOperation(specs, self._create_spec, concurrency)
+
+    async def _create_spec(self, spec) -> dto.Sandbox:
+        if isinstance(spec, dto.CreateSandboxFromImageDto):
+            return (await self.create_from_image(spec)).sandbox
+        if isinstance(spec, dto.CreateSandboxDto):
+            return await self.create(spec)
+        return await self.create(**spec)
+
+    def delete_many(self, sandbox_ids: Iterable[str],
+                    concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperation[None]:
+        """
+        Delete many sandboxes, at most `concurrency` at once
+
+        :param sandbox_ids:
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperation, await it for the report or iterate over the results as they finish
+        """
+        return BulkOperation(sandbox_ids, self.delete, concurrency)
+
+    def restart_many(self, sandbox_ids: Iterable[str],
+                     concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperation[None]:
+        """
+        Restart many sandboxes, at most `concurrency` at once
+
+        :param sandbox_ids:
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperation, await it for the report or iterate over the results as they finish
+        """
+        return BulkOperation(sandbox_ids, self.restart, concurrency)
 
     async def create_http_port_mapping(self, sandbox_id: str,
                                  target_endpoint: str) -> dto.CreateHttpMappingResponse:
@@ -373,16 +439,16 @@ class Sandbox:
         :param target_endpoint: Target TCP endpoint, e.g., 127.0.0.1:3000
         :return:
         """
-        self.client.logger.debug(f"Creating HTTP port mapping for sandbox {sandbox_id}")
+        self.client.logger.debug("Creating HTTP port mapping for sandbox %s", sandbox_id)
         data = dto.CreateHttpMappingDto(
             targetEndpoint=target_endpoint
         )
         response = await self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings",
-            json=data.model_dump())
-        self.client.logger.debug(f"Create HTTP port mapping response: {response.text}")
-        return dto.CreateHttpMappingResponse.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create HTTP port mapping response: %s", log_body(response))
+        return self.client.parse(response, dto.CreateHttpMappingResponse)
 
     async def get_http_port_mapping(self, sandbox_id: str, target_endpoint: str) -> dto.HttpMappingResponse:
         """
@@ -391,12 +457,12 @@ class Sandbox:
         :param target_endpoint:
         :return:
         """
-        self.client.logger.debug(f"Getting HTTP port mapping {target_endpoint} for sandbox {sandbox_id}")
+        self.client.logger.debug("Getting HTTP port mapping %s for sandbox %s", target_endpoint, sandbox_id)
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings/{target_endpoint}")
-        self.client.logger.debug(f"Get HTTP port mapping response: {response.text}")
-        return dto.HttpMappingResponse.model_validate_json(response.text)
+        self.client.logger.debug("Get HTTP port mapping response: %s", log_body(response))
+        return self.client.parse(response, dto.HttpMappingResponse)
 
     async def list_http_port_mappings(self, sandbox_id: str) -> dto.ListHttpMappingsResponseDto:
         """
@@ -405,12 +471,12 @@ class Sandbox:
         :param sandbox_id:
         :return:
         """
-        self.client.logger.debug(f"Listing HTTP port mappings for sandbox {sandbox_id}")
+        self.client.logger.debug("Listing HTTP port mappings for sandbox %s", sandbox_id)
         response = await self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings")
-        self.client.logger.debug(f"List HTTP port mappings response: {response.text}")
-        return dto.ListHttpMappingsResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("List HTTP port mappings response: %s", log_body(response))
+        return self.client.parse(response, dto.ListHttpMappingsResponseDto)
 
     async def delete_http_port_mapping(self, sandbox_id: str, target_endpoint: str) -> None:
         """
@@ -419,7 +485,7 @@ class Sandbox:
         :param target_endpoint:
         :return:
         """
-        self.client.logger.debug(f"Deleting HTTP port mapping {target_endpoint} for sandbox {sandbox_id}")
+        self.client.logger.debug("Deleting HTTP port mapping %s for sandbox %s", target_endpoint, sandbox_id)
         await self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings/{target_endpoint}")
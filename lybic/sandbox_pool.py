@@ -0,0 +1,433 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""sandbox_pool.py keeps warm sandboxes ready to hand out, so a call does not wait for a sandbox to boot."""
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import AsyncIterator, Optional, TYPE_CHECKING
+
+from lybic import dto
+from lybic.exceptions import LybicSandboxNotReadyError
+from lybic.lease import _timestamp
+
+if TYPE_CHECKING:
+    from lybic.lybic import LybicClient
+    from lybic.sandbox_watcher import SandboxWatcher
+
+_FAILED_STATUSES = (dto.SandboxStatus.STOPPED.value, dto.SandboxStatus.ERROR.value)
+
+
+class _Kind:
+    """The ready sandboxes and the waiters of one shape or machine image."""
+
+    def __init__(self, target: int):
+        self.target = target
+        self.ready: deque[tuple[dto.Sandbox, float]] = deque()
+        self.waiters: deque[asyncio.Future] = deque()
+        self.creating = 0
+        # consecutive failed creations, and whether a refill after a failure is scheduled
+        self.failures = 0
+        self.retrying = False
+
+
+class SandboxPool:
+    """
+    SandboxPool keeps `N` RUNNING sandboxes per shape (or machine image) and hands them out.
+
+        async with SandboxPool(client, shapes={"beijing-2c-4g-cpu": 4}) as pool:
+            async with pool.acquire(shape="beijing-2c-4g-cpu") as sandbox:
+                await client.sandbox.execute_sandbox_action(sandbox.id, action=action)
+
+    Sandboxes are created and waited for in the background, with at most `max_concurrent_creates` creations in
+    flight. On release, a sandbox is deleted (or, with `recycle`, put back) and the pool is refilled. A shape or image
+    that was not configured is created on demand.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-locals
+                 client: "LybicClient",
+                 shapes: Optional[dict[str, int]] = None,
+                 images: Optional[dict[str, int]] = None,
+                 max_concurrent_creates: int = 4,
+                 max_life_seconds: int = 3600,
+                 max_idle_seconds: Optional[float] = None,
+                 project_id: Optional[str] = None,
+                 name: str = "pooled-sandbox",
+                 recycle: bool = False,
+                 ready_timeout: float = 300.0,
+                 poll_interval: float = 1.0,
+                 watcher: Optional["SandboxWatcher"] = None,
+                 expiry_margin: float = 60.0,
+                 retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0,
+                 ):
+        """
+        Init sandbox pool, start it with `start()` or `async with`
+
+        :param client:
+        :param shapes: number of ready sandboxes to keep per shape name
+        :param images: number of ready sandboxes to keep per machine image id
+        :param max_concurrent_creates: creations (including the wait for RUNNING) in flight at once
+        :param max_life_seconds: life time of the created sandboxes
+        :param max_idle_seconds: ready sandboxes idle for longer are deleted instead of handed out,
+            defaults to half of max_life_seconds
+        :param project_id: project of the created sandboxes, the default project if None
+        :param name: name of the created sandboxes
+        :param recycle: put released sandboxes back into the pool instead of deleting them
+        :param ready_timeout: seconds to wait for a new sandbox to become RUNNING
+        :param poll_interval: seconds between two status checks of a new sandbox
+        :param watcher: wait for new sandboxes with this watcher, one list call for all of them,
+            instead of polling the status of each one
+        :param expiry_margin: sandboxes expiring within this many seconds are deleted instead of handed out or
+            put back
+        :param retry_delay: seconds before refilling after a failed creation, doubled on each consecutive failure
+        :param max_retry_delay: upper bound of the delay before refilling after failed creations
+        """
+        if max_concurrent_creates < 1:
+            raise ValueError("max_concurrent_creates must be at least 1")
+        if expiry_margin >= max_life_seconds:
+            raise ValueError("expiry_margin must be shorter than max_life_seconds")
+        self.client = client
+        self.max_concurrent_creates = max_concurrent_creates
+        self.max_life_seconds = max_life_seconds
+        self.max_idle_seconds = max_idle_seconds if max_idle_seconds is not None else max_life_seconds / 2
+        self.project_id = project_id
+        self.name = name
+        self.recycle = recycle
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.watcher = watcher
+        self.expiry_margin = expiry_margin
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._kinds: dict[tuple[str, str], _Kind] = {}
+        for shape, target in (shapes or {}).items():
+            self._kinds[("shape", shape)] = _Kind(target)
+        for image_id, target in (images or {}).items():
+            self._kinds[("image", image_id)] = _Kind(target)
+        self._semaphore = asyncio.Semaphore(max_concurrent_creates)
+        self._tasks: set[asyncio.Task] = set()
+        self._deleting: set[asyncio.Task] = set()
+        # monotonic expiration time of every sandbox created by the pool, by id
+        self._expires_at: dict[str, float] = {}
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.failed = 0
+        self.deleted = 0
+        self.recycled = 0
+        self.expired = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def start(self):
+        """Start filling the pool in the background, from a running event loop"""
+        for key in self._kinds:
+            self._refill(key)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @staticmethod
+    def _key(shape: Optional[str], image_id: Optional[str]) -> tuple[str, str]:
+        if (shape is None) == (image_id is None):
+            raise ValueError("Exactly one of shape and image_id is required")
+        return ("shape", shape) if shape is not None else ("image", image_id)
+
+    def _kind(self, key: tuple[str, str]) -> _Kind:
+        kind = self._kinds.get(key)
+        if kind is None:
+            kind = self._kinds[key] = _Kind(0)
+        return kind
+
+    def _refill(self, key: tuple[str, str]):
+        """Start the creations that bring the ready sandboxes and those in creation up to the target plus waiters"""
+        if self._closed:
+            return
+        kind = self._kind(key)
+        missing = kind.target + len(kind.waiters) - len(kind.ready) - kind.creating
+        for _ in range(missing):
+            kind.creating += 1
+            task = asyncio.create_task(self._create(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _refill_later(self, key: tuple[str, str]):
+        """Refill after a failed creation, with an exponential backoff over the consecutive failures"""
+        kind = self._kind(key)
+        kind.failures += 1
+        if self._closed or kind.retrying:
+            return
+        kind.retrying = True
+        delay = min(self.retry_delay * 2 ** (kind.failures - 1), self.max_retry_delay)
+
+        async def refill():
+            await asyncio.sleep(delay)
+            kind.retrying = False
+            self._refill(key)
+
+        task = asyncio.create_task(refill())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _create_sandbox(self, key: tuple[str, str]) -> dto.Sandbox:
+        kind, value = key
+        # the life time counts from the request, before the sandbox exists
+        expires_at = time.monotonic() + self.max_life_seconds
+        if kind == "shape":
+            sandbox = await self.client.sandbox.create(
+                name=self.name, shape=value, maxLifeSeconds=self.max_life_seconds, projectId=self.project_id)
+        else:
+            sandbox = (await self.client.sandbox.create_from_image(
+                imageId=value, name=self.name, maxLifeSeconds=self.max_life_seconds, projectId=self.project_id)).sandbox
+        reported = _timestamp(sandbox.expiresAt)
+        if reported is not None:
+            expires_at = min(expires_at, time.monotonic() + reported - time.time())
+        self._expires_at[sandbox.id] = expires_at
+        return sandbox
+
+    def _expiring(self, sandbox: dto.Sandbox) -> bool:
+        """Whether a sandbox has expired or expires within the safety margin"""
+        expires_at = self._expires_at.get(sandbox.id)
+        return expires_at is not None and expires_at - time.monotonic() <= self.expiry_margin
+
+    async def _wait_running(self, sandbox: dto.Sandbox):
+        status = sandbox.status.value if sandbox.status is not None else None
+        if self.watcher is not None and status != dto.SandboxStatus.RUNNING.value:
+            await self.watcher.wait_running(sandbox.id, timeout=self.ready_timeout)
+            return
+        deadline = time.monotonic() + self.ready_timeout
+        while status != dto.SandboxStatus.RUNNING.value:
+            if status in _FAILED_STATUSES or time.monotonic() >= deadline:
+                raise LybicSandboxNotReadyError(sandbox.id, status)
+            await asyncio.sleep(self.poll_interval)
+            status = await self.client.sandbox.get_status(sandbox.id)
+
+    async def _create(self, key: tuple[str, str]):
+        kind = self._kind(key)
+        sandbox = None
+        try:
+            async with self._semaphore:
+                sandbox = await self._create_sandbox(key)
+                await self._wait_running(sandbox)
+        except asyncio.CancelledError:
+            kind.creating -= 1
+            if sandbox is not None:
+                await asyncio.shield(self._delete(sandbox))
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            kind.creating -= 1
+            self.failed += 1
+            self.client.logger.warning("Pool failed to create a sandbox for %s %s: %s", key[0], key[1], e)
+            if sandbox is not None:
+                await self._delete(sandbox)
+            # a waiter gets the error instead of waiting for a sandbox that is not coming
+            while kind.waiters:
+                waiter = kind.waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(e)
+                    break
+            self._refill_later(key)
+            return
+        kind.creating -= 1
+        kind.failures = 0
+        self.created += 1
+        self._put(key, sandbox)
+
+    def _put(self, key: tuple[str, str], sandbox: dto.Sandbox) -> bool:
+        """Hand a ready sandbox to the first waiter, or keep it unless the pool is full or it is expiring"""
+        kind = self._kind(key)
+        if self._expiring(sandbox):
+            self.expired += 1
+            self._discard_later(sandbox)
+            self._refill(key)
+            return False
+        while kind.waiters:
+            waiter = kind.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(sandbox)
+                return True
+        if self._closed or len(kind.ready) >= kind.target:
+            self._discard_later(sandbox)
+            return False
+        kind.ready.append((sandbox, time.monotonic()))
+        return True
+
+    async def _delete(self, sandbox: dto.Sandbox):
+        try:
+            await self.client.sandbox.delete(sandbox.id)
+            self.deleted += 1
+            self._expires_at.pop(sandbox.id, None)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.client.logger.warning("Pool failed to delete sandbox %s: %s", sandbox.id, e)
+
+    def _discard_later(self, sandbox: dto.Sandbox):
+        task = asyncio.create_task(self._delete(sandbox))
+        self._deleting.add(task)
+        task.add_done_callback(self._deleting.discard)
+
+    async def get(self, shape: Optional[str] = None, image_id: Optional[str] = None,
+                  timeout: Optional[float] = None) -> dto.Sandbox:
+        """
+        Take a RUNNING sandbox out of the pool, waiting for one if none is ready
+
+        Give it back with `release`, or use `acquire` which does both.
+
+        :param shape: shape name of the sandbox
+        :param image_id: or machine image id of the sandbox
+        :param timeout: seconds to wait, None to wait until a sandbox is ready
+        :return:
+        :raises asyncio.TimeoutError: When no sandbox is ready in time
+        :raises LybicSandboxNotReadyError: When the sandbox created for this call failed to start
+        """
+        if self._closed:
+            raise RuntimeError("The sandbox pool has been closed.")
+        key = self._key(shape, image_id)
+        kind = self._kind(key)
+        now = time.monotonic()
+        while kind.ready:
+            sandbox, ready_at = kind.ready.popleft()
+            if now - ready_at <= self.max_idle_seconds and not self._expiring(sandbox):
+                self.hits += 1
+                self._refill(key)
+                return sandbox
+            if self._expiring(sandbox):
+                self.expired += 1
+            self._discard_later(sandbox)
+
+        self.misses += 1
+        waiter = asyncio.get_running_loop().create_future()
+        kind.waiters.append(waiter)
+        self._refill(key)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # a sandbox handed over while timing out goes back to the pool
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._put(key, waiter.result())
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                kind.waiters.remove(waiter)
+            waited = time.monotonic() - now
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    async def release(self, sandbox: dto.Sandbox, shape: Optional[str] = None, image_id: Optional[str] = None,
+                      discard: bool = False):
+        """
+        Give a sandbox back to the pool
+
+        :param sandbox:
+        :param shape: shape name the sandbox was taken for
+        :param image_id: or machine image id the sandbox was taken for
+        :param discard: delete the sandbox even if the pool recycles, e.g. when it is in a bad state.
+            Recycled sandboxes beyond the target of the pool, or close to their expiration, are deleted too.
+        """
+        key = self._key(shape, image_id)
+        if self.recycle and not discard and not self._closed:
+            if self._put(key, sandbox):
+                self.recycled += 1
+            return
+        await self._delete(sandbox)
+        self._refill(key)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, shape: Optional[str] = None, image_id: Optional[str] = None,
+                      timeout: Optional[float] = None) -> AsyncIterator[dto.Sandbox]:
+        """
+        Take a RUNNING sandbox for the duration of a block, see `get`
+
+        The sandbox is released when the block exits; it is deleted if the block raised.
+
+        :param shape: shape name of the sandbox
+        :param image_id: or machine image id of the sandbox
+        :param timeout: seconds to wait for a sandbox
+        :return:
+        """
+        sandbox = await self.get(shape, image_id, timeout)
+        failed = True
+        try:
+            yield sandbox
+            failed = False
+        finally:
+            await self.release(sandbox, shape, image_id, discard=failed)
+
+    def stats(self) -> dict:
+        """
+        Get the pool metrics
+
+        :return: {"hits", "misses", "hit_rate", "avg_wait_seconds", "max_wait_seconds", "created", "failed",
+            "deleted", "recycled", "expired", "ready", "creating", "waiting"}
+        """
+        acquired = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / acquired if acquired else 0.0,
+            "avg_wait_seconds": self.wait_seconds / acquired if acquired else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "created": self.created,
+            "failed": self.failed,
+            "deleted": self.deleted,
+            "recycled": self.recycled,
+            "expired": self.expired,
+            "ready": sum(len(kind.ready) for kind in self._kinds.values()),
+            "creating": sum(kind.creating for kind in self._kinds.values()),
+            "waiting": sum(len(kind.waiters) for kind in self._kinds.values()),
+        }
+
+    async def close(self, delete_ready: bool = True):
+        """
+        Stop refilling, cancel the creations in flight and delete the ready sandboxes
+
+        Sandboxes still acquired are deleted when they are released.
+
+        :param delete_ready: delete the ready sandboxes, instead of leaving them to expire
+        """
+        self._closed = True
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for kind in self._kinds.values():
+            while kind.waiters:
+                waiter = kind.waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(RuntimeError("The sandbox pool has been closed."))
+            ready = [sandbox for sandbox, _ in kind.ready]
+            kind.ready.clear()
+            if delete_ready:
+                await asyncio.gather(*[self._delete(sandbox) for sandbox in ready])
+        await asyncio.gather(*list(self._deleting), return_exceptions=True)
@@ -0,0 +1,162 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""sandbox_registry.py keeps the metadata of sandboxes by id, so that OS checks and connection details are not fetched again."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from lybic import dto
+from lybic.fork import register_after_fork
+
+
+class _Entry:
+    __slots__ = ("details", "org_id", "expires_at")
+
+    def __init__(self, details: dto.GetSandboxResponseDto, org_id: Optional[str], expires_at: float):
+        self.details = details
+        self.org_id = org_id
+        self.expires_at = expires_at
+
+
+class SandboxRegistry:
+    """
+    SandboxRegistry keeps the `GetSandboxResponseDto` of sandboxes by id for `ttl` seconds.
+
+    `Sandbox.get` fills it and `Sandbox.get_metadata` reads it. `Sandbox.delete`, `restart` and `extend_life` drop the
+    entry of their sandbox. `Sandbox.list` refreshes the known entries with the listed fields and drops the sandboxes
+    of the org that are no longer listed. Entries are evicted least-recently-used once `max_entries` is reached.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 4096):
+        """
+        Init sandbox registry
+
+        :param ttl: seconds an entry is served without being fetched again. Connection details hold tokens, keep
+            it below their life time.
+        :param max_entries: maximum number of sandboxes kept
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, sandbox_id: str) -> bool:
+        return self.get(sandbox_id, count=False) is not None
+
+    def get(self, sandbox_id: str, count: bool = True) -> Optional[dto.GetSandboxResponseDto]:
+        """
+        Get the metadata of a sandbox
+
+        :param sandbox_id:
+        :param count: count the lookup in hits and misses
+        :return: None when missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(sandbox_id)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(sandbox_id)
+                self.hits += count
+                return entry.details
+            if entry is not None:
+                del self._entries[sandbox_id]
+            self.misses += count
+            return None
+
+    def shape(self, sandbox_id: str) -> Optional[dto.Shape]:
+        """
+        Get the shape of a sandbox
+
+        :param sandbox_id:
+        :return: None when the sandbox is missing or has no shape
+        """
+        details = self.get(sandbox_id)
+        return details.sandbox.shape if details is not None else None
+
+    def put(self, details: dto.GetSandboxResponseDto, org_id: Optional[str] = None):
+        """
+        Keep the metadata of a sandbox
+
+        :param details:
+        :param org_id: org of the sandbox, used to drop the sandboxes missing from a list
+        """
+        with self._lock:
+            sandbox_id = details.sandbox.id
+            self._entries[sandbox_id] = _Entry(details, org_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(sandbox_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, sandbox_id: str):
+        """
+        Drop the metadata of a sandbox, e.g. after it was deleted or restarted
+
+        :param sandbox_id:
+        """
+        with self._lock:
+            self._entries.pop(sandbox_id, None)
+
+    def refresh(self, sandboxes: Iterable[dto.Sandbox], org_id: Optional[str] = None):
+        """
+        Update the known sandboxes from a list of the org, without fetching them
+
+        Listed fields (status, expiresAt, ...) replace the kept ones. The shape and connection details, which the list
+        does not have, are kept, and the entry still expires `ttl` seconds after the `Sandbox.get` that fetched them.
+        Known sandboxes of the org that are not listed are dropped.
+
+        :param sandboxes: all sandboxes of the org, e.g. the result of Sandbox.list
+        :param org_id: org of the list
+        """
+        listed = {sandbox.id: sandbox for sandbox in sandboxes}
+        with self._lock:
+            for sandbox_id, entry in list(self._entries.items()):
+                if org_id is not None and entry.org_id not in (None, org_id):
+                    continue
+                sandbox = listed.get(sandbox_id)
+                if sandbox is None:
+                    del self._entries[sandbox_id]
+                    continue
+                fields = {name: getattr(sandbox, name) for name in sandbox.model_fields_set
+                          if getattr(sandbox, name) is not None}
+                entry.details = entry.details.model_copy(
+                    update={"sandbox": entry.details.sandbox.model_copy(update=fields)})
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,316 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""sandbox_watcher.py tracks the status of many sandboxes with one list call per tick instead of one poll per sandbox."""
+import asyncio
+import contextlib
+from typing import AsyncIterator, Iterable, Optional, TYPE_CHECKING
+
+import httpx
+
+from lybic import dto
+from lybic.exceptions import LybicAPIError, LybicSandboxNotReadyError
+
+if TYPE_CHECKING:
+    from lybic.lybic import LybicClient
+
+_FAILED_STATUSES = frozenset({dto.SandboxStatus.STOPPED.value, dto.SandboxStatus.ERROR.value})
+
+
+class StatusChange:
+    """A status transition of a watched sandbox, `status` is None once the sandbox is gone."""
+    __slots__ = ("sandbox_id", "previous", "status")
+
+    def __init__(self, sandbox_id: str, previous: Optional[str], status: Optional[str]):
+        self.sandbox_id = sandbox_id
+        self.previous = previous
+        self.status = status
+
+    def __repr__(self):
+        return f"<StatusChange {self.sandbox_id}: {self.previous} -> {self.status}>"
+
+
+class SandboxWatcher:
+    """
+    SandboxWatcher tracks the status of a set of sandboxes with one `Sandbox.list` call per tick.
+
+    Statuses missing from the list are fetched with `Sandbox.get_status`. The poll interval starts at
+    `min_interval`, grows by `backoff` on each tick without change up to `max_interval`, and drops back to
+    `min_interval` when something changes or a sandbox is added.
+
+        async with SandboxWatcher(client) as watcher:
+            await asyncio.gather(*[watcher.wait_running(sandbox.id) for sandbox in sandboxes])
+
+            async for change in watcher:
+                print(change.sandbox_id, change.previous, "->", change.status)
+    """
+
+    def __init__(self, client: "LybicClient", min_interval: float = 0.5, max_interval: float = 10.0,
+                 backoff: float = 1.5, max_fallbacks: int = 16):
+        """
+        Init sandbox watcher, it starts polling when the first sandbox is watched
+
+        :param client:
+        :param min_interval: seconds between two ticks while statuses change
+        :param max_interval: longest interval between two ticks
+        :param backoff: factor applied to the interval after a tick without change
+        :param max_fallbacks: maximum get_status calls per tick, for sandboxes without status in the list
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be positive and not greater than max_interval")
+        if backoff < 1:
+            raise ValueError("backoff cannot be less than 1")
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_fallbacks = max(max_fallbacks, 1)
+        self.interval = min_interval
+        self.ticks = 0
+        self.fallbacks = 0
+        self._fallback_offset = 0
+
+        self._statuses: dict[str, Optional[str]] = {}
+        self._waiters: dict[str, list[tuple[frozenset, asyncio.Future]]] = {}
+        self._temporary: set[str] = set()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _ensure_running(self):
+        if self._closed:
+            raise RuntimeError("The sandbox watcher has been closed.")
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def watch(self, *sandbox_ids: str):
+        """
+        Start tracking sandboxes, the next tick comes at once
+
+        :param sandbox_ids:
+        """
+        self._temporary.difference_update(sandbox_ids)
+        self._watch(*sandbox_ids)
+
+    def _watch(self, *sandbox_ids: str):
+        self._ensure_running()
+        for sandbox_id in sandbox_ids:
+            self._statuses.setdefault(sandbox_id, None)
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def unwatch(self, *sandbox_ids: str):
+        """
+        Stop tracking sandboxes, their pending waits are cancelled
+
+        :param sandbox_ids:
+        """
+        for sandbox_id in sandbox_ids:
+            self._statuses.pop(sandbox_id, None)
+            self._temporary.discard(sandbox_id)
+            for _, future in self._waiters.pop(sandbox_id, []):
+                future.cancel()
+
+    def status(self, sandbox_id: str) -> Optional[str]:
+        """
+        Get the last known status of a watched sandbox
+
+        :param sandbox_id:
+        :return: None if not known yet
+        """
+        return self._statuses.get(sandbox_id)
+
+    async def wait_for(self, sandbox_id: str, statuses: Iterable[str], timeout: Optional[float] = None) -> str:
+        """
+        Wait until a sandbox reaches one of `statuses`, watching it for the time of the wait if it was not watched
+
+        :param sandbox_id:
+        :param statuses: e.g. ("RUNNING",)
+        :param timeout: seconds to wait, None to wait forever
+        :return: the status reached
+        :raises asyncio.TimeoutError: When the status is not reached in time
+        :raises LybicSandboxNotReadyError: When the sandbox is gone
+        """
+        statuses = frozenset(status.value if isinstance(status, dto.SandboxStatus) else status
+                             for status in statuses)
+        current = self._statuses.get(sandbox_id)
+        if current in statuses:
+            return current
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(sandbox_id, []).append((statuses, future))
+        if sandbox_id not in self._statuses:
+            self._watch(sandbox_id)
+            self._temporary.add(sandbox_id)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters = self._waiters.get(sandbox_id)
+            if waiters and (statuses, future) in waiters:
+                waiters.remove((statuses, future))
+            if not waiters and sandbox_id in self._temporary:
+                self.unwatch(sandbox_id)
+
+    async def wait_running(self, sandbox_id: str, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a sandbox is RUNNING
+
+        :param sandbox_id:
+        :param timeout: seconds to wait, None to wait forever
+        :raises LybicSandboxNotReadyError: When the sandbox stops, fails, is gone or is not RUNNING in time
+        """
+        try:
+            status = await self.wait_for(sandbox_id, {dto.SandboxStatus.RUNNING.value, *_FAILED_STATUSES}, timeout)
+        except asyncio.TimeoutError as e:
+            raise LybicSandboxNotReadyError(sandbox_id, self._statuses.get(sandbox_id)) from e
+        if status != dto.SandboxStatus.RUNNING.value:
+            raise LybicSandboxNotReadyError(sandbox_id, status)
+
+    async def __aiter__(self) -> AsyncIterator[StatusChange]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            while True:
+                change = await queue.get()
+                if change is None:
+                    return
+                yield change
+        finally:
+            self._subscribers.discard(queue)
+
+    def _update(self, sandbox_id: str, status: Optional[str], gone: bool = False) -> bool:
+        if sandbox_id not in self._statuses:
+            return False
+        previous = self._statuses[sandbox_id]
+        if status == previous and not gone:
+            return False
+        change = StatusChange(sandbox_id, previous, status)
+        for queue in self._subscribers:
+            queue.put_nowait(change)
+        if gone:
+            self._statuses.pop(sandbox_id, None)
+            self._temporary.discard(sandbox_id)
+            for _, future in self._waiters.pop(sandbox_id, ()):
+                if not future.done():
+                    future.set_exception(LybicSandboxNotReadyError(sandbox_id, previous))
+            return True
+        self._statuses[sandbox_id] = status
+        for statuses, future in self._waiters.get(sandbox_id, ()):
+            if status in statuses and not future.done():
+                future.set_result(status)
+        return True
+
+    async def _fallback(self, sandbox_id: str) -> tuple[str, Optional[str], bool]:
+        self.fallbacks += 1
+        try:
+            return sandbox_id, await self.client.sandbox.get_status(sandbox_id), False
+        except (LybicAPIError, httpx.HTTPStatusError) as e:
+            status_code = e.status_code if isinstance(e, LybicAPIError) else e.response.status_code
+            if status_code == 404:
+                return sandbox_id, None, True
+            raise
+
+    def _fallback_window(self, missing: list[str]) -> list[str]:
+        """Pick the sandboxes to fetch this tick, those with pending waits first, rotating so that all get a turn"""
+        if len(missing) <= self.max_fallbacks:
+            return missing
+        offset = self._fallback_offset % len(missing)
+        rotated = missing[offset:] + missing[:offset]
+        rotated.sort(key=lambda sandbox_id: not self._waiters.get(sandbox_id))
+        self._fallback_offset = offset + self.max_fallbacks
+        return rotated[:self.max_fallbacks]
+
+    async def poll(self) -> int:
+        """
+        Run one tick: list the sandboxes once and fetch the statuses missing from the list
+
+        :return: number of status changes
+        """
+        self.ticks += 1
+        watched = list(self._statuses)
+        if not watched:
+            return 0
+        listed = {
+            item.id: item.status.value if item.status is not None else None
+            for item in await self.client.sandbox.list()
+        }
+        changes = 0
+        missing = []
+        for sandbox_id in watched:
+            status = listed.get(sandbox_id)
+            if status is None:
+                missing.append(sandbox_id)
+            else:
+                changes += self._update(sandbox_id, status)
+        outcomes = await asyncio.gather(*[self._fallback(sandbox_id) for sandbox_id in self._fallback_window(missing)],
+                                        return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                self.client.logger.warning("Sandbox watcher failed to get a status: %s", outcome)
+                continue
+            changes += self._update(*outcome)
+        return changes
+
+    async def _run(self):
+        while not self._closed:
+            if not self._statuses:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            self._wake.clear()
+            try:
+                changed = await self.poll()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.client.logger.warning("Sandbox watcher tick failed: %s", e)
+                changed = 0
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+
+    async def close(self):
+        """Stop polling, cancel the pending waits and end the iterations"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        for waiters in self._waiters.values():
+            for _, future in waiters:
+                future.cancel()
+        self._waiters.clear()
+        for queue in self._subscribers:
+            queue.put_nowait(None)
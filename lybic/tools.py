@@ -42,6 +42,7 @@ from lybic.dto import (
     SandboxApplicationInstallAcceptedDto,
     SandboxApplicationOperationDto,
 )
+from lybic.log import log_body
 
 if TYPE_CHECKING:
     from lybic.lybic import LybicClient
@@ -76,10 +77,10 @@ class ComputerUse:
         response = await self.client.request(
             "POST",
             f"/api/computer-use/parse/{model}",
-            json=ParseTextRequestDto(textContent=llm_output).model_dump(exclude_none=True),
+            json=ParseTextRequestDto(textContent=llm_output),
         )
-        self.client.logger.debug(f"Parse model output response: {response.text}")
-        return ComputerUseActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Parse model output response: %s", log_body(response))
+        return self.client.parse(response, ComputerUseActionResponseDto)
 
 class MobileUse:
     """MobileUse is an async client for lybic MobileUse API(MCP and Restful)."""
@@ -111,10 +112,10 @@ class MobileUse:
         response = await self.client.request(
             "POST",
             f"/api/mobile-use/parse/{model}",
-            json=ParseTextRequestDto(textContent=llm_output).model_dump(exclude_none=True),
+            json=ParseTextRequestDto(textContent=llm_output),
         )
-        self.client.logger.debug(f"Parse model output response: {response.text}")
-        return MobileUseActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Parse model output response: %s", log_body(response))
+        return self.client.parse(response, MobileUseActionResponseDto)
 
     async def set_gps_location(
         self, sandbox_id: str, latitude: float, longitude: float
@@ -129,7 +130,7 @@ class MobileUse:
         Returns:
             The process execution result.
         """
-        sandbox_details = await self.client.sandbox.get(sandbox_id)
+        sandbox_details = await self.client.sandbox.get_metadata(sandbox_id)
         if not sandbox_details.sandbox.shape or sandbox_details.sandbox.shape.os != "Android":
             raise ValueError("set_gps_location is only supported for Android sandboxes")
         return await self.client.sandbox.execute_process(
@@ -192,7 +193,7 @@ class MobileUse:
             This method executes installation asynchronously using nohup to avoid timeout issues.
             The installation runs in the background and does not return installation results.
         """
-        sandbox_details = await self.client.sandbox.get(sandbox_id)
+        sandbox_details = await self.client.sandbox.get_metadata(sandbox_id)
         if not sandbox_details.sandbox.shape or sandbox_details.sandbox.shape.os != "Android":
             raise ValueError("install_apk is only supported for Android sandboxes")
 
@@ -220,8 +221,8 @@ class MobileUse:
             "PUT",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/apps/{app_id}",
         )
-        self.client.logger.debug(f"Install sandbox application response: {response.text}")
-        return SandboxApplicationInstallAcceptedDto.model_validate_json(response.text)
+        self.client.logger.debug("Install sandbox application response: %s", log_body(response))
+        return self.client.parse(response, SandboxApplicationInstallAcceptedDto)
 
     async def get_sandbox_application_operation(
         self, sandbox_id: str, operation_id: str
@@ -239,8 +240,8 @@ class MobileUse:
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/operations/{operation_id}",
         )
-        self.client.logger.debug(f"Get sandbox application operation response: {response.text}")
-        return SandboxApplicationOperationDto.model_validate_json(response.text)
+        self.client.logger.debug("Get sandbox application operation response: %s", log_body(response))
+        return self.client.parse(response, SandboxApplicationOperationDto)
 
 class Tools:
     """Tools is a container for various tool clients."""
@@ -0,0 +1,263 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""transport.py holds the connection pool and protocol settings for the underlying HTTP transport."""
+import abc
+import threading
+from typing import Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from .fork import register_after_fork
+
+
+class TransportConfig:
+    """TransportConfig holds the connection pool and protocol settings used by LybicClient and LybicSyncClient."""
+
+    max_connections: Optional[int] # Maximum number of concurrent connections, None means unlimited
+    max_keepalive_connections: Optional[int] # Maximum number of idle connections kept in the pool
+    keepalive_expiry: Optional[float] # Seconds an idle connection is kept alive
+    http2: bool # Whether to negotiate HTTP/2 (requires the `h2` package)
+    transport: Optional[Union[httpx.AsyncBaseTransport, httpx.BaseTransport]] # Custom transport, overrides the above
+
+    agent_service: Optional["TransportConfig"] # Pool settings for the agent service endpoint
+    downloads: Optional["TransportConfig"] # Pool settings for any other host, e.g. the screenshot CDN
+
+    def __init__(self,
+                 max_connections: Optional[int] = 100,
+                 max_keepalive_connections: Optional[int] = 20,
+                 keepalive_expiry: Optional[float] = 5.0,
+                 http2: bool = False,
+                 transport: Optional[Union[httpx.AsyncBaseTransport, httpx.BaseTransport]] = None,
+                 agent_service: Optional["TransportConfig"] = None,
+                 downloads: Optional["TransportConfig"] = None,
+                 ):
+        """
+        Initializes the TransportConfig instance.
+
+        :param max_connections: Maximum number of concurrent connections. Defaults to 100, None means unlimited.
+        :param max_keepalive_connections: Maximum number of idle keep-alive connections. Defaults to 20.
+        :param keepalive_expiry: Seconds an idle keep-alive connection is kept in the pool. Defaults to 5.0.
+        :param http2: Negotiate HTTP/2 so that concurrent requests are multiplexed over a single connection.
+            Requires `pip install 'lybic[http2]'`.
+        :param transport: A custom httpx transport. When set, the pool settings above are ignored and the
+            requests are sent through it (useful for stub servers and tests). A transport set on the
+            `agent_service` or `downloads` config takes precedence for those hosts.
+        :param agent_service: Separate pool settings for the agent service endpoint. Defaults to this config.
+        :param downloads: Separate pool settings for other hosts, such as the screenshot CDN. Defaults to this config.
+        """
+        if max_connections is not None and max_connections <= 0:
+            raise ValueError("max_connections must be positive or None")
+        if max_keepalive_connections is not None and max_keepalive_connections < 0:
+            raise ValueError("max_keepalive_connections cannot be negative")
+        if http2:
+            try:
+                # pylint: disable=import-outside-toplevel,unused-import
+                import h2  # noqa: F401
+            except ImportError as e:
+                raise ImportError("h2 is not installed. Please install it with `pip install 'lybic[http2]'`") from e
+
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.transport = transport
+        self.agent_service = agent_service
+        self.downloads = downloads
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """
+        Get the httpx connection pool limits
+
+        :return:
+        """
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def for_role(self, role: str) -> "TransportConfig":
+        """
+        Get the pool settings for a host role ("api", "agent_service" or "downloads")
+
+        :param role:
+        :return:
+        """
+        if role == "agent_service" and self.agent_service is not None:
+            return self.agent_service
+        if role == "downloads" and self.downloads is not None:
+            return self.downloads
+        return self
+
+
+def _netloc(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.hostname}:{port}"
+
+
+class _HostRouter(abc.ABC):
+    """_HostRouter maps a request to the connection pool of its host role."""
+
+    def __init__(self, config: TransportConfig, endpoint: Optional[str], agent_service_endpoint: Optional[str],
+                 api_endpoints: Optional[list[str]] = None):
+        self.config = config
+        self._roles = {}
+        for api_endpoint in api_endpoints or ():
+            if _netloc(api_endpoint):
+                self._roles[_netloc(api_endpoint)] = "api"
+        if _netloc(agent_service_endpoint):
+            self._roles[_netloc(agent_service_endpoint)] = "agent_service"
+        if _netloc(endpoint):
+            self._roles[_netloc(endpoint)] = "api"
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        register_after_fork(self)
+
+    def _after_fork(self):
+        # the inherited connections belong to the parent, the child opens its own
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def role(self, url: str) -> str:
+        """
+        Get the host role of a url: "api", "agent_service" or "downloads"
+
+        :param url:
+        :return:
+        """
+        return self._roles.get(_netloc(url), "downloads")
+
+    def _role(self, request: httpx.Request) -> str:
+        port = request.url.port or (443 if request.url.scheme == "https" else 80)
+        return self._roles.get(f"{request.url.host}:{port}", "downloads")
+
+    def _pool(self, request: httpx.Request):
+        if self._closed:
+            # borrowers of shared() would otherwise open pools that nobody closes
+            raise RuntimeError("Cannot send a request, as the transport has been closed.")
+        role = self._role(request)
+        config = self.config.for_role(role)
+        transport = config.transport if config.transport is not None else self.config.transport
+        if transport is not None:
+            return transport
+        pool = self._pools.get(role)
+        if pool is None:
+            # pools are created lazily, possibly from several threads sharing a sync client
+            with self._lock:
+                pool = self._pools.get(role)
+                if pool is None:
+                    pool = self._pools[role] = self._create_pool(config)
+        return pool
+
+    def _close(self) -> list:
+        """Mark the transport closed, get the pools and custom transports to close"""
+        with self._lock:
+            self._closed = True
+            pools, self._pools = list(self._pools.values()), {}
+        for role in ("api", "agent_service", "downloads"):
+            transport = self.config.for_role(role).transport
+            if transport is not None and all(transport is not pool for pool in pools):
+                pools.append(transport)
+        return pools
+
+    @abc.abstractmethod
+    def _create_pool(self, config: TransportConfig):
+        """Create the connection pool of a host role"""
+
+
+class AsyncPooledTransport(_HostRouter, httpx.AsyncBaseTransport):
+    """
+    AsyncPooledTransport keeps one connection pool per host role (API, agent service, downloads),
+    so that every component of the SDK can share the same connections.
+    """
+
+    def _create_pool(self, config: TransportConfig) -> httpx.AsyncBaseTransport:
+        return httpx.AsyncHTTPTransport(limits=config.limits, http2=config.http2)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool(request).handle_async_request(request)
+
+    def shared(self) -> httpx.AsyncBaseTransport:
+        """
+        Get a view of this transport that can be given to another httpx.AsyncClient.
+        Closing that client does not close the shared pools.
+
+        :return:
+        """
+        return _BorrowedAsyncTransport(self)
+
+    async def aclose(self) -> None:
+        for pool in self._close():
+            await pool.aclose()
+
+
+class PooledTransport(_HostRouter, httpx.BaseTransport):
+    """
+    PooledTransport keeps one connection pool per host role (API, agent service, downloads),
+    so that every component of the SDK can share the same connections.
+    """
+
+    def _create_pool(self, config: TransportConfig) -> httpx.BaseTransport:
+        return httpx.HTTPTransport(limits=config.limits, http2=config.http2)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._pool(request).handle_request(request)
+
+    def shared(self) -> httpx.BaseTransport:
+        """
+        Get a view of this transport that can be given to another httpx.Client.
+        Closing that client does not close the shared pools.
+
+        :return:
+        """
+        return _BorrowedTransport(self)
+
+    def close(self) -> None:
+        for pool in self._close():
+            pool.close()
+
+
+class _BorrowedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: AsyncPooledTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+
+class _BorrowedTransport(httpx.BaseTransport):
+    def __init__(self, transport: PooledTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)
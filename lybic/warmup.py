@@ -0,0 +1,127 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""warmup.py opens pooled connections ahead of the first call of a worker."""
+import time
+from typing import Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from lybic.transport import AsyncPooledTransport, PooledTransport
+
+
+def warmup_targets(transport: Union[AsyncPooledTransport, PooledTransport], endpoints: list,
+                   connections: int) -> list[tuple[str, int]]:
+    """
+    Get the origins to warm up and the number of connections to open to each
+
+    The number of connections is capped by the keep-alive limit of the pool of the origin, since connections above
+    it would be closed right away. HTTP/2 pools need a single connection.
+
+    :param transport: the pooled transport of the client
+    :param endpoints: urls, only their origin is used; duplicates and empty values are skipped
+    :param connections: connections wanted per origin
+    :return: (origin, connections) pairs
+    """
+    if connections < 1:
+        raise ValueError("connections must be at least 1")
+    targets = {}
+    for endpoint in endpoints:
+        if not endpoint:
+            continue
+        parts = urlsplit(endpoint)
+        origin = f"{parts.scheme}://{parts.netloc}/"
+        if origin in targets:
+            continue
+        config = transport.config.for_role(transport.role(origin))
+        count = connections
+        if config.http2:
+            count = 1
+        elif config.max_keepalive_connections is not None:
+            count = max(min(count, config.max_keepalive_connections), 1)
+        targets[origin] = count
+    return list(targets.items())
+
+
+def warmup_reports(targets: list[tuple[str, int]], outcomes: list) -> list[dict]:
+    """
+    Summarize a warmup per origin
+
+    The warmup requests run concurrently, so the slowest request of an origin is the time the origin took.
+
+    :param targets: (origin, connections) pairs, see warmup_targets
+    :param outcomes: (seconds, error) of each warmup request, in the order of targets
+    :return: {"url", "connections", "failed", "seconds", "error"} per origin
+    """
+    reports, index = [], 0
+    for origin, count in targets:
+        results, index = outcomes[index:index + count], index + count
+        errors = [error for _, error in results if error is not None]
+        reports.append({
+            "url": origin,
+            "connections": len(results) - len(errors),
+            "failed": len(errors),
+            "seconds": max((elapsed for elapsed, _ in results), default=0.0),
+            "error": repr(errors[0]) if errors else None,
+        })
+    return reports
+
+
+async def warmup_request_async(client: httpx.AsyncClient, origin: str, timeout) -> tuple[float, Optional[Exception]]:
+    """
+    Send one HEAD request to an origin, without credentials
+
+    Any HTTP response means a connection was set up, only transport errors count as failures.
+
+    :param client:
+    :param origin:
+    :param timeout:
+    :return: (seconds, error)
+    """
+    started = time.monotonic()
+    try:
+        await client.request("HEAD", origin, timeout=timeout)
+    except httpx.TransportError as e:
+        return time.monotonic() - started, e
+    return time.monotonic() - started, None
+
+
+def warmup_request(client: httpx.Client, origin: str, timeout) -> tuple[float, Optional[Exception]]:
+    """
+    Send one HEAD request to an origin, without credentials, see warmup_request_async
+
+    :param client:
+    :param origin:
+    :param timeout:
+    :return: (seconds, error)
+    """
+    started = time.monotonic()
+    try:
+        client.request("HEAD", origin, timeout=timeout)
+    except httpx.TransportError as e:
+        return time.monotonic() - started, e
+    return time.monotonic() - started, None
@@ -27,10 +27,30 @@
 from lybic import __version__
 from lybic import json_extra_fields_policy
 from lybic.authentication import LybicAuth
-from lybic.exceptions import LybicError, LybicAPIError, LybicInternalError
+from lybic.transport import TransportConfig
+from lybic.retry import RetryPolicy, RetryBudget
+from lybic.circuit_breaker import CircuitBreaker, CircuitState
+from lybic.failover import EndpointSelector
+from lybic.rate_limit import RateLimiter, RateLimit
+from lybic.concurrency import AdaptiveConcurrencyLimiter
+from lybic.cache import ResponseCache, RevalidationCache
+from lybic.sandbox_registry import SandboxRegistry
+from lybic.compression import Compression
+from lybic.deadline import Deadline
+from lybic.middleware import Middleware, RequestContext
+from lybic.fork import PerProcess
+from lybic.bulk import BulkReport, BulkResult
+from lybic.exceptions import (
+    LybicError, LybicAPIError, LybicInternalError, LybicCircuitOpenError,
+    LybicDeadlineExceededError, LybicSandboxNotReadyError,
+)
 
 # Synchronous Client
 from lybic_sync.lybic_sync import LybicSyncClient
+from lybic_sync.registry import LybicSyncClientRegistry
+
+# Synchronous facade of the async client, on a background event loop
+from lybic_sync.background import BackgroundLoop, LybicBackgroundClient
 
 # Synchronous MCP Operations
 from lybic_sync.mcp import McpSync
@@ -46,6 +66,7 @@ from lybic_sync.pyautogui import PyautoguiSync
 
 # Synchronous Sandbox
 from lybic_sync.sandbox import SandboxSync
+from lybic_sync.bulk import BulkOperationSync
 
 # Synchronous Stream Shell
 from lybic_sync.stream_shell import StreamShellSync
@@ -57,10 +78,33 @@ __all__ = [
     "__version__",
     "LybicAuth",
     "LybicSyncClient",
+    "LybicSyncClientRegistry",
+    "LybicBackgroundClient",
+    "BackgroundLoop",
+    "TransportConfig",
+    "RetryPolicy",
+    "RetryBudget",
+    "CircuitBreaker",
+    "CircuitState",
+    "EndpointSelector",
+    "RateLimiter",
+    "RateLimit",
+    "AdaptiveConcurrencyLimiter",
+    "ResponseCache",
+    "SandboxRegistry",
+    "RevalidationCache",
+    "Compression",
+    "Deadline",
+    "Middleware",
+    "RequestContext",
+    "PerProcess",
 
     "LybicError",
     "LybicAPIError",
     "LybicInternalError",
+    "LybicCircuitOpenError",
+    "LybicDeadlineExceededError",
+    "LybicSandboxNotReadyError",
 
     "McpSync",
     "ComputerUseSync",
@@ -69,6 +113,9 @@ __all__ = [
     "ProjectSync",
     "PyautoguiSync",
     "SandboxSync",
+    "BulkOperationSync",
+    "BulkReport",
+    "BulkResult",
     "StreamShellSync",
     "StatsSync",
 
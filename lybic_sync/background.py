@@ -0,0 +1,319 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""background.py runs the asynchronous LybicClient on a background event loop for synchronous code.
+
+Every call made through LybicBackgroundClient is a coroutine of the async client, scheduled on one event loop
+thread. Blocking calls wait for their result, `.submit` hands out a concurrent.futures.Future, so sync code gets
+pipelined concurrent calls, SSE streams and MCP tool calls with the connection pools of the async client.
+"""
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from lybic.deadline import Deadline
+from lybic.fork import register_after_fork
+from lybic.lybic import LybicClient
+
+T = TypeVar("T")
+
+
+async def _within(deadline: Optional[Deadline], awaitable: Awaitable[T]) -> T:
+    """Await on the loop under the deadline of the thread that scheduled the call"""
+    if deadline is None:
+        return await awaitable
+    async with Deadline(max(deadline.remaining(), 0.0)):
+        return await awaitable
+
+
+class BackgroundLoop:
+    """
+    BackgroundLoop is an asyncio event loop running forever on a daemon thread.
+
+    Coroutines are scheduled from any thread and their results are handed back as futures.
+    """
+
+    _default: Optional["BackgroundLoop"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, name: str = "lybic-loop"):
+        """
+        Init the loop and start its thread
+
+        :param name: name of the thread
+        """
+        self.name = name
+        self._forked = False
+        self._lock = threading.Lock()
+        self._start()
+        register_after_fork(self)
+
+    def _start(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _after_fork(self):
+        # the loop thread does not exist in the child, a new loop is started on first use
+        self._forked = True
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "BackgroundLoop":
+        """Get the loop shared by the background clients of the process, started on first use"""
+        if cls._default is None or cls._default.closed:
+            with cls._default_lock:
+                if cls._default is None or cls._default.closed:
+                    cls._default = cls(name="lybic-loop-default")
+        return cls._default
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the loop has been stopped"""
+        return self.loop.is_closed() or (not self._forked and not self._thread.is_alive())
+
+    def submit(self, awaitable: Awaitable[T]) -> "Future[T]":
+        """
+        Schedule an awaitable on the loop
+
+        The deadline of the calling thread, if any, applies to the call.
+
+        :param awaitable:
+        :return: a future of its result
+        """
+        if self._forked:
+            with self._lock:
+                if self._forked:
+                    self._start()
+                    self._forked = False
+        if self.closed:
+            raise RuntimeError("The background loop has been closed.")
+        return asyncio.run_coroutine_threadsafe(_within(Deadline.current(), awaitable), self.loop)
+
+    def run(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run an awaitable on the loop and wait for its result
+
+        :param awaitable:
+        :param timeout: seconds to wait, the call is cancelled after that
+        :return:
+        :raises RuntimeError: When called from the loop thread itself, which would deadlock
+        :raises TimeoutError: When timeout elapses first
+        """
+        if threading.current_thread() is self._thread:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise RuntimeError("Cannot block on the background loop from its own thread, await the call instead.")
+        future = self.submit(awaitable)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Consume an async iterator, such as an SSE stream, from synchronous code
+
+        Items are pulled from the loop one at a time; leaving the loop early closes the async iterator.
+
+        :param iterator:
+        :return:
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(anext(iterator))
+                except StopAsyncIteration:
+                    return
+        finally:
+            if hasattr(iterator, "aclose") and not self.closed:
+                self.run(iterator.aclose())
+
+    def close(self):
+        """Stop the loop, after its pending callbacks, and join its thread"""
+        if self.closed:
+            return
+        if not self._forked:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+        self.loop.close()
+
+
+class BackgroundMethod:
+    """A coroutine method of the async client, called from synchronous code."""
+
+    def __init__(self, function: Callable[..., Any], loop: BackgroundLoop):
+        self.function = function
+        self.loop = loop
+        self.__doc__ = function.__doc__
+        self.__name__ = getattr(function, "__name__", type(function).__name__)
+
+    def __call__(self, *args, **kwargs):
+        """Call the method and wait for its result, async generators are returned as sync iterators"""
+        if inspect.isasyncgenfunction(self.function):
+            return self.loop.iterate(self.function(*args, **kwargs))
+        return self.loop.run(self.function(*args, **kwargs))
+
+    def submit(self, *args, **kwargs) -> Future:
+        """
+        Schedule the method on the background loop without waiting
+
+        :return: a future of its result
+        """
+        if inspect.isasyncgenfunction(self.function):
+            raise TypeError(f"{self.__name__} is a stream, iterate over its call instead")
+        return self.loop.submit(self.function(*args, **kwargs))
+
+    def __repr__(self):
+        return f"<BackgroundMethod {self.__name__}>"
+
+
+class BackgroundProxy:
+    """A namespace of the async client (sandbox, mcp, tools...) whose coroutine methods are called synchronously."""
+
+    def __init__(self, target: Any, loop: BackgroundLoop):
+        self._target = target
+        self._loop = loop
+
+    def __getattr__(self, name: str):
+        value = getattr(self._target, name)
+        if inspect.iscoroutinefunction(value) or inspect.isasyncgenfunction(value):
+            return BackgroundMethod(value, self._loop)
+        if (not callable(value) and not isinstance(value, BaseModel)
+                and type(value).__module__.startswith("lybic.") and hasattr(value, "__dict__")):
+            return BackgroundProxy(value, self._loop)
+        return value
+
+    def __dir__(self):
+        return dir(self._target)
+
+    def __repr__(self):
+        return f"<BackgroundProxy {type(self._target).__name__}>"
+
+
+class LybicBackgroundClient:
+    """
+    LybicBackgroundClient is a synchronous facade of the asynchronous LybicClient.
+
+    The async client runs on a background event loop, shared by default by all background clients of the process.
+    Every coroutine method of its namespaces can be called blocking, or scheduled with `.submit` for a future:
+
+        with LybicBackgroundClient() as client:
+            futures = [client.sandbox.get_status.submit(sandbox_id) for sandbox_id in sandbox_ids]
+            statuses = [future.result() for future in futures]
+            for event in client.stream_shell.create_stream(sandbox_id, "ls -l"):
+                print(event.data)
+
+    The instance is safe to share between threads.
+    """
+
+    def __init__(self, *args, loop: Optional[BackgroundLoop] = None, **kwargs):
+        """
+        Init the async client for the background loop
+
+        :param args: arguments of LybicClient
+        :param loop: the background loop, defaults to the loop shared by the process
+        :param kwargs: arguments of LybicClient
+        """
+        self.loop = loop or BackgroundLoop.default()
+        self.async_client = LybicClient(*args, **kwargs)
+
+        self.sandbox = BackgroundProxy(self.async_client.sandbox, self.loop)
+        self.project = BackgroundProxy(self.async_client.project, self.loop)
+        self.mcp = BackgroundProxy(self.async_client.mcp, self.loop)
+        self.stats = BackgroundProxy(self.async_client.stats, self.loop)
+        self.tools = BackgroundProxy(self.async_client.tools, self.loop)
+        self.stream_shell = BackgroundProxy(self.async_client.stream_shell, self.loop)
+
+    def request(self, method: str, path: str, **kwargs):
+        """
+        Make a request to Lybic Restful API, see LybicClient.request
+
+        :param method:
+        :param path:
+        :param kwargs:
+        :return:
+        """
+        return self.loop.run(self.async_client.request(method, path, **kwargs))
+
+    def parse(self, response, model):
+        """Validate the body of a response as a DTO, see LybicClient.parse"""
+        return self.async_client.parse(response, model)
+
+    def submit(self, function: Callable[..., Awaitable[T]], *args, **kwargs) -> "Future[T]":
+        """
+        Schedule a coroutine function on the background loop, e.g. a method of the async client
+
+            future = client.submit(client.async_client.sandbox.get, sandbox_id)
+
+        :param function: a coroutine function
+        :return: a future of its result
+        """
+        return self.loop.submit(function(*args, **kwargs))
+
+    def run(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run an awaitable on the background loop and wait for its result
+
+        :param awaitable:
+        :param timeout: seconds to wait
+        :return:
+        """
+        return self.loop.run(awaitable, timeout)
+
+    def warmup(self, connections: int = 4, urls: Optional[list[str]] = None) -> list[dict]:
+        """Open keep-alive connections ahead of the first call, see LybicClient.warmup"""
+        return self.loop.run(self.async_client.warmup(connections, urls))
+
+    def download(self, url: str):
+        """Download an absolute url through the shared connection pools, see LybicClient.download"""
+        return self.loop.run(self.async_client.download(url))
+
+    def __getattr__(self, name: str):
+        # settings of the async client: auth, endpoint, org_id, retry_policy, middlewares...
+        if name == "async_client":
+            raise AttributeError(name)
+        return getattr(self.async_client, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the async client; a loop passed to the constructor is left running"""
+        if not self.loop.closed:
+            self.loop.run(self.async_client.close())
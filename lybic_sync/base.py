@@ -29,14 +29,36 @@ import logging
 from typing import Optional
 
 from lybic.authentication import LybicAuth
+from lybic.base import _LybicBaseClient
+from lybic.cache import ResponseCache, RevalidationCache
+from lybic.circuit_breaker import CircuitBreaker
+from lybic.compression import Compression
+from lybic.concurrency import AdaptiveConcurrencyLimiter
+from lybic.deadline import TimeoutTypes
+from lybic.failover import EndpointSelector
+from lybic.rate_limit import RateLimiter
+from lybic.retry import RetryPolicy
+from lybic.sandbox_registry import SandboxRegistry
+from lybic.transport import TransportConfig
 
 class _LybicSyncBaseClient:
     """_LybicSyncBaseClient is a base client for synchronous Lybic API."""
 
-    def __init__(self,
+    def __init__(self,  # pylint: disable=too-many-locals
                  auth: Optional[LybicAuth] = None,
-                 timeout: int = 10,
+                 timeout: TimeoutTypes = 10,
                  max_retries: int = 3,
+                 transport: Optional[TransportConfig] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 revalidation: Optional[RevalidationCache] = None,
+                 compression: Optional[Compression] = None,
+                 middlewares: Optional[list] = None,
+                 failover: Optional[EndpointSelector] = None,
+                 sandbox_registry: Optional[SandboxRegistry] = None,
                  ):
         """
         Init lybic sync client with org_id, api_key and endpoint
@@ -45,60 +67,61 @@ class _LybicSyncBaseClient:
         :param org_id:
         :param api_key:
         :param endpoint:
-        :param timeout:
+        :param timeout: seconds, or httpx.Timeout with separate connect/read/write/pool timeouts
         :param extra_headers:
         :param max_retries:
+        :param transport: connection pool and protocol settings
+        :param retry_policy: retry policy, overrides max_retries
+        :param circuit_breaker: per-endpoint circuit breaker, disabled if None
+        :param rate_limiter: client-side rate limiter, disabled if None
+        :param concurrency_limiter: adaptive in-flight request limiter, disabled if None
+        :param cache: TTL response cache of slow-changing routes, disabled if None
+        :param revalidation: ETag / Last-Modified revalidation of polled routes, disabled if None
+        :param compression: response encoding negotiation and gzip request bodies, httpx defaults if None
+        :param middlewares: custom middlewares, run once per attempt
+        :param failover: equivalent API endpoints to fail over between, disabled if None
+        :param sandbox_registry: metadata of sandboxes by id, for Sandbox.get_metadata, disabled if None
         """
         # Reuse the base client initialization from lybic.base
-        # pylint: disable=import-outside-toplevel
-        from lybic.base import _LybicBaseClient
         base_client = _LybicBaseClient(
             auth=auth,
             timeout=timeout,
-            max_retries=max_retries
+            max_retries=max_retries,
+            transport=transport,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter,
+            cache=cache,
+            revalidation=revalidation,
+            compression=compression,
+            middlewares=middlewares,
+            failover=failover,
+            sandbox_registry=sandbox_registry,
         )
 
         self.auth = base_client.auth
         self.timeout = base_client.timeout
         self.max_retries = base_client.max_retries
+        self.retry_policy = base_client.retry_policy
+        self.transport_config = base_client.transport_config
+        self.circuit_breaker = base_client.circuit_breaker
+        self.rate_limiter = base_client.rate_limiter
+        self.concurrency_limiter = base_client.concurrency_limiter
+        self.cache = base_client.cache
+        self.revalidation = base_client.revalidation
+        self.compression = base_client.compression
+        self.failover = base_client.failover
+        self.sandbox_registry = base_client.sandbox_registry
+        self.middlewares = base_client.middlewares
         self.logger = logging.getLogger(__name__)
 
-    @property
-    def headers(self):
-        """
-        Get headers for requests
-
-        :return:
-        """
-        return self.auth.headers
-
-    @property
-    def endpoint(self):
-        """
-        Get endpoint for requests
-
-        :return:
-        """
-        return self.auth.endpoint
-
-    @property
-    def org_id(self):
-        """
-        Get org_id for requests
-
-        :return:
-        """
-        return self.auth.org_id
-
-    @property
-    def _api_key(self):
-        return self.auth.api_key
-
-    def make_mcp_endpoint(self, mcp_server_id: str) -> str:
-        """
-        Make MCP endpoint for a MCP server
-
-        :param mcp_server_id:
-        :return:
-        """
-        return f"{self.endpoint}/api/mcp/{mcp_server_id}"
+    # the request helpers are those of the async base client, so that both clients prepare calls the same way
+    _context = _LybicBaseClient._context  # pylint: disable=protected-access
+    _request_key = _LybicBaseClient._request_key  # pylint: disable=protected-access
+    parse = _LybicBaseClient.parse
+    headers = _LybicBaseClient.headers
+    endpoint = _LybicBaseClient.endpoint
+    org_id = _LybicBaseClient.org_id
+    _api_key = _LybicBaseClient._api_key
+    make_mcp_endpoint = _LybicBaseClient.make_mcp_endpoint
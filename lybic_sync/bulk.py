@@ -0,0 +1,93 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""bulk.py runs synchronous bulk operations on a bounded thread pool."""
+import contextvars
+import itertools
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar, TYPE_CHECKING
+
+from lybic.bulk import DEFAULT_BULK_CONCURRENCY, BulkReport, BulkResult
+
+if TYPE_CHECKING:
+    from lybic_sync.lybic_sync import LybicSyncClient
+
+T = TypeVar("T")
+
+
+class BulkOperationSync(Generic[T]):
+    """
+    A bulk operation of LybicSyncClient: one call per item, at most `concurrency` in flight on the thread pool of
+    the client, so `max_workers` of the client bounds all bulk operations together.
+
+    Call `wait()` for the BulkReport, or iterate over it to get each BulkResult as soon as its call finishes.
+    The calls see the deadline of the caller.
+    """
+
+    def __init__(self, client: "LybicSyncClient", items: Iterable[Any], function: Callable[[Any], T],
+                 concurrency: int = DEFAULT_BULK_CONCURRENCY):
+        """
+        :param client: the client whose thread pool runs the calls
+        :param items: specs or ids
+        :param function: the call of one item
+        :param concurrency: maximum number of calls in flight
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.items = list(items)
+        self.function = function
+        self.concurrency = concurrency
+
+    def _run(self, index: int, item: Any) -> BulkResult[T]:
+        try:
+            return BulkResult(index, item, value=self.function(item))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return BulkResult(index, item, error=e)
+
+    def __iter__(self) -> Iterator[BulkResult[T]]:
+        context = contextvars.copy_context()
+        pending = enumerate(self.items)
+        running = set()
+
+        def start(count: int):
+            for index, item in itertools.islice(pending, count):
+                running.add(self.client.submit(context.copy().run, self._run, index, item))
+
+        try:
+            start(self.concurrency)
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                start(len(done))
+                for future in done:
+                    yield future.result()
+        finally:
+            # leaving early starts no more calls, and waits for those in flight
+            wait(running)
+
+    def wait(self) -> BulkReport[T]:
+        """Run every call and get the report"""
+        return BulkReport(list(self))
@@ -25,14 +25,28 @@
 # THE SOFTWARE.
 
 """lybic_sync.py is the main entry point for synchronous Lybic API."""
-import json
-import time
-from typing import Optional
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, TypeVar
 
 import httpx
 
 from lybic.authentication import LybicAuth
-from lybic.exceptions import LybicAPIError, LybicInternalError
+from lybic.exceptions import LybicDeadlineExceededError
+from lybic.fork import register_after_fork
+from lybic.cache import ResponseCache, RevalidationCache
+from lybic.circuit_breaker import CircuitBreaker
+from lybic.compression import Compression
+from lybic.concurrency import AdaptiveConcurrencyLimiter
+from lybic.deadline import Deadline, TimeoutTypes
+from lybic.failover import EndpointSelector
+from lybic.rate_limit import RateLimiter
+from lybic.retry import RetryPolicy
+from lybic.sandbox_registry import SandboxRegistry
+from lybic.middleware import CallNext, Middleware, RequestContext, build_chain
+from lybic.transport import TransportConfig, PooledTransport
+from lybic.warmup import warmup_reports, warmup_request, warmup_targets
 from lybic_sync.base import _LybicSyncBaseClient
 from lybic_sync.mcp import McpSync
 from lybic_sync.project import ProjectSync
@@ -41,14 +55,33 @@ from lybic_sync.stats import StatsSync
 from lybic_sync.stream_shell import StreamShellSync
 from lybic_sync.tools import ToolsSync
 
+T = TypeVar("T")
+
 
 class LybicSyncClient(_LybicSyncBaseClient):
-    """LybicSyncClient is a synchronous client for all Lybic API."""
+    """
+    LybicSyncClient is a synchronous client for all Lybic API.
+
+    One instance is safe to share between threads, which then share its connection pools. Use `submit` and `map`
+    to run calls on the thread pool managed by the client.
+    """
 
-    def __init__(self,
+    def __init__(self,  # pylint: disable=too-many-locals
                  auth: Optional[LybicAuth] = None,
-                 timeout: int = 10,
+                 timeout: TimeoutTypes = 10,
                  max_retries: int = 3,
+                 transport: Optional[TransportConfig] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 revalidation: Optional[RevalidationCache] = None,
+                 compression: Optional[Compression] = None,
+                 middlewares: Optional[list[Middleware]] = None,
+                 max_workers: Optional[int] = None,
+                 failover: Optional[EndpointSelector] = None,
+                 sandbox_registry: Optional[SandboxRegistry] = None,
                  ):
         """
         Init lybic sync client with org_id, api_key and endpoint
@@ -57,16 +90,44 @@ class LybicSyncClient(_LybicSyncBaseClient):
         :param org_id:
         :param api_key:
         :param endpoint:
-        :param timeout:
         :param extra_headers:
+        :param timeout: seconds, or httpx.Timeout with separate connect/read/write/pool timeouts
         :param max_retries: maximum number of retries for failed requests
+        :param transport: connection pool limits, keep-alive, HTTP/2 and custom transport settings
+        :param retry_policy: retry policy (jitter, Retry-After, retryable statuses, retry budget), overrides max_retries
+        :param circuit_breaker: fail fast while an endpoint and route keeps failing, disabled if None
+        :param rate_limiter: token-bucket limiter per org and route class, shared by all workers of an org
+        :param concurrency_limiter: AIMD limiter of in-flight requests, adapting to latency and overload errors
+        :param cache: TTL response cache of slow-changing routes (shapes, machine images, MCP servers, projects)
+        :param revalidation: send If-None-Match / If-Modified-Since for polled routes and reuse the DTO on 304
+        :param compression: negotiate gzip/brotli/zstd responses, gzip large request bodies and count the bytes saved
+        :param middlewares: custom middlewares run on every attempt (timing, tracing, headers, fault injection)
+        :param max_workers: threads of the executor behind submit() and map(), defaults to the max_connections of
+            the transport (or 32 when unlimited)
+        :param failover: send each attempt to the fastest healthy of several equivalent API endpoints, failing over
+            between them, disabled if None
+        :param sandbox_registry: keep sandbox metadata (shape, connection details) by id, so that OS checks and
+            connection details are not fetched on every call, disabled if None
         """
         super().__init__(
-            auth=auth, timeout=timeout, max_retries=max_retries
+            auth=auth, timeout=timeout, max_retries=max_retries, transport=transport,
+            retry_policy=retry_policy, circuit_breaker=circuit_breaker, rate_limiter=rate_limiter,
+            concurrency_limiter=concurrency_limiter, cache=cache, revalidation=revalidation,
+            compression=compression, middlewares=middlewares, failover=failover,
+            sandbox_registry=sandbox_registry,
         )
 
         self.client: httpx.Client | None = None
+        self.transport = PooledTransport(
+            self.transport_config, self.endpoint, self.auth.agent_service_endpoint,
+            failover.endpoints if failover is not None else None)
         self._in_context = False
+        self._chain = None
+        # guards the lazy creation of the httpx client and the executor, the client is shared by all threads
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self.max_workers = max_workers or self.transport_config.max_connections or 32
+        register_after_fork(self)
 
         self.sandbox = SandboxSync(self)
         self.project = ProjectSync(self)
@@ -75,19 +136,76 @@ class LybicSyncClient(_LybicSyncBaseClient):
         self.tools = ToolsSync(self)
         self.stream_shell = StreamShellSync(self)
 
+    def _after_fork(self):
+        # the httpx client and the executor threads of the parent are dropped, the child creates its own
+        self.client = None
+        self._executor = None
+        self._lock = threading.Lock()
+
     def _ensure_client_is_open(self):
-        if self.client is None:
-            self.client = httpx.Client(headers=self.headers, timeout=self.timeout)
-        elif self.client.is_closed:
+        client = self.client
+        if client is None:
+            with self._lock:
+                if self.client is None:
+                    self.client = httpx.Client(timeout=self.timeout, transport=self.transport)
+                client = self.client
+        if client.is_closed:
             raise RuntimeError("The client has been closed and cannot be reused. Please create a new client instance.")
 
-    def __enter__(self):
-        if self._in_context:
-            raise RuntimeError("Cannot re-enter context.")
-        if self.client and not self.client.is_closed:
-            raise RuntimeError("Cannot enter context with an already-active client.")
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        self._ensure_client_is_open()
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="lybic-sync")
+        return self._executor
 
-        self._in_context = True
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> "Future[T]":
+        """
+        Run a call of this client on the managed thread pool
+
+        The call sees the deadline of the caller, e.g. `client.submit(client.sandbox.get, sandbox_id)`.
+
+        :param fn: a method of this client, or any function using it
+        :param args:
+        :param kwargs:
+        :return: the future of the call
+        """
+        return self._ensure_executor().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    def map(self, fn: Callable[..., T], *iterables, timeout: Optional[float] = None) -> Iterator[T]:
+        """
+        Run calls of this client concurrently on the managed thread pool, like `ThreadPoolExecutor.map`
+
+        e.g. `client.map(client.sandbox.get_status, sandbox_ids)`
+
+        :param fn: a method of this client, or any function using it
+        :param iterables: the arguments of each call
+        :param timeout: seconds to wait for all results
+        :return: the results, in order; the first failed call raises its error when reached
+        """
+        context = contextvars.copy_context()
+        return self._ensure_executor().map(lambda *args: context.copy().run(fn, *args), *iterables, timeout=timeout)
+
+    def make_http_client(self, **kwargs) -> httpx.Client:
+        """
+        Create an httpx.Client that shares the connection pools of this client.
+        Closing the returned client does not close the shared pools.
+
+        :param kwargs: extra arguments for httpx.Client
+        :return:
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return httpx.Client(transport=self.transport.shared(), **kwargs)
+
+    def __enter__(self):
+        with self._lock:
+            if self._in_context:
+                raise RuntimeError("Cannot re-enter context.")
+            if self.client and not self.client.is_closed:
+                raise RuntimeError("Cannot enter context with an already-active client.")
+            self._in_context = True
         self._ensure_client_is_open()
         return self
 
@@ -96,88 +214,116 @@ class LybicSyncClient(_LybicSyncBaseClient):
         self.close()
 
     def close(self):
-        """Close the underlying httpx.Client."""
+        """Wait for the calls submitted to the thread pool, then close the underlying httpx.Client."""
         if self._in_context:
             return
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
         if self.client:
             self.client.close()
 
+    def warmup(self, connections: int = 4, urls: Optional[list[str]] = None) -> list[dict]:
+        """
+        Open keep-alive connections ahead of the first call, e.g. before an autoscaled worker gets traffic
+
+        `connections` concurrent HEAD requests, without credentials, are sent to the API endpoint, the agent
+        service endpoint and each of `urls` (e.g. the screenshot host), so the DNS, TCP and TLS setup is paid
+        here. Connections are capped by the keep-alive limit of each pool; HTTP/2 pools open one.
+
+        :param connections: connections to open per host
+        :param urls: other hosts to warm up, only their origin is used
+        :return: one report per host: {"url", "connections", "failed", "seconds", "error"}
+        """
+        self._ensure_client_is_open()
+        targets = warmup_targets(self.transport, [self.endpoint, self.auth.agent_service_endpoint, *(urls or ())],
+                                 connections)
+        requests = [origin for origin, count in targets for _ in range(count)]
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            outcomes = list(executor.map(lambda origin: warmup_request(self.client, origin, self.timeout), requests))
+        return warmup_reports(targets, outcomes)
+
+    def probe_endpoints(self) -> list[dict]:
+        """
+        Measure the latency of every failover endpoint with one HEAD request each, without credentials
+
+        Traffic keeps the measures up to date; probing ranks the endpoints before the first calls, or again
+        after a network change.
+
+        :return: the state of every endpoint, best first, see EndpointSelector.snapshot
+        """
+        if self.failover is None:
+            raise RuntimeError("No failover endpoints are configured.")
+        self._ensure_client_is_open()
+        endpoints = self.failover.endpoints
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            outcomes = list(executor.map(lambda endpoint: warmup_request(self.client, endpoint, self.timeout),
+                                         endpoints))
+        for endpoint, (seconds, error) in zip(endpoints, outcomes):
+            self.failover.record(endpoint, seconds, error)
+        return self.failover.snapshot()
+
+    def download(self, url: str) -> httpx.Response:
+        """
+        Download an absolute url, such as a screenshot, through the shared connection pools.
+        Lybic credentials are not sent.
+
+        :param url:
+        :return:
+        :raises httpx.HTTPStatusError: When the download fails
+        """
+        self._ensure_client_is_open()
+        response = self.client.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _send(self, context: RequestContext) -> httpx.Response:
+        """The terminal step of the middleware chain: send one HTTP request"""
+        kwargs = context.kwargs
+        deadline = context.deadline
+        if deadline is not None and "timeout" not in kwargs:
+            kwargs = dict(kwargs, timeout=deadline.timeout(self.timeout))
+        try:
+            response = self.client.request(context.method, context.url, **kwargs)
+        except httpx.TimeoutException as e:
+            # timeouts are clamped to the deadline, allow for timer granularity
+            if deadline is None or deadline.remaining() > 0.01:
+                raise
+            raise LybicDeadlineExceededError(deadline.seconds) from e
+        if response.status_code != 304:
+            response.raise_for_status()
+        response.extensions["lybic_context"] = context
+        return response
+
+    def _pipeline(self) -> CallNext:
+        middlewares = tuple(self.middlewares)
+        if self._chain is None or self._chain[0] != middlewares:
+            self._chain = middlewares, build_chain(list(middlewares), self._send, sync=True)
+        return self._chain[1]
+
     def request(self, method: str, path: str, **kwargs) -> httpx.Response:
         """
         Make a request to Lybic Restful API
 
+        The call runs through `self.middlewares`: with a cache, GET requests of cached routes are served
+        from the cache while fresh, and mutations invalidate the routes they make stale. With revalidation,
+        GET requests of polled routes are sent as conditional requests and a 304 Not Modified returns the
+        previous response.
+
         :param method:
         :param path:
-        :param kwargs:
+        :param kwargs: extra arguments for httpx, plus `deadline`: seconds for the whole call, retries included
         :return:
         :raises LybicAPIError: When API returns structured error response
         :raises LybicInternalError: When 5xx error occurs from reverse proxy
         :raises httpx.RequestError: When network-level error occurs
+        :raises LybicDeadlineExceededError: When the call does not complete before its deadline
         """
-        self._ensure_client_is_open()
+        deadline = kwargs.pop("deadline", None)
+        if deadline is not None:
+            with Deadline(deadline):
+                return self.request(method, path, **kwargs)
 
-        url = f"{self.endpoint}{path}"
-        headers = self.headers.copy()
-        if method.upper() != "POST":
-            headers.pop("Content-Type", None)
-
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = self.client.request(method, url, headers=headers, **kwargs)
-                response.raise_for_status()
-                return response
-            except httpx.HTTPStatusError as e:
-                # Check if this is the last attempt
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                    last_exception = e
-                    time.sleep(2 ** attempt)
-                    continue
-
-                # Last attempt, convert to custom exception
-                self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-
-                # Check if it's a 5xx error from reverse proxy
-                if e.response.status_code >= 500:
-                    # Try to parse JSON response
-                    try:
-                        error_data = e.response.json()
-                        if isinstance(error_data, dict) and "message" in error_data:
-                            # Structured API error response
-                            raise LybicAPIError(
-                                message=error_data.get("message", "Unknown error"),
-                                code=error_data.get("code"),
-                                status_code=e.response.status_code,
-                            ) from e
-                    except (json.JSONDecodeError, ValueError):
-                        # Not a JSON response, likely HTML from reverse proxy
-                        pass
-
-                    # If we got here, it's a reverse proxy error
-                    raise LybicInternalError(status_code=e.response.status_code) from e
-
-                # For 4xx errors, try to parse structured error response
-                try:
-                    error_data = e.response.json()
-                    if isinstance(error_data, dict) and "message" in error_data:
-                        raise LybicAPIError(
-                            message=error_data.get("message", "Unknown error"),
-                            code=error_data.get("code"),
-                            status_code=e.response.status_code,
-                        ) from e
-                except (json.JSONDecodeError, ValueError):
-                    # Not a JSON response, re-raise original exception
-                    pass
-
-                # If we couldn't parse it as a structured error, re-raise original
-                raise
-            except httpx.RequestError as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    self.logger.debug(f"Request failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
-                else:
-                    self.logger.error("Request failed after %d attempts", self.max_retries + 1)
-                time.sleep(2 ** attempt)
-
-        raise last_exception
+        self._ensure_client_is_open()
+        return self._pipeline()(self._context(method, path, kwargs))
@@ -28,6 +28,7 @@
 from typing import overload, TYPE_CHECKING
 
 from lybic import dto
+from lybic.log import log_body, log_model
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -53,8 +54,8 @@ class McpSync:
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/mcp-servers")
-        self.client.logger.debug(f"List MCP servers response: {response.text}")
-        return dto.ListMcpServerResponse.model_validate_json(response.text)
+        self.client.logger.debug("List MCP servers response: %s", log_body(response))
+        return self.client.parse(response, dto.ListMcpServerResponse)
 
     @overload
     def create(self, data: dto.CreateMcpServerDto) -> dto.McpServerResponseDto: ...
@@ -75,13 +76,13 @@ class McpSync:
             data = kwargs["data"]
         else:
             data = dto.CreateMcpServerDto(**kwargs)
-        self.client.logger.debug(f"Create MCP server request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Create MCP server request: %s", log_model(data))
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/mcp-servers",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create MCP server response: {response.text}")
-        return dto.McpServerResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create MCP server response: %s", log_body(response))
+        return self.client.parse(response, dto.McpServerResponseDto)
 
     def get_default(self) -> dto.McpServerResponseDto:
         """
@@ -93,8 +94,8 @@ class McpSync:
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/mcp-servers/default")
-        self.client.logger.debug(f"Get default MCP server response: {response.text}")
-        return dto.McpServerResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get default MCP server response: %s", log_body(response))
+        return self.client.parse(response, dto.McpServerResponseDto)
 
     def delete(self, mcp_server_id: str) -> None:
         """
@@ -103,7 +104,7 @@ class McpSync:
         :param mcp_server_id:
         :return:
         """
-        self.client.logger.debug(f"Delete MCP server request: {mcp_server_id}")
+        self.client.logger.debug("Delete MCP server request: %s", mcp_server_id)
         self.client.request("DELETE", f"/api/orgs/{self.client.org_id}/mcp-servers/{mcp_server_id}")
 
     def set_sandbox(self, mcp_server_id: str, sandbox_id: str) -> None:
@@ -115,8 +116,8 @@ class McpSync:
         :return: None
         """
         data = dto.SetMcpServerToSandboxResponseDto(sandboxId=sandbox_id)
-        self.client.logger.debug(f"Set MCP server to sandbox request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Set MCP server to sandbox request: %s", log_model(data))
         self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/mcp-servers/{mcp_server_id}/sandbox",
-            json=data.model_dump(exclude_none=True))
+            json=data)
@@ -28,6 +28,7 @@
 from typing import overload, TYPE_CHECKING
 
 from lybic import dto
+from lybic.log import log_body
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -45,8 +46,8 @@ class ProjectSync:
         """
         self.client.logger.debug("Listing projects request")
         response = self.client.request("GET", f"/api/orgs/{self.client.org_id}/projects")
-        self.client.logger.debug("Listing projects response: %s", response.text)
-        return dto.ListProjectsResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Listing projects response: %s", log_body(response))
+        return self.client.parse(response, dto.ListProjectsResponseDto)
 
     @overload
     def create(self, data: dto.CreateProjectDto) -> dto.SingleProjectResponseDto: ...
@@ -65,9 +66,9 @@ class ProjectSync:
         self.client.logger.debug("Creating project request with data: %s", data)
         response = self.client.request(
             "POST",
-            f"/api/orgs/{self.client.org_id}/projects", json=data.model_dump(exclude_none=True))
-        self.client.logger.debug("Create project response: %s", response.text)
-        return dto.SingleProjectResponseDto.model_validate_json(response.text)
+            f"/api/orgs/{self.client.org_id}/projects", json=data)
+        self.client.logger.debug("Create project response: %s", log_body(response))
+        return self.client.parse(response, dto.SingleProjectResponseDto)
 
     def delete(self, project_id: str) -> None:
         """
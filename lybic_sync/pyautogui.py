@@ -60,6 +60,7 @@ pyautogui.hotkey('ctrl', 'c')
 pyautogui.scroll(100)
 pyautogui.dragTo(500, 500)
 """
+import copy
 import logging
 import re
 from typing import overload, Optional, List, Union, TYPE_CHECKING
@@ -118,6 +119,7 @@ class PyautoguiSync:
                 ),
                 timeout=client.timeout,
                 max_retries=client.max_retries,
+                sandbox_registry=client.sandbox_registry,
             )
         else:
             raise TypeError("client must be either LybicClient or LybicSyncClient")
@@ -134,7 +136,7 @@ class PyautoguiSync:
         pass
 
     def _sandbox_is_mobile(self) -> bool:
-        sandbox = self.sandbox.get(self.sandbox_id)
+        sandbox = self.sandbox.get_metadata(self.sandbox_id)
         return sandbox.sandbox.shape.os == "Android"
 
     @staticmethod
@@ -170,9 +172,10 @@ class PyautoguiSync:
         Returns:
             PyautoguiSync: A new PyautoguiSync object with the specified sandbox ID.
         """
-        if sandbox_id is not None:
+        if sandbox_id is not None and sandbox_id != self.sandbox_id:
             return PyautoguiSync(self.client, sandbox_id)
-        return PyautoguiSync(self.client, self.sandbox_id)
+        # same sandbox: its OS is already known, no need to fetch it again
+        return copy.copy(self)
 
     def position(self) -> tuple[int, int]:
         """
@@ -276,7 +279,7 @@ class PyautoguiSync:
         if x is None or y is None:
             x, y = self.position()
 
-        self.logger.info(f"click(x={x}, y={y}, clicks={clicks}, button='{button}')")
+        self.logger.info("click(x=%s, y=%s, clicks=%s, button='%s')", x, y, clicks, button)
         code = f"""```python
         pyautogui.click(x={x}, y={y}, clicks={clicks}, interval={interval}, button='{button}', duration={duration}, tween={tween}, logScreenshot={logScreenshot}, _pause={_pause})
         ```"""
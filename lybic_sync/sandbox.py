@@ -28,16 +28,16 @@
 
 """sandbox.py provides the synchronous Sandbox API"""
 import base64
-import json
 from io import BytesIO
-from typing import Tuple, overload, TYPE_CHECKING, Literal
-
-import httpx
+from typing import Iterable, Optional, Tuple, Union, overload, TYPE_CHECKING, Literal
 
 from PIL import Image
 from PIL.WebPImagePlugin import WebPImageFile
 
 from lybic import dto
+from lybic.bulk import DEFAULT_BULK_CONCURRENCY
+from lybic.log import log_body, log_model
+from lybic_sync.bulk import BulkOperationSync
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -55,8 +55,11 @@ class SandboxSync:
         """
         self.client.logger.debug("Listing sandboxes requests")
         response = self.client.request("GET", f"/api/orgs/{self.client.org_id}/sandboxes")
-        self.client.logger.debug(f"Listing sandboxes response: {response.text}")
-        return dto.SandboxListResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Listing sandboxes response: %s", log_body(response))
+        sandboxes = self.client.parse(response, dto.SandboxListResponseDto)
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.refresh(sandboxes, self.client.org_id)
+        return sandboxes
 
     @overload
     def create(self, data: dto.CreateSandboxDto) -> dto.Sandbox: ...
@@ -74,43 +77,65 @@ class SandboxSync:
             data = kwargs["data"]
         else:
             data = dto.CreateSandboxDto(**kwargs)
-        self.client.logger.debug(f"Creating sandbox with data: {data}")
+        self.client.logger.debug("Creating sandbox with data: %s", data)
         response = self.client.request(
             "POST",
-            f"/api/orgs/{self.client.org_id}/sandboxes", json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create sandbox response: {response.text}")
-        return dto.Sandbox.model_validate_json(response.text)
+            f"/api/orgs/{self.client.org_id}/sandboxes", json=data)
+        self.client.logger.debug("Create sandbox response: %s", log_body(response))
+        return self.client.parse(response, dto.Sandbox)
 
     def get(self, sandbox_id: str) -> dto.GetSandboxResponseDto:
         """
         Get a sandbox
         """
-        self.client.logger.debug(f"Get sandbox {sandbox_id}")
+        self.client.logger.debug("Get sandbox %s", sandbox_id)
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}")
-        self.client.logger.debug(f"Get sandbox response: {response.text}")
-        return dto.GetSandboxResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get sandbox response: %s", log_body(response))
+        details = self.client.parse(response, dto.GetSandboxResponseDto)
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.put(details, self.client.org_id)
+        return details
+
+    def get_metadata(self, sandbox_id: str) -> dto.GetSandboxResponseDto:
+        """
+        Get a sandbox from the sandbox registry of the client, fetching it on a miss
+
+        Use it to read what does not change while the sandbox lives (shape, OS, connection details); use `get`
+        for the current status. Without a sandbox registry, this is `get`.
+        """
+        registry = self.client.sandbox_registry
+        if registry is not None:
+            details = registry.get(sandbox_id)
+            if details is not None:
+                return details
+        return self.get(sandbox_id)
 
     def delete(self, sandbox_id: str) -> None:
         """
         Delete a sandbox
         """
-        self.client.logger.debug(f"Delete sandbox {sandbox_id}")
+        self.client.logger.debug("Delete sandbox %s", sandbox_id)
         self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}")
+        self._invalidate(sandbox_id)
+
+    def _invalidate(self, sandbox_id: str):
+        if self.client.sandbox_registry is not None:
+            self.client.sandbox_registry.invalidate(sandbox_id)
 
     def preview(self, sandbox_id: str) -> dto.SandboxActionResponseDto:
         """
         Preview a sandbox
         """
-        self.client.logger.debug(f"Previewing sandbox {sandbox_id}")
+        self.client.logger.debug("Previewing sandbox %s", sandbox_id)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/preview")
-        self.client.logger.debug(f"Previewed sandbox {sandbox_id}")
-        return dto.SandboxActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Previewed sandbox %s", sandbox_id)
+        return self.client.parse(response, dto.SandboxActionResponseDto)
 
     def extend_life(self, sandbox_id: str, seconds: int = 3600) -> None:
         """Extend the life of a sandbox.
@@ -123,18 +148,19 @@ class SandboxSync:
                      than 30 seconds or more than 24 hours. Note that the total maximum lifetime of a sandbox should
                      not longer than 13 days.
         """
-        self.client.logger.debug(f"Extending life of sandbox {sandbox_id}")
+        self.client.logger.debug("Extending life of sandbox %s", sandbox_id)
         data = dto.ExtendSandboxDto(maxLifeSeconds=seconds)
         self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/extend",
-            json=data.model_dump(exclude_none=True))
+            json=data)
+        self._invalidate(sandbox_id)
 
     def get_connection_details(self, sandbox_id: str)-> dto.ConnectDetails:
         """
         Get stream connection details for a sandbox
         """
-        sandbox = self.get(sandbox_id)
+        sandbox = self.get_metadata(sandbox_id)
         return sandbox.connectDetails
 
     def get_screenshot(self, sandbox_id: str) -> Tuple[str, Image.Image, str]:
@@ -146,20 +172,15 @@ class SandboxSync:
         result = self.preview(sandbox_id)
         screenshot_url = result.screenShot
 
-        with httpx.Client() as client:
-            screenshot_response = client.get(
-                screenshot_url,
-                timeout=self.client.timeout
-            )
-            screenshot_response.raise_for_status()
+        screenshot_response = self.client.download(screenshot_url)
 
-            img = Image.open(BytesIO(screenshot_response.content))
-            base64_str=''
+        img = Image.open(BytesIO(screenshot_response.content))
+        base64_str=''
 
-            if isinstance(img, WebPImageFile):
-                buffer = BytesIO()
-                img.save(buffer, format="WebP")
-                base64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        if isinstance(img, WebPImageFile):
+            buffer = BytesIO()
+            img.save(buffer, format="WebP")
+            base64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
 
         return screenshot_url,img,base64_str
 
@@ -182,11 +203,11 @@ class SandboxSync:
             "GET",
             f"/api/orgs/{self.client.org_id}/shapes"
         )
-        self.client.logger.debug(f"Get shapes response: {response.text}")
-        return dto.GetShapesResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get shapes response: %s", log_body(response))
+        return self.client.parse(response, dto.GetShapesResponseDto)
 
     @overload
-    def execute_sandbox_action(self, sandbox_id: str, data: dto.ExecuteSandboxActionDto) -> dto.SandboxActionResponseDto: ...
+    def execute_sandbox_action(self, sandbox_id: str, data: dto.ExecuteSandboxActionDto, deadline: Optional[float] = None) -> dto.SandboxActionResponseDto: ...
 
     @overload
     def execute_sandbox_action(self, sandbox_id: str, **kwargs) -> dto.SandboxActionResponseDto: ...
@@ -195,7 +216,10 @@ class SandboxSync:
         """
         Executes a computer use or mobile use action on the sandbox.
         The action can be either a computer use or mobile use action.
+
+        :param deadline: seconds for the whole call, retries included
         """
+        deadline = kwargs.pop("deadline", None)
         if args and isinstance(args[0], dto.ExecuteSandboxActionDto):
             data = args[0]
         elif "data" in kwargs:
@@ -208,12 +232,12 @@ class SandboxSync:
                 raise TypeError(f"The 'data' argument must be of type {dto.ExecuteSandboxActionDto.__name__} or dict")
         else:
             data = dto.ExecuteSandboxActionDto(**kwargs)
-        self.client.logger.debug(f"Execute sandbox action request: {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Execute sandbox action request: %s", log_model(data))
         response = self.client.request("POST",
                                              f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/actions/execute",
-                                             json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Execute sandbox action response: {response.text}")
-        return dto.SandboxActionResponseDto.model_validate_json(response.text)
+                                             json=data, deadline=deadline)
+        self.client.logger.debug("Execute sandbox action response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxActionResponseDto)
 
     @overload
     def copy_files(self, sandbox_id: str, data: dto.SandboxFileCopyRequestDto) -> dto.SandboxFileCopyResponseDto: ...
@@ -237,16 +261,16 @@ class SandboxSync:
                 raise TypeError(f"The 'data' argument must be of type {dto.SandboxFileCopyRequestDto.__name__} or dict")
         else:
             data = dto.SandboxFileCopyRequestDto(**kwargs)
-        self.client.logger.debug(f"Copying files for sandbox {sandbox_id} with data {data.model_dump_json(exclude_none=True)}")
+        self.client.logger.debug("Copying files for sandbox %s with data %s", sandbox_id, log_model(data))
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/file/copy",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Copy files response: {response.text}")
-        return dto.SandboxFileCopyResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Copy files response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxFileCopyResponseDto)
 
     @overload
-    def execute_process(self, sandbox_id: str, data: dto.SandboxProcessRequestDto) -> dto.SandboxProcessResponseDto: ...
+    def execute_process(self, sandbox_id: str, data: dto.SandboxProcessRequestDto, deadline: Optional[float] = None) -> dto.SandboxProcessResponseDto: ...
 
     @overload
     def execute_process(self, sandbox_id: str, **kwargs) -> dto.SandboxProcessResponseDto: ...
@@ -254,7 +278,10 @@ class SandboxSync:
     def execute_process(self, sandbox_id: str, *args, **kwargs) -> dto.SandboxProcessResponseDto:
         """
         Execute a process inside sandbox.
+
+        :param deadline: seconds for the whole call, retries included
         """
+        deadline = kwargs.pop("deadline", None)
         if args and isinstance(args[0], dto.SandboxProcessRequestDto):
             data = args[0]
         elif "data" in kwargs:
@@ -267,13 +294,13 @@ class SandboxSync:
                 raise TypeError(f"The 'data' argument must be of type {dto.SandboxProcessRequestDto.__name__} or dict")
         else:
             data = dto.SandboxProcessRequestDto(**kwargs)
-        self.client.logger.debug(f"Executing process in sandbox {sandbox_id}")
+        self.client.logger.debug("Executing process in sandbox %s", sandbox_id)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/process",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Execute process response: {response.text}")
-        return dto.SandboxProcessResponseDto.model_validate_json(response.text)
+            json=data, deadline=deadline)
+        self.client.logger.debug("Execute process response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxProcessResponseDto)
 
     @overload
     def create_from_image(self, data: dto.CreateSandboxFromImageDto) -> dto.CreateSandboxFromImageResponseDto: ...
@@ -291,25 +318,24 @@ class SandboxSync:
             data = kwargs["data"]
         else:
             data = dto.CreateSandboxFromImageDto(**kwargs)
-        self.client.logger.debug(f"Creating sandbox from image with data: {data}")
+        self.client.logger.debug("Creating sandbox from image with data: %s", data)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/from-image",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create sandbox from image response: {response.text}")
-        return dto.CreateSandboxFromImageResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create sandbox from image response: %s", log_body(response))
+        return self.client.parse(response, dto.CreateSandboxFromImageResponseDto)
 
     def get_status(self, sandbox_id: str) -> dto.SandboxStatus:
         """
         Get the status of a sandbox (PENDING/RUNNING/STOPPED/ERROR)
         """
-        self.client.logger.debug(f"Getting status for sandbox {sandbox_id}")
+        self.client.logger.debug("Getting status for sandbox %s", sandbox_id)
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/status")
-        self.client.logger.debug(f"Get sandbox status response: {response.text}")
-        json_response = json.loads(response.text)
-        return json_response['status']
+        self.client.logger.debug("Get sandbox status response: %s", log_body(response))
+        return self.client.parse(response, dto.SandboxStatusResponseDto).status
 
     @overload
     def create_machine_image(self, data: dto.CreateMachineImageDto) -> dto.MachineImageResponseDto: ...
@@ -327,13 +353,13 @@ class SandboxSync:
             data = kwargs["data"]
         else:
             data = dto.CreateMachineImageDto(**kwargs)
-        self.client.logger.debug(f"Creating machine image with data: {data}")
+        self.client.logger.debug("Creating machine image with data: %s", data)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/machine-images",
-            json=data.model_dump(exclude_none=True))
-        self.client.logger.debug(f"Create machine image response: {response.text}")
-        return dto.MachineImageResponseDto.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create machine image response: %s", log_body(response))
+        return self.client.parse(response, dto.MachineImageResponseDto)
 
     def list_machine_images(self, scope: Literal["org", "public", "all"] = "org") -> dto.MachineImagesResponseDto:
         """List all machine images.
@@ -345,14 +371,14 @@ class SandboxSync:
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/machine-images", params={"scope": scope})
-        self.client.logger.debug(f"List machine images response: {response.text}")
-        return dto.MachineImagesResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("List machine images response: %s", log_body(response))
+        return self.client.parse(response, dto.MachineImagesResponseDto)
 
     def delete_machine_image(self, image_id: str) -> None:
         """
         Delete a machine image
         """
-        self.client.logger.debug(f"Deleting machine image {image_id}")
+        self.client.logger.debug("Deleting machine image %s", image_id)
         self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/machine-images/{image_id}")
@@ -361,10 +387,51 @@ class SandboxSync:
         """
         Restart a sandbox
         """
-        self.client.logger.debug(f"Restarting sandbox {sandbox_id}")
+        self.client.logger.debug("Restarting sandbox %s", sandbox_id)
         self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/restart")
+        self._invalidate(sandbox_id)
+
+    def create_many(self, specs: Iterable[Union[dto.CreateSandboxDto, dto.CreateSandboxFromImageDto, dict]],
+                    concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperationSync[dto.Sandbox]:
+        """
+        Create many sandboxes, at most `concurrency` at once
+
+        :param specs: CreateSandboxDto, CreateSandboxFromImageDto, or the keyword arguments of `create`
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperationSync, call wait() for the report or iterate over the results as they finish
+        """
+        return BulkOperationSync(self.client, specs, self._create_spec, concurrency)
+
+    def _create_spec(self, spec) -> dto.Sandbox:
+        if isinstance(spec, dto.CreateSandboxFromImageDto):
+            return self.create_from_image(spec).sandbox
+        if isinstance(spec, dto.CreateSandboxDto):
+            return self.create(spec)
+        return self.create(**spec)
+
+    def delete_many(self, sandbox_ids: Iterable[str],
+                    concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperationSync[None]:
+        """
+        Delete many sandboxes, at most `concurrency` at once
+
+        :param sandbox_ids:
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperationSync, call wait() for the report or iterate over the results as they finish
+        """
+        return BulkOperationSync(self.client, sandbox_ids, self.delete, concurrency)
+
+    def restart_many(self, sandbox_ids: Iterable[str],
+                     concurrency: int = DEFAULT_BULK_CONCURRENCY) -> BulkOperationSync[None]:
+        """
+        Restart many sandboxes, at most `concurrency` at once
+
+        :param sandbox_ids:
+        :param concurrency: maximum number of requests in flight
+        :return: a BulkOperationSync, call wait() for the report or iterate over the results as they finish
+        """
+        return BulkOperationSync(self.client, sandbox_ids, self.restart, concurrency)
 
     def create_http_port_mapping(self, sandbox_id: str,
         target_endpoint: str) -> dto.CreateHttpMappingResponse:
@@ -374,16 +441,16 @@ class SandboxSync:
         :param target_endpoint: Target TCP endpoint, e.g., 127.0.0.1:3000
         :return:
         """
-        self.client.logger.debug(f"Creating HTTP port mapping for sandbox {sandbox_id}")
+        self.client.logger.debug("Creating HTTP port mapping for sandbox %s", sandbox_id)
         data = dto.CreateHttpMappingDto(
             targetEndpoint=target_endpoint
         )
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings",
-            json=data.model_dump())
-        self.client.logger.debug(f"Create HTTP port mapping response: {response.text}")
-        return dto.CreateHttpMappingResponse.model_validate_json(response.text)
+            json=data)
+        self.client.logger.debug("Create HTTP port mapping response: %s", log_body(response))
+        return self.client.parse(response, dto.CreateHttpMappingResponse)
 
     def list_http_port_mappings(self, sandbox_id: str) -> dto.ListHttpMappingsResponseDto:
         """
@@ -392,12 +459,12 @@ class SandboxSync:
         :param sandbox_id:
         :return:
         """
-        self.client.logger.debug(f"Listing HTTP port mappings for sandbox {sandbox_id}")
+        self.client.logger.debug("Listing HTTP port mappings for sandbox %s", sandbox_id)
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings")
-        self.client.logger.debug(f"List HTTP port mappings response: {response.text}")
-        return dto.ListHttpMappingsResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("List HTTP port mappings response: %s", log_body(response))
+        return self.client.parse(response, dto.ListHttpMappingsResponseDto)
 
     def delete_http_port_mapping(self, sandbox_id: str, target_endpoint: str) -> None:
         """
@@ -406,7 +473,7 @@ class SandboxSync:
         :param target_endpoint:
         :return:
         """
-        self.client.logger.debug(f"Deleting HTTP port mapping {target_endpoint} for sandbox {sandbox_id}")
+        self.client.logger.debug("Deleting HTTP port mapping %s for sandbox %s", target_endpoint, sandbox_id)
         self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings/{target_endpoint}")
@@ -418,9 +485,9 @@ class SandboxSync:
         :param target_endpoint:
         :return:
         """
-        self.client.logger.debug(f"Getting HTTP port mapping {target_endpoint} for sandbox {sandbox_id}")
+        self.client.logger.debug("Getting HTTP port mapping %s for sandbox %s", target_endpoint, sandbox_id)
         response = self.client.request(
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/mappings/{target_endpoint}")
-        self.client.logger.debug(f"Get HTTP port mapping response: {response.text}")
-        return dto.HttpMappingResponse.model_validate_json(response.text)
+        self.client.logger.debug("Get HTTP port mapping response: %s", log_body(response))
+        return self.client.parse(response, dto.HttpMappingResponse)
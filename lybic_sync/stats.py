@@ -27,6 +27,7 @@
 """Provides the synchronous Stats class for accessing organization statistics."""
 from typing import TYPE_CHECKING
 from lybic import dto
+from lybic.log import log_body
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -42,5 +43,5 @@ class StatsSync:
         """
         self.client.logger.debug("Get stats requests")
         response = self.client.request("GET", f"/api/orgs/{self.client.org_id}/stats")
-        self.client.logger.debug("Get stats response: %s", response.text)
-        return dto.StatsResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Get stats response: %s", log_body(response))
+        return self.client.parse(response, dto.StatsResponseDto)
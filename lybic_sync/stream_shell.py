@@ -38,6 +38,8 @@ from lybic.dto import (
     StreamEvent,
     StreamEventType,
 )
+from lybic.codec import encode_json
+from lybic.log import log_body
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -61,6 +63,9 @@ class StreamShellSync:
     ) -> Iterator[StreamEvent]:
         """
         Create a streaming shell session (SSE).
+
+        The session is not sent through the middlewares of the client: it is not retried, cached, compressed
+        or logged by them.
         
         Args:
             sandbox_id: The ID of the sandbox.
@@ -83,16 +88,18 @@ class StreamShellSync:
             ttyCols=tty_cols,
         )
 
-        self.client.logger.debug(f"Creating streaming shell session for sandbox {sandbox_id}")
+        self.client.logger.debug("Creating streaming shell session for sandbox %s", sandbox_id)
 
         self.client._ensure_client_is_open()
         url = f"{self.client.endpoint}/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell/stream"
 
+        # The stream bypasses the middlewares on purpose: the command is not idempotent so it is never retried,
+        # and its events are sent uncompressed so that no proxy holds them back to fill a compression block.
         with self.client.client.stream(
             "POST",
             url,
-            json=request.model_dump(exclude_none=True),
-            headers=self.client.headers,
+            content=encode_json(request),
+            headers={**self.client.headers, "Accept-Encoding": "identity"},
             timeout=None,
         ) as response:
             response.raise_for_status()
@@ -122,7 +129,7 @@ class StreamShellSync:
                             yield StreamEvent(event_type=StreamEventType.END, data="")
                             break
                     except (json.JSONDecodeError, KeyError, ValueError) as e:
-                        self.client.logger.warning(f"Failed to parse SSE event: {e}")
+                        self.client.logger.warning("Failed to parse SSE event: %s", e)
                         continue
 
     def create(
@@ -159,14 +166,14 @@ class StreamShellSync:
             ttyCols=tty_cols,
         )
 
-        self.client.logger.debug(f"Creating shell session for sandbox {sandbox_id}")
+        self.client.logger.debug("Creating shell session for sandbox %s", sandbox_id)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell",
-            json=request.model_dump(exclude_none=True)
+            json=request
         )
-        self.client.logger.debug(f"Create shell session response: {response.text}")
-        return SandboxShellCommandCreateResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Create shell session response: %s", log_body(response))
+        return self.client.parse(response, SandboxShellCommandCreateResponseDto)
 
     def write(
         self,
@@ -184,11 +191,11 @@ class StreamShellSync:
         """
         request = SandboxShellCommandWriteRequestDto(data=data)
 
-        self.client.logger.debug(f"Writing to shell session {shell_id} in sandbox {sandbox_id}")
+        self.client.logger.debug("Writing to shell session %s in sandbox %s", shell_id, sandbox_id)
         self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell/{shell_id}",
-            json=request.model_dump(exclude_none=True)
+            json=request
         )
 
     def finish(
@@ -203,7 +210,7 @@ class StreamShellSync:
             sandbox_id: The ID of the sandbox.
             shell_id: The ID of the shell session.
         """
-        self.client.logger.debug(f"Finishing shell session {shell_id} in sandbox {sandbox_id}")
+        self.client.logger.debug("Finishing shell session %s in sandbox %s", shell_id, sandbox_id)
         self.client.request(
             "PUT",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/finish"
@@ -224,13 +231,13 @@ class StreamShellSync:
         Returns:
             SandboxShellCommandReadResponseDto: The output from the shell session.
         """
-        self.client.logger.debug(f"Reading shell session {shell_id} in sandbox {sandbox_id}")
+        self.client.logger.debug("Reading shell session %s in sandbox %s", shell_id, sandbox_id)
         response = self.client.request(
             "POST",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell/{shell_id}/read"
         )
-        self.client.logger.debug(f"Read shell session response: {response.text}")
-        return SandboxShellCommandReadResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Read shell session response: %s", log_body(response))
+        return self.client.parse(response, SandboxShellCommandReadResponseDto)
 
     def terminate(
         self,
@@ -244,7 +251,7 @@ class StreamShellSync:
             sandbox_id: The ID of the sandbox.
             shell_id: The ID of the shell session.
         """
-        self.client.logger.debug(f"Terminating shell session {shell_id} in sandbox {sandbox_id}")
+        self.client.logger.debug("Terminating shell session %s in sandbox %s", shell_id, sandbox_id)
         self.client.request(
             "DELETE",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/shell/{shell_id}"
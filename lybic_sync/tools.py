@@ -42,6 +42,7 @@ from lybic.dto import (
     SandboxApplicationInstallAcceptedDto,
     SandboxApplicationOperationDto,
 )
+from lybic.log import log_body
 
 if TYPE_CHECKING:
     from lybic_sync.lybic_sync import LybicSyncClient
@@ -76,10 +77,10 @@ class ComputerUseSync:
         response = self.client.request(
             "POST",
             f"/api/computer-use/parse/{model}",
-            json=ParseTextRequestDto(textContent=llm_output).model_dump(exclude_none=True),
+            json=ParseTextRequestDto(textContent=llm_output),
         )
-        self.client.logger.debug(f"Parse model output response: {response.text}")
-        return ComputerUseActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Parse model output response: %s", log_body(response))
+        return self.client.parse(response, ComputerUseActionResponseDto)
 
 class MobileUseSync:
     """MobileUseSync is a synchronous client for lybic MobileUse API(MCP and Restful)."""
@@ -111,10 +112,10 @@ class MobileUseSync:
         response = self.client.request(
             "POST",
             f"/api/mobile-use/parse/{model}",
-            json=ParseTextRequestDto(textContent=llm_output).model_dump(exclude_none=True),
+            json=ParseTextRequestDto(textContent=llm_output),
         )
-        self.client.logger.debug(f"Parse model output response: {response.text}")
-        return MobileUseActionResponseDto.model_validate_json(response.text)
+        self.client.logger.debug("Parse model output response: %s", log_body(response))
+        return self.client.parse(response, MobileUseActionResponseDto)
 
     def set_gps_location(
         self, sandbox_id: str, latitude: float, longitude: float
@@ -129,7 +130,7 @@ class MobileUseSync:
         Returns:
             The process execution result.
         """
-        sandbox_details = self.client.sandbox.get(sandbox_id)
+        sandbox_details = self.client.sandbox.get_metadata(sandbox_id)
         if not sandbox_details.sandbox.shape or sandbox_details.sandbox.shape.os != "Android":
             raise ValueError("set_gps_location is only supported for Android sandboxes")
 
@@ -193,7 +194,7 @@ class MobileUseSync:
             This method executes installation asynchronously using nohup to avoid timeout issues.
             The installation runs in the background and does not return installation results.
         """
-        sandbox_details = self.client.sandbox.get(sandbox_id)
+        sandbox_details = self.client.sandbox.get_metadata(sandbox_id)
         if not sandbox_details.sandbox.shape or sandbox_details.sandbox.shape.os != "Android":
             raise ValueError("install_apk is only supported for Android sandboxes")
 
@@ -221,8 +222,8 @@ class MobileUseSync:
             "PUT",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/apps/{app_id}",
         )
-        self.client.logger.debug(f"Install sandbox application response: {response.text}")
-        return SandboxApplicationInstallAcceptedDto.model_validate_json(response.text)
+        self.client.logger.debug("Install sandbox application response: %s", log_body(response))
+        return self.client.parse(response, SandboxApplicationInstallAcceptedDto)
 
     def get_sandbox_application_operation(
         self, sandbox_id: str, operation_id: str
@@ -240,8 +241,8 @@ class MobileUseSync:
             "GET",
             f"/api/orgs/{self.client.org_id}/sandboxes/{sandbox_id}/operations/{operation_id}",
         )
-        self.client.logger.debug(f"Get sandbox application operation response: {response.text}")
-        return SandboxApplicationOperationDto.model_validate_json(response.text)
+        self.client.logger.debug("Get sandbox application operation response: %s", log_body(response))
+        return self.client.parse(response, SandboxApplicationOperationDto)
 
 class ToolsSync:
     """ToolsSync is a container for various synchronous tool clients."""
@@ -0,0 +1,77 @@
+"""
+Benchmark the JSON codec of the SDK against the dict/str path it replaces: parsing a SandboxListResponseDto
+of 10k items, and encoding bursts of ExecuteSandboxActionDto requests.
+
+Usage: python -m test.bench_codec
+"""
+import json
+import timeit
+
+import httpx
+
+from lybic import dto
+from lybic.codec import encode_json, orjson
+
+LIST_ITEMS = 10_000
+LIST_ROUNDS = 20
+BURST = 1000
+BURST_ROUNDS = 50
+
+LIST_BODY = json.dumps([{
+    "id": f"SBX-{i:08d}",
+    "name": f"sandbox-{i}",
+    "expiresAt": "2025-01-01T00:00:00.000Z",
+    "createdAt": "2025-01-01T00:00:00.000Z",
+    "projectId": "PRJ-bench",
+    "shapeName": "beijing-2c-4g-cpu",
+    "status": "RUNNING",
+} for i in range(LIST_ITEMS)]).encode()
+
+ACTIONS = [dto.ExecuteSandboxActionDto(
+    action={"type": "mouse:click", "x": {"type": "px", "value": i}, "y": {"type": "px", "value": i}, "button": 1},
+    includeScreenShot=False,
+    includeCursorPosition=False,
+) for i in range(BURST)]
+
+
+def parse_text():
+    """The previous path: decode the body to str, then validate"""
+    response = httpx.Response(200, content=LIST_BODY)
+    return dto.SandboxListResponseDto.model_validate_json(response.text)
+
+
+def parse_bytes():
+    """The codec path: validate the body bytes"""
+    response = httpx.Response(200, content=LIST_BODY)
+    return dto.SandboxListResponseDto.model_validate_json(response.content)
+
+
+def encode_dict():
+    """The previous path: dump to a dict, then let httpx re-encode it"""
+    for action in ACTIONS:
+        json.dumps(action.model_dump(exclude_none=True), ensure_ascii=False, separators=(",", ":"),
+                   allow_nan=False).encode("utf-8")
+
+
+def encode_bytes():
+    """The codec path: serialize the DTO straight to bytes"""
+    for action in ACTIONS:
+        encode_json(action)
+
+
+def _report(name: str, fn, rounds: int, per: int):
+    seconds = min(timeit.repeat(fn, number=rounds, repeat=3)) / rounds
+    print(f"{name:<28}{seconds * 1e3:>10.2f} ms{seconds / per * 1e6:>12.2f} us/item")
+
+
+def main():
+    """Run the benchmark"""
+    print(f"orjson installed: {orjson is not None}")
+    _report(f"parse list, text ({LIST_ITEMS})", parse_text, LIST_ROUNDS, LIST_ITEMS)
+    _report(f"parse list, bytes ({LIST_ITEMS})", parse_bytes, LIST_ROUNDS, LIST_ITEMS)
+    _report(f"encode actions, dict ({BURST})", encode_dict, BURST_ROUNDS, BURST)
+    _report(f"encode actions, bytes ({BURST})", encode_bytes, BURST_ROUNDS, BURST)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark the cost of the debug log calls of a request while DEBUG is disabled, comparing eager
+f-string arguments with the lazy arguments of lybic.log.
+
+Usage: python -m test.bench_logging
+"""
+import logging
+import timeit
+
+import httpx
+
+from lybic import dto
+from lybic.log import log_body, log_model
+
+CALLS = 100_000
+
+logger = logging.getLogger("lybic.bench")
+logger.setLevel(logging.INFO)
+
+response = httpx.Response(200, json={
+    "sandboxes": [{"id": f"SBX-{i}", "name": f"sandbox-{i}", "shape": "beijing-2c-4g-cpu"} for i in range(50)],
+})
+action = dto.ExecuteSandboxActionDto(
+    action={"type": "mouse:click", "x": {"type": "px", "value": 100}, "y": {"type": "px", "value": 100},
+            "button": 1},
+    includeScreenShot=False,
+)
+
+
+def eager():
+    """The f-string form: the body is decoded and the DTO serialized on every call"""
+    # pylint: disable=logging-fstring-interpolation
+    logger.debug(f"Execute sandbox action request: {action.model_dump_json(exclude_none=True)}")
+    logger.debug(f"Execute sandbox action response: {response.text}")
+
+
+def lazy():
+    """The lazy form: nothing is rendered unless a record is emitted"""
+    logger.debug("Execute sandbox action request: %s", log_model(action))
+    logger.debug("Execute sandbox action response: %s", log_body(response))
+
+
+def main():
+    """Run the benchmark"""
+    print(f"{'form':<8}{'ns/request':>12}")
+    for name, fn in (("eager", eager), ("lazy", lazy)):
+        seconds = min(timeit.repeat(fn, number=CALLS, repeat=3))
+        print(f"{name:<8}{seconds / CALLS * 1e9:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+Benchmark the throughput of concurrent execute_sandbox_action calls against a local stub server
+with different connection pool settings.
+
+Usage: python -m test.bench_transport
+"""
+import asyncio
+import time
+
+import httpx
+
+from lybic import LybicClient, LybicAuth, TransportConfig
+from .stub_server import StubServer
+
+CONCURRENCY_LEVELS = (10, 100, 1000)
+REQUESTS_PER_LEVEL = 3000
+SERVER_LATENCY = 0.005
+
+CONFIGS = {
+    "default": TransportConfig(),
+    "tuned": TransportConfig(max_connections=1000, max_keepalive_connections=1000, keepalive_expiry=30),
+}
+
+
+async def run(url: str, config: TransportConfig, concurrency: int) -> tuple[float, int, int]:
+    """Run bursts of concurrent actions, return requests per second, opened connections and failures"""
+    auth = LybicAuth(org_id="bench", api_key="bench", endpoint=url)
+    connections_before = httpx.get(f"{url}/__stats").json()["connections"]
+    rounds = max(REQUESTS_PER_LEVEL // concurrency, 1)
+    failures = 0
+    async with LybicClient(auth, max_retries=0, transport=config) as client:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = await asyncio.gather(*[
+                client.sandbox.execute_sandbox_action("SBX-bench", action={"type": "screenshot"})
+                for _ in range(concurrency)
+            ], return_exceptions=True)
+            failures += sum(isinstance(result, Exception) for result in results)
+        elapsed = time.perf_counter() - start
+    connections = httpx.get(f"{url}/__stats").json()["connections"] - connections_before - 1
+    return (concurrency * rounds - failures) / elapsed, connections, failures
+
+
+def main():
+    """Print a throughput table"""
+    url, server = StubServer(latency=SERVER_LATENCY).serve_in_subprocess()
+    try:
+        print(f"{'config':<10}{'concurrency':>12}{'req/s':>12}{'connections':>14}{'failures':>10}")
+        for name, config in CONFIGS.items():
+            for concurrency in CONCURRENCY_LEVELS:
+                throughput, connections, failures = asyncio.run(run(url, config, concurrency))
+                print(f"{name:<10}{concurrency:>12}{throughput:>12.0f}{connections:>14}{failures:>10}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""helpers.py builds the clients used by tests, against an httpx.MockTransport or a StubServer"""
+from typing import Callable
+
+import httpx
+
+from lybic import LybicAuth, LybicClient, RetryPolicy, TransportConfig
+
+from .stub_server import StubServer
+
+ENDPOINT = "https://api.example.com"
+
+
+def mock_auth(endpoint: str = ENDPOINT, **kwargs) -> LybicAuth:
+    """Credentials of the test org"""
+    return LybicAuth(org_id="test_org", api_key="test_key", endpoint=endpoint, **kwargs)
+
+
+def mock_client(handler: Callable, client_class: type = LybicClient, endpoint: str = ENDPOINT, **kwargs):
+    """A client whose requests are answered by `handler` through an httpx.MockTransport, without retries by default"""
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=0))
+    return client_class(mock_auth(endpoint), transport=TransportConfig(transport=httpx.MockTransport(handler)),
+                        **kwargs)
+
+
+def stub_auth(server: StubServer, **kwargs) -> LybicAuth:
+    """Credentials of the test org on a StubServer"""
+    return mock_auth(server.url, **kwargs)
+
+
+def stub_client(server: StubServer, client_class: type = LybicClient, **kwargs):
+    """A client of a StubServer, without retries by default"""
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=0))
+    return client_class(stub_auth(server), **kwargs)
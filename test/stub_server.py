@@ -0,0 +1,202 @@
+# -*- coding: UTF-8 -*-
+#
+# Copyright (c) 2019-2025   Beijing Tingyu Technology Co., Ltd.
+# Copyright (c) 2025        Lybic Development Team <team@lybic.ai, lybic@tingyutech.com>
+# Copyright (c) 2025        Lu Yicheng <luyicheng@tingyutech.com>
+#
+# Author: AEnjoy <aenjoyable@163.com>
+#
+# These Terms of Service ("Terms") set forth the rules governing your access to and use of the website lybic.ai
+# ("Website"), our web applications, and other services (collectively, the "Services") provided by Beijing Tingyu
+# Technology Co., Ltd. ("Company," "we," "us," or "our"), a company registered in Haidian District, Beijing. Any
+# breach of these Terms may result in the suspension or termination of your access to the Services.
+# By accessing and using the Services and/or the Website, you represent that you are at least 18 years old,
+# acknowledge that you have read and understood these Terms, and agree to be bound by them. By using or accessing
+# the Services and/or the Website, you further represent and warrant that you have the legal capacity and authority
+# to agree to these Terms, whether as an individual or on behalf of a company. If you do not agree to all of these
+# Terms, do not access or use the Website or Services.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""stub_server.py provides a minimal local HTTP/1.1 server used by tests and benchmarks"""
+import asyncio
+import json
+import multiprocessing
+import threading
+from http import HTTPStatus
+from typing import Callable, Optional, Union
+
+
+class StubRequest:
+    """A request received by the StubServer."""
+
+    def __init__(self, method: str, target: str, headers: dict, body: bytes):
+        self.method = method
+        self.target = target
+        self.path = target.split("?", 1)[0]
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Decode the request body as JSON"""
+        return json.loads(self.body) if self.body else None
+
+
+def default_handler(request: StubRequest):
+    """Answer every request with a successful sandbox action response."""
+    if request.path.endswith("/actions/execute"):
+        return 200, {"screenShot": "https://example.com/screen.webp", "actionResult": None}
+    return 200, {}
+
+
+class StubServer:
+    """
+    StubServer is a keep-alive HTTP/1.1 server running on its own event loop thread.
+
+    The handler receives a StubRequest and returns ``(status, body)`` or ``(status, body, headers)``,
+    where body is bytes, str, or a JSON-serializable object. ``GET /__stats`` reports the server counters.
+    """
+
+    def __init__(self,
+                 handler: Optional[Callable[[StubRequest], tuple]] = None,
+                 latency: float = 0.0,
+                 host: str = "127.0.0.1"):
+        self.handler = handler or default_handler
+        self.latency = latency
+        self.host = host
+        self.port: Optional[int] = None
+        self.connections = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        # requests being handled, updated in step with the client: a request is answered before its connection is reused
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        """Base url of the server"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StubServer":
+        """Start serving in a background thread"""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._serve, self.host, 0, backlog=4096))
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._server.close()
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="lybic-stub-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Stop the server and wait for its thread"""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def serve_in_subprocess(self) -> tuple[str, "multiprocessing.Process"]:
+        """
+        Serve from a separate process so that the server does not compete with the client for the GIL.
+        Only the default handler is supported. Return the base url and the process.
+        """
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_serve_forever, args=(self.latency, self.host, queue), daemon=True)
+        process.start()
+        return f"http://{self.host}:{queue.get()}", process
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, value = line.decode("latin-1").split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                if target == "/__stats":
+                    writer.write(self._render((200, {"connections": self.connections, "requests": self.requests})))
+                    await writer.drain()
+                    continue
+
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    response = self._render(self.handler(StubRequest(method, target, headers, body)))
+                    if method == "HEAD":
+                        response = response.split(b"\r\n\r\n", 1)[0] + b"\r\n\r\n"
+                finally:
+                    self.in_flight -= 1
+                writer.write(response)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    @staticmethod
+    def _render(result: tuple) -> bytes:
+        status, body = result[0], result[1]
+        headers = dict(result[2]) if len(result) > 2 else {}
+        if isinstance(body, bytes):
+            payload: Union[bytes, str] = body
+        elif isinstance(body, str):
+            payload = body.encode("utf-8")
+        else:
+            payload = json.dumps(body).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        headers["Content-Length"] = str(len(payload))
+        head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        head += "".join(f"{key}: {value}\r\n" for key, value in headers.items())
+        return head.encode("latin-1") + b"\r\n" + payload
+
+
+def _serve_forever(latency: float, host: str, queue):
+    server = StubServer(latency=latency, host=host).start()
+    queue.put(server.port)
+    threading.Event().wait()
@@ -0,0 +1,87 @@
+"""Test the synchronous facade running LybicClient on a background event loop."""
+import base64
+import json
+import threading
+
+import pytest
+
+from lybic import Deadline, LybicDeadlineExceededError
+from lybic.dto import StreamEventType
+from lybic_sync import BackgroundLoop, LybicBackgroundClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer, default_handler
+
+CALLS = 200
+
+
+def _sse(*events: dict) -> str:
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+
+
+def _handler(request):
+    if request.path.endswith("/shell/stream"):
+        stdout = base64.b64encode(b"hello").decode()
+        return 200, _sse({"stdout": stdout}, {"stdout": stdout}, {"end": True}), {"Content-Type": "text/event-stream"}
+    return default_handler(request)
+
+
+def _client(server: StubServer, **kwargs) -> LybicBackgroundClient:
+    return LybicBackgroundClient(stub_auth(server), **kwargs)
+
+
+def test_blocking_and_pipelined_calls():
+    """Test blocking calls and futures handed out by submit share the async client."""
+    loop = BackgroundLoop()
+    try:
+        with StubServer(latency=0.01) as server:
+            with _client(server, loop=loop) as client:
+                assert client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"}).screenShot
+                futures = [client.sandbox.execute_sandbox_action.submit(f"SBX-{index}", action={"type": "screenshot"})
+                           for index in range(CALLS)]
+                results = [future.result(timeout=30) for future in futures]
+                assert client.org_id == "test_org"
+        assert all(result.screenShot for result in results)
+        assert server.requests == CALLS + 1
+        # the calls were concurrent on the loop, not serialized
+        assert server.max_open_connections > 1
+    finally:
+        loop.close()
+    assert loop.closed
+
+
+def test_stream_is_iterated_synchronously():
+    """Test an SSE stream of the async client is consumed as a sync iterator."""
+    with StubServer(handler=_handler) as server:
+        with _client(server) as client:
+            events = list(client.stream_shell.create_stream("SBX-0", "echo hello"))
+            first = next(iter(client.stream_shell.create_stream("SBX-0", "echo hello")))
+    assert [event.event_type for event in events] == [StreamEventType.STDOUT, StreamEventType.STDOUT,
+                                                       StreamEventType.END]
+    assert first.data == "hello"
+
+
+def test_deadline_of_the_calling_thread_applies():
+    """Test the deadline of the caller is carried to the loop."""
+    with StubServer(latency=0.5) as server:
+        with _client(server) as client:
+            with Deadline(0.05):
+                with pytest.raises(LybicDeadlineExceededError):
+                    client.sandbox.get_status("SBX-0")
+
+
+def test_blocking_from_the_loop_thread_is_refused():
+    """Test that waiting on the loop from its own thread raises instead of deadlocking."""
+    loop = BackgroundLoop()
+    try:
+        async def nested():
+            return loop.run(_noop())
+
+        async def _noop():
+            return threading.current_thread().name
+
+        assert loop.run(_noop()) == "lybic-loop"
+        with pytest.raises(RuntimeError):
+            loop.run(nested())
+    finally:
+        loop.close()
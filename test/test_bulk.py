@@ -0,0 +1,100 @@
+"""Test bulk sandbox operations: bounded concurrency, streamed results and per-item errors."""
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from lybic import LybicClient, LybicAPIError, RateLimit, RateLimiter, RetryPolicy, dto
+from lybic_sync import LybicSyncClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+ITEMS = 60
+CONCURRENCY = 8
+
+
+class LifecycleStub:
+    """Creates, deletes and restarts sandboxes; shape "bad" and ids ending in 7 are rejected."""
+
+    def __init__(self):
+        self.ids = itertools.count()
+
+    def __call__(self, request):
+        if request.method == "POST" and request.path.endswith("/sandboxes"):
+            if request.json()["shape"] == "bad":
+                return 400, {"code": "BAD_SHAPE", "message": "unknown shape"}
+            return 200, {"id": f"SBX-{next(self.ids)}", "name": "bulk", "expiresAt": "", "createdAt": "",
+                         "projectId": "p"}
+        if request.path.split("/")[5].endswith("7"):
+            return 404, {"code": "NOT_FOUND", "message": "no such sandbox"}
+        return 200, {}
+
+
+@pytest.mark.asyncio
+async def test_create_many_reports_each_item():
+    """Test a bulk create with failing items, in input order, within the concurrency cap."""
+    specs = [{"shape": "bad" if index % 10 == 3 else "small"} for index in range(ITEMS)]
+    specs[0] = dto.CreateSandboxDto(shape="small", name="first")
+    with StubServer(handler=LifecycleStub(), latency=0.01) as server:
+        async with LybicClient(stub_auth(server), retry_policy=RetryPolicy(max_retries=0)) as client:
+            report = await client.sandbox.create_many(specs, concurrency=CONCURRENCY)
+    assert len(report) == ITEMS and not report.ok
+    assert [result.index for result in report] == list(range(ITEMS))
+    assert [result.index for result in report.failed] == list(range(3, ITEMS, 10))
+    assert all(isinstance(result.error, LybicAPIError) for result in report.failed)
+    assert len(report.values) == ITEMS - ITEMS // 10
+    assert report.summary() == {"total": ITEMS, "succeeded": 54, "failed": 6, "errors": {"LybicAPIError": 6}}
+    assert server.max_in_flight <= CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_results_stream_as_they_finish_and_respect_the_rate_limiter():
+    """Test iterating over a bulk delete, and the rate limiter of the client pacing it."""
+    limiter = RateLimiter(limits={"default": RateLimit(rate=100, burst=1), "lifecycle": RateLimit(rate=100, burst=1)})
+    ids = [f"SBX-{index}" for index in range(20)]
+    with StubServer(handler=LifecycleStub()) as server:
+        async with LybicClient(stub_auth(server), rate_limiter=limiter) as client:
+            started = time.monotonic()
+            seen = [result async for result in client.sandbox.delete_many(ids, concurrency=CONCURRENCY)]
+            elapsed = time.monotonic() - started
+    assert sorted(result.item for result in seen) == sorted(ids)
+    assert [result.item for result in seen if not result.ok] == ["SBX-7", "SBX-17"]
+    # 20 requests at 100/s with a burst of 1
+    assert elapsed >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_leaving_the_stream_early_stops_the_workers():
+    """Test that breaking out of the iteration does not leave calls running."""
+    with StubServer(handler=LifecycleStub(), latency=0.01) as server:
+        async with LybicClient(stub_auth(server)) as client:
+            async for _ in client.sandbox.restart_many([f"SBX-{index}" for index in range(ITEMS)], concurrency=2):
+                break
+            await asyncio.sleep(0.1)
+    # the first result and at most the two calls in flight when the iteration stopped
+    assert server.requests <= 3
+
+
+def test_sync_bulk_operations():
+    """Test the bulk APIs of LybicSyncClient."""
+    with StubServer(handler=LifecycleStub(), latency=0.005) as server:
+        with LybicSyncClient(stub_auth(server)) as client:
+            created = client.sandbox.create_many([{"shape": "small"}] * ITEMS, concurrency=CONCURRENCY).wait()
+            ids = [sandbox.id for sandbox in created.values]
+            streamed = list(client.sandbox.restart_many(ids, concurrency=CONCURRENCY))
+            deleted = client.sandbox.delete_many(ids, concurrency=CONCURRENCY).wait()
+    assert created.ok and len(ids) == ITEMS
+    assert len(streamed) == ITEMS
+    assert [result.item for result in deleted.failed] == [sandbox_id for sandbox_id in ids if sandbox_id.endswith("7")]
+    assert server.max_in_flight <= CONCURRENCY
+
+
+def test_sync_bulk_operations_run_on_the_client_threads():
+    """Test that sync bulk operations are bounded by the max_workers of the client."""
+    with StubServer(handler=LifecycleStub(), latency=0.005) as server:
+        with LybicSyncClient(stub_auth(server), max_workers=2) as client:
+            report = client.sandbox.create_many([{"shape": "small"}] * ITEMS, concurrency=CONCURRENCY).wait()
+    assert report.ok and len(report.values) == ITEMS
+    assert server.max_in_flight <= 2
@@ -0,0 +1,91 @@
+"""Test the TTL response cache."""
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from lybic import ResponseCache
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+PROJECTS = [{"id": "p1", "name": "default", "createdAt": "2025-01-01T00:00:00Z", "defaultProject": True}]
+
+
+def _handler(calls):
+    def handler(request):
+        calls.append((request.method, request.url.path, str(request.url.params)))
+        if request.method == "GET" and request.url.path.endswith("/projects"):
+            return httpx.Response(200, json=PROJECTS)
+        return httpx.Response(200, json={})
+    return handler
+
+
+def _response():
+    return httpx.Response(200, json={})
+
+
+def test_ttl_and_lru_eviction():
+    """Test that entries expire after their TTL and the least recently used entry is evicted."""
+    cache = ResponseCache(ttls={"/a": 10, "/b": 10, "/c": 10}, max_entries=2)
+    with patch("lybic.cache.time.monotonic", return_value=0.0):
+        cache.put(("a",), "/a", None, _response())
+        cache.put(("b",), "/b", None, _response())
+        assert cache.get(("a",)) is not None
+        cache.put(("c",), "/c", None, _response())
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+    with patch("lybic.cache.time.monotonic", return_value=11.0):
+        assert cache.get(("a",)) is None
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_routes_without_ttl_are_not_cached():
+    """Test that only routes with a TTL are cacheable."""
+    cache = ResponseCache()
+    assert cache.is_cacheable("GET", "/api/orgs/{org_id}/shapes")
+    assert not cache.is_cacheable("GET", "/api/orgs/{org_id}/sandboxes")
+    assert not cache.is_cacheable("POST", "/api/orgs/{org_id}/shapes")
+
+
+@pytest.mark.asyncio
+async def test_async_client_caches_and_invalidates():
+    """Test that Project.list is cached and creating a project invalidates it."""
+    calls = []
+    async with mock_client(_handler(calls), cache=ResponseCache()) as client:
+        first = await client.project.list()
+        second = await client.project.list()
+        assert first is second
+        assert len(calls) == 1
+
+        await client.request("POST", "/api/orgs/test_org/projects", json={"name": "new"})
+        await client.project.list()
+        assert [method for method, _, _ in calls] == ["GET", "POST", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_params_are_part_of_the_key():
+    """Test that list_machine_images scopes are cached separately."""
+    calls = []
+    async with mock_client(_handler(calls), cache=ResponseCache()) as client:
+        for scope in ("org", "public", "org"):
+            await client.request("GET", "/api/orgs/test_org/machine-images", params={"scope": scope})
+        await client.request("DELETE", "/api/orgs/test_org/machine-images/img-1")
+        await client.request("GET", "/api/orgs/test_org/machine-images", params={"scope": "org"})
+    assert [params for method, _, params in calls if method == "GET"] == ["scope=org", "scope=public", "scope=org"]
+
+
+def test_sync_client_caches_and_invalidates():
+    """Test that the sync client uses the cache the same way."""
+    calls = []
+    cache = ResponseCache()
+    with mock_client(_handler(calls), LybicSyncClient, cache=cache) as client:
+        client.request("GET", "/api/orgs/test_org/mcp-servers/default")
+        client.request("GET", "/api/orgs/test_org/mcp-servers/default")
+        client.request("GET", "/api/orgs/test_org/sandboxes")
+        client.request("GET", "/api/orgs/test_org/sandboxes")
+        client.request("POST", "/api/orgs/test_org/mcp-servers/mcp-1/sandbox", json={})
+        client.request("GET", "/api/orgs/test_org/mcp-servers/default")
+    assert len(calls) == 5
+    assert cache.hits == 1
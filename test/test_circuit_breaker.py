@@ -0,0 +1,102 @@
+"""Test the per-endpoint circuit breaker."""
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from lybic import LybicCircuitOpenError, LybicInternalError, CircuitBreaker, CircuitState
+from lybic.routes import match_route
+from lybic_sync import LybicSyncClient
+
+from .helpers import ENDPOINT, mock_client
+
+ROUTE = "/api/orgs/{org_id}/sandboxes/{sandbox_id}/actions/execute"
+
+
+def _error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", f"{ENDPOINT}/test")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def test_match_route():
+    """Test that paths are mapped to their route template."""
+    route = match_route("/api/orgs/o1/sandboxes/SBX-1/actions/execute?x=1")
+    assert route.template == ROUTE
+    assert route.sandbox_id == "SBX-1"
+    assert match_route("/api/orgs/o1/sandboxes/from-image").template == "/api/orgs/{org_id}/sandboxes/from-image"
+    assert match_route("/unknown").template == "/unknown"
+
+
+def test_opens_after_consecutive_failures():
+    """Test closed -> open after the threshold, and that 4xx does not count."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record(ENDPOINT, ROUTE, _error(503))
+    breaker.record(ENDPOINT, ROUTE, _error(404))
+    breaker.record(ENDPOINT, ROUTE, _error(503))
+    assert breaker.state(ENDPOINT, ROUTE) == CircuitState.CLOSED
+    breaker.record(ENDPOINT, ROUTE, httpx.ConnectError("refused"))
+    assert breaker.state(ENDPOINT, ROUTE) == CircuitState.OPEN
+    with pytest.raises(LybicCircuitOpenError) as exc_info:
+        breaker.before_call(ENDPOINT, ROUTE)
+    assert exc_info.value.route == ROUTE
+    assert exc_info.value.retry_after > 0
+    # other routes and endpoints are not affected
+    breaker.before_call(ENDPOINT, "/api/orgs/{org_id}/sandboxes")
+    breaker.before_call("https://other.example.com", ROUTE)
+    assert breaker.snapshot() == [
+        {"endpoint": ENDPOINT, "route": ROUTE, "state": "open", "failures": 2, "trips": 1},
+    ]
+
+
+def test_half_open_probe():
+    """Test that a single probe is let through after the recovery timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    with patch("lybic.circuit_breaker.time.monotonic", return_value=100.0):
+        breaker.record(ENDPOINT, ROUTE, _error(500))
+    with patch("lybic.circuit_breaker.time.monotonic", return_value=111.0):
+        breaker.before_call(ENDPOINT, ROUTE)
+        assert breaker.state(ENDPOINT, ROUTE) == CircuitState.HALF_OPEN
+        with pytest.raises(LybicCircuitOpenError):
+            breaker.before_call(ENDPOINT, ROUTE)
+        breaker.record(ENDPOINT, ROUTE, _error(502))
+        assert breaker.state(ENDPOINT, ROUTE) == CircuitState.OPEN
+    with patch("lybic.circuit_breaker.time.monotonic", return_value=122.0):
+        breaker.before_call(ENDPOINT, ROUTE)
+        breaker.record(ENDPOINT, ROUTE)
+        assert breaker.state(ENDPOINT, ROUTE) == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_fails_fast_while_open():
+    """Test that the client stops sending requests once the circuit opens."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    path = "/api/orgs/test_org/sandboxes/SBX-1/actions/execute"
+    async with mock_client(handler, circuit_breaker=CircuitBreaker(failure_threshold=2)) as client:
+        for _ in range(2):
+            with pytest.raises(LybicInternalError):
+                await client.request("POST", path)
+        with pytest.raises(LybicCircuitOpenError):
+            await client.request("POST", path.replace("SBX-1", "SBX-2"))
+    assert len(calls) == 2
+
+
+def test_sync_client_fails_fast_while_open():
+    """Test that the sync client shares the same circuit semantics."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    with mock_client(handler, LybicSyncClient, circuit_breaker=CircuitBreaker(failure_threshold=1)) as client:
+        with pytest.raises(httpx.ConnectError):
+            client.request("GET", "/api/orgs/test_org/stats")
+        with pytest.raises(LybicCircuitOpenError):
+            client.request("GET", "/api/orgs/test_org/stats")
+    assert len(calls) == 1
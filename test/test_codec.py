@@ -0,0 +1,64 @@
+"""Test the JSON codec of request bodies and responses."""
+import json
+
+import httpx
+import pytest
+
+from lybic import dto
+from lybic import codec
+from lybic.codec import encode_json, parse_response
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+
+ACTION = dto.ExecuteSandboxActionDto(
+    action={"type": "mouse:click", "x": {"type": "px", "value": 1}, "y": {"type": "px", "value": 2}, "button": 1},
+)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_encode_json(monkeypatch, use_orjson):
+    """Test that DTOs and dicts encode like the dict path they replace."""
+    if not use_orjson:
+        monkeypatch.setattr(codec, "orjson", None)
+    assert json.loads(encode_json(ACTION)) == json.loads(json.dumps(ACTION.model_dump(exclude_none=True)))
+    assert json.loads(encode_json({"name": "沙箱", "n": 1})) == {"name": "沙箱", "n": 1}
+
+
+def test_parse_response_from_bytes():
+    """Test that responses are validated from the body bytes, whatever their encoding."""
+    response = httpx.Response(200, content='{"name": "沙箱"}'.encode("utf-8"))
+    assert parse_response(response, dto.CreateProjectDto).name == "沙箱"
+
+
+@pytest.mark.asyncio
+async def test_dto_body_is_sent_as_json_bytes():
+    """Test that a DTO passed as `json` is sent as encoded bytes with a JSON content type."""
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.headers.get("Content-Type"), request.content))
+        return httpx.Response(200, json={})
+
+    async with mock_client(handler) as client:
+        await client.request("POST", "/test", json=ACTION)
+        await client.request("PUT", "/test", json={"a": 1})
+        await client.request("DELETE", "/test")
+
+    assert seen[0] == ("POST", "application/json", encode_json(ACTION))
+    assert seen[1][1] == "application/json" and json.loads(seen[1][2]) == {"a": 1}
+    assert seen[2][1] is None and seen[2][2] == b""
+
+
+def test_sync_client_sends_dto_body():
+    """Test that the sync client encodes DTO bodies the same way."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.content)
+        return httpx.Response(200, json={})
+
+    with mock_client(handler, LybicSyncClient) as client:
+        client.request("POST", "/test", json=ACTION)
+    assert seen == [encode_json(ACTION)]
@@ -0,0 +1,96 @@
+"""Test response encoding negotiation and compressed request bodies."""
+import gzip
+import json
+
+import httpx
+import pytest
+
+from lybic import Compression, Middleware
+from lybic.compression import supported_encodings
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+
+def test_compress_threshold():
+    """Test that only bodies above the threshold are compressed, and that both are counted."""
+    compression = Compression(min_request_size=100)
+    assert compression.compress(b"{}") is None
+    body = json.dumps([{"src": f"/home/user/{i}.txt"} for i in range(100)]).encode()
+    assert gzip.decompress(compression.compress(body)) == body
+
+    snapshot = compression.snapshot()
+    assert snapshot["request_bytes"] == len(body) + 2
+    assert snapshot["request_wire_bytes"] < snapshot["request_bytes"]
+    assert snapshot["request_ratio"] < 0.5
+    assert snapshot["response_ratio"] is None
+    assert Compression().compress(body) is None
+
+    with pytest.raises(ValueError):
+        Compression(level=0)
+
+
+@pytest.mark.asyncio
+async def test_client_compresses_requests_and_counts_responses():
+    """Test that large bodies are gzipped and compressed responses are decoded and counted."""
+    payload = {"items": [{"src": f"/home/user/{i}.txt", "dest": f"/tmp/{i}.txt"} for i in range(200)]}
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        body = json.dumps(payload).encode()
+        return httpx.Response(200, content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+
+    compression = Compression(min_request_size=1024)
+    async with mock_client(handler, compression=compression) as client:
+        response = await client.request("POST", "/test", json=payload)
+        await client.request("POST", "/test", json={"small": True})
+
+    assert response.json() == payload
+    assert seen[0].headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(seen[0].content)) == payload
+    assert "Content-Encoding" not in seen[1].headers
+    assert seen[1].headers["Accept-Encoding"] == ", ".join(supported_encodings())
+
+    snapshot = compression.snapshot()
+    assert snapshot["response_wire_bytes"] < snapshot["response_bytes"]
+    assert snapshot["request_wire_bytes"] < snapshot["request_bytes"]
+
+
+def test_sync_client_negotiates_encodings():
+    """Test that the sync client advertises the configured encodings."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Accept-Encoding"])
+        return httpx.Response(200, json={})
+
+    with mock_client(handler, LybicSyncClient, compression=Compression(encodings=("gzip",))) as client:
+        client.request("GET", "/test")
+    assert seen == ["gzip"]
+
+
+@pytest.mark.asyncio
+async def test_shell_stream_bypasses_the_middlewares():
+    """Test that shell streams are sent uncompressed and outside of the middlewares, on purpose."""
+    seen, calls = [], []
+
+    class Recorder(Middleware):
+        """Records the calls going through the pipeline."""
+
+        def before(self, context):
+            calls.append(context.path)
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, content=b'data: {"stdout": "aGk="}\n\ndata: {"end": true}\n\n',
+                              headers={"Content-Type": "text/event-stream"})
+
+    compression = Compression(min_request_size=0)
+    async with mock_client(handler, compression=compression, middlewares=[Recorder()]) as client:
+        events = [event async for event in client.stream_shell.create_stream("SBX-1", "echo hi")]
+
+    assert [event.data for event in events] == ["hi", ""]
+    assert not calls
+    assert "content-encoding" not in seen[0].headers
+    assert seen[0].headers["accept-encoding"] == "identity"
@@ -0,0 +1,129 @@
+"""Test the adaptive (AIMD) concurrency limiter."""
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from lybic import AdaptiveConcurrencyLimiter, LybicInternalError
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+
+def test_validation():
+    """Test that inconsistent limits are rejected."""
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=5)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(backoff_ratio=1.5)
+
+
+def test_additive_increase_while_latency_is_flat():
+    """Test that the limit grows by about one per `limit` successful responses."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=5)
+    for _ in range(4):
+        limiter.acquire()
+    for _ in range(4):
+        limiter.release(0.1)
+    assert limiter.snapshot()["limit"] == 4
+    for _ in range(200):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.acquire()
+        for _ in range(3):
+            limiter.release(0.1)
+    assert limiter.snapshot()["limit"] == 5
+    assert limiter.gradient == pytest.approx(1.0)
+
+
+def test_multiplicative_decrease():
+    """Test that drops and latency spikes cut the limit, down to min_limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, min_limit=2, backoff_ratio=0.5)
+    limiter.acquire()
+    limiter.release(dropped=True)
+    assert limiter.snapshot()["limit"] == 5
+    limiter.acquire()
+    limiter.release(0.1)
+    limiter.acquire()
+    limiter.release(10.0)
+    snapshot = limiter.snapshot()
+    assert snapshot["limit"] == 2
+    assert snapshot["gradient"] < 1
+    limiter.acquire()
+    limiter.release(dropped=True)
+    assert limiter.snapshot()["limit"] == 2
+
+
+@pytest.mark.asyncio
+async def test_waiters_and_cancellation():
+    """Test that waiters are served in order and a cancelled waiter does not leak its slot."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1)
+    await limiter.acquire_async()
+    order = []
+
+    async def worker(name):
+        await limiter.acquire_async()
+        order.append(name)
+        limiter.release()
+
+    cancelled = asyncio.create_task(worker("cancelled"))
+    tasks = [asyncio.create_task(worker(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.snapshot()["queued"] == 4
+    cancelled.cancel()
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_client_bounds_in_flight_requests():
+    """Test that the async client never exceeds the limit and backs off on 5xx."""
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if request.url.path == "/fail":
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=4)
+    async with mock_client(handler, concurrency_limiter=limiter) as client:
+        await asyncio.gather(*(client.request("GET", "/test") for _ in range(20)))
+        assert peak == 4
+        with pytest.raises(LybicInternalError):
+            await client.request("GET", "/fail")
+    assert limiter.snapshot()["limit"] == 3
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_sync_client_shares_limiter_between_threads():
+    """Test that threads of a sync client wait for a slot."""
+    lock = threading.Lock()
+    in_flight, peak = 0, 0
+
+    def handler(_request):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        threading.Event().wait(0.005)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(200, json={})
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+    with mock_client(handler, LybicSyncClient, concurrency_limiter=limiter) as client:
+        threads = [threading.Thread(target=client.request, args=("GET", "/test")) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert peak <= 2
+    assert limiter.snapshot()["in_flight"] == 0
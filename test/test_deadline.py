@@ -0,0 +1,97 @@
+"""Test per-call deadlines and split timeouts."""
+import time
+
+import httpx
+import pytest
+
+from lybic import LybicClient, Deadline, LybicDeadlineExceededError, LybicInternalError, RetryPolicy
+from lybic.deadline import timeout_seconds
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client, stub_auth
+from .stub_server import StubServer
+
+
+def _client(handler, client_class=LybicClient, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=3, base_delay=1.0))
+    return mock_client(handler, client_class, **kwargs)
+
+
+def test_nested_deadlines_never_extend():
+    """Test that an inner deadline cannot outlive the enclosing one."""
+    with Deadline(1.0) as outer:
+        with Deadline(10.0) as inner:
+            assert inner is outer
+            assert Deadline.current() is outer
+        with Deadline(0.5) as inner:
+            assert inner.expires_at < outer.expires_at
+        assert Deadline.current() is outer
+    assert Deadline.current() is None
+
+
+def test_timeout_is_clamped_to_the_deadline():
+    """Test that every timeout of an attempt ends by the deadline."""
+    timeout = Deadline(2.0).timeout(httpx.Timeout(10.0, connect=1.0, pool=None))
+    assert timeout.connect == 1.0
+    assert 1.9 < timeout.read <= 2.0
+    assert 1.9 < timeout.pool <= 2.0
+    assert timeout_seconds(httpx.Timeout(5.0, connect=1.0)) == 5.0
+    assert timeout_seconds(3) == 3
+
+
+@pytest.mark.asyncio
+async def test_no_retry_when_backoff_does_not_fit():
+    """Test that a backoff sleep longer than the remaining time stops the retries."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.extensions["timeout"])
+        return httpx.Response(503)
+
+    started = time.monotonic()
+    async with _client(handler) as client:
+        with pytest.raises(LybicInternalError):
+            await client.request("GET", "/test", deadline=0.5)
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 1
+    assert calls[0]["read"] <= 0.5
+
+
+@pytest.mark.asyncio
+async def test_slow_call_raises_deadline_exceeded():
+    """Test that a stuck call is cut at the deadline."""
+    with StubServer(latency=2.0) as server:
+        auth = stub_auth(server)
+        async with LybicClient(auth, timeout=httpx.Timeout(30.0, connect=5.0)) as client:
+            started = time.monotonic()
+            with pytest.raises(LybicDeadlineExceededError) as exc_info:
+                await client.sandbox.execute_sandbox_action("SBX-1", action={"type": "wait", "duration": 1},
+                                                            deadline=0.3)
+            assert time.monotonic() - started < 1.0
+    assert isinstance(exc_info.value, TimeoutError)
+    assert exc_info.value.deadline == 0.3
+
+
+def test_sync_client_honors_deadline_context():
+    """Test that the sync client reads the deadline of the current context."""
+    with StubServer(latency=2.0) as server:
+        auth = stub_auth(server)
+        with LybicSyncClient(auth) as client:
+            started = time.monotonic()
+            with pytest.raises(LybicDeadlineExceededError):
+                with Deadline(0.3):
+                    client.stats.get()
+            assert time.monotonic() - started < 1.0
+
+
+def test_split_timeouts_are_used_without_deadline():
+    """Test that an httpx.Timeout passed to the client reaches every request."""
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json={})
+
+    with _client(handler, LybicSyncClient, timeout=httpx.Timeout(5.0, connect=1.0)) as client:
+        client.request("GET", "/test")
+    assert timeouts == [{"connect": 1.0, "read": 5.0, "write": 5.0, "pool": 5.0}]
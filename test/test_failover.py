@@ -0,0 +1,100 @@
+"""Test latency-based endpoint selection and failover between local stub servers."""
+import socket
+
+import httpx
+import pytest
+
+from lybic import EndpointSelector, LybicClient, LybicInternalError, RetryPolicy
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_auth
+from .stub_server import StubServer, default_handler
+
+
+def _dead_endpoint() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _client(selector: EndpointSelector, cls=LybicClient, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=0))
+    return cls(mock_auth(selector.endpoints[0]), failover=selector, **kwargs)
+
+
+def test_selector_ranks_by_latency_and_errors():
+    """Test the EWMA ranking, the cooldown of failing endpoints and the unmeasured-first order."""
+    selector = EndpointSelector(["http://a", "http://b", "http://c"], smoothing=0.5, cooldown=60)
+    assert selector.choose() == "http://a"
+    selector.record("http://a", 0.10)
+    assert selector.choose() == "http://b"  # not measured yet
+    selector.record("http://b", 0.02)
+    selector.record("http://c", 0.05)
+    assert selector.choose() == "http://b"
+
+    selector.record("http://b", 0.2)  # EWMA: 0.02 + 0.5 * (0.2 - 0.02) = 0.11
+    assert selector.choose() == "http://c"
+    selector.record("http://c", None, ConnectionError())  # not an HTTP failure, kept in rotation
+    assert selector.is_healthy("http://c")
+
+    assert selector.choose(exclude=("http://c",)) == "http://a"
+    selector.record("http://a", None, httpx.ConnectError("refused"))
+    assert not selector.is_healthy("http://a")
+    assert [state["endpoint"] for state in selector.snapshot()][-1] == "http://a"
+    assert selector.choose(exclude=("http://b", "http://c")) == "http://a"  # all down: try anyway
+
+
+@pytest.mark.asyncio
+async def test_traffic_goes_to_the_fastest_endpoint():
+    """Test that after probing, calls are sent to the endpoint with the lowest latency."""
+    with StubServer(latency=0.06) as slow, StubServer(latency=0.005) as fast, StubServer(latency=0.03) as medium:
+        selector = EndpointSelector([slow.url, fast.url, medium.url])
+        async with _client(selector) as client:
+            ranking = await client.probe_endpoints()
+            for _ in range(10):
+                await client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+    assert ranking[0]["endpoint"] == fast.url
+    # probes are HEAD requests, the calls all went to the fast endpoint
+    assert (slow.requests, fast.requests, medium.requests) == (1, 11, 1)
+
+
+@pytest.mark.asyncio
+async def test_fails_over_inside_one_call():
+    """Test that a refused connection and a 503 on GET fail over to the next endpoint without an error."""
+    dead = _dead_endpoint()
+
+    def unavailable(request):
+        if request.method == "GET":
+            return 503, "Service Unavailable"
+        return default_handler(request)
+
+    with StubServer(handler=unavailable) as broken, StubServer() as healthy:
+        selector = EndpointSelector([dead, broken.url, healthy.url], cooldown=60)
+        async with _client(selector) as client:
+            await client.request("GET", "/api/orgs/test_org/sandboxes/SBX-0")
+            assert not selector.is_healthy(dead) and not selector.is_healthy(broken.url)
+            assert (broken.requests, healthy.requests) == (1, 1)
+            # unhealthy endpoints are skipped by the next calls
+            result = await client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+            assert result.screenShot
+        assert (broken.requests, healthy.requests) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_failed_over_after_reaching_the_server():
+    """Test that a POST answered with 503 is not sent again to another endpoint."""
+    with StubServer(handler=lambda request: (503, "Service Unavailable")) as broken, StubServer() as healthy:
+        async with _client(EndpointSelector([broken.url, healthy.url])) as client:
+            with pytest.raises(LybicInternalError):
+                await client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+    assert healthy.requests == 0
+
+
+def test_sync_client_fails_over():
+    """Test failover in LybicSyncClient."""
+    with StubServer() as healthy:
+        selector = EndpointSelector([_dead_endpoint(), healthy.url])
+        with _client(selector, cls=LybicSyncClient) as client:
+            assert client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"}).screenShot
+            ranking = client.probe_endpoints()
+    assert ranking[0]["endpoint"] == healthy.url and not ranking[1]["healthy"]
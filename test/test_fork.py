@@ -0,0 +1,91 @@
+"""Test clients created before a fork in the child process."""
+import asyncio
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from lybic import LybicAuth, LybicClient, PerProcess
+from lybic_sync import LybicSyncClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="fork is not available")
+
+_fork = multiprocessing.get_context("fork") if hasattr(os, "register_at_fork") else None
+
+
+def _sync_child(client: LybicSyncClient, queue):
+    inherited = client.client is not None or bool(client.transport._pools)  # pylint: disable=protected-access
+    result = client.sandbox.execute_sandbox_action("SBX-1", action={"type": "screenshot"})
+    queue.put((inherited, bool(result.screenShot)))
+
+
+def _async_child(client: LybicClient, queue):
+    inherited = client.client is not None or bool(client.transport._pools)  # pylint: disable=protected-access
+    result = asyncio.run(client.sandbox.execute_sandbox_action("SBX-1", action={"type": "screenshot"}))
+    queue.put((inherited, bool(result.screenShot)))
+
+
+def _run_child(target, client) -> tuple:
+    queue = _fork.Queue()
+    process = _fork.Process(target=target, args=(client, queue))
+    process.start()
+    outcome = queue.get(timeout=30)
+    process.join(30)
+    assert process.exitcode == 0
+    return outcome
+
+
+def test_sync_client_opens_its_own_connections_after_fork():
+    """Test the child drops the pools inherited from the parent and connects again."""
+    with StubServer() as server:
+        client = LybicSyncClient(stub_auth(server))
+        client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+        assert server.connections == 1
+
+        inherited, ok = _run_child(_sync_child, client)
+        assert not inherited and ok
+        assert server.connections == 2
+
+        # the parent keeps its connection
+        client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+        assert server.connections == 2
+        client.close()
+
+
+def test_async_client_opens_its_own_connections_after_fork():
+    """Test the async client of the parent can be used from an event loop of the child."""
+    with StubServer() as server:
+        client = LybicClient(stub_auth(server))
+
+        async def parent():
+            await client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+
+        asyncio.run(parent())
+        inherited, ok = _run_child(_async_child, client)
+    assert not inherited and ok
+    assert server.connections == 2
+
+
+def _pid_of_client(clients: PerProcess) -> tuple:
+    return os.getpid(), id(clients.get())
+
+
+def test_per_process_builds_one_instance_per_process():
+    """Test PerProcess in a process pool, and its pickled form."""
+    clients = PerProcess(LybicSyncClient, LybicAuth(org_id="test_org", api_key="test_key"))
+    assert clients.get() is clients.get()
+
+    copy = pickle.loads(pickle.dumps(clients))
+    assert copy.get() is clients.get()
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=_fork) as pool:
+        seen = set(pool.map(_pid_of_client, [clients] * 20))
+    pids = {pid for pid, _ in seen}
+    assert os.getpid() not in pids
+    # one instance per worker process
+    assert len(seen) == len(pids)
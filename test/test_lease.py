@@ -0,0 +1,79 @@
+"""Test the lease manager against a stub of the extend and delete endpoints."""
+import asyncio
+import time
+
+import pytest
+
+from lybic import LeaseManager
+from lybic.lease import MAX_TOTAL_LIFE_SECONDS
+
+from .helpers import stub_client
+from .stub_server import StubServer
+
+
+class LeaseStub:
+    """Records the extend and delete calls, sandboxes in `gone` answer 404."""
+
+    def __init__(self):
+        self.extends = []
+        self.deleted = []
+        self.gone = set()
+
+    def __call__(self, request):
+        sandbox_id = request.path.split("/")[5]
+        if sandbox_id in self.gone:
+            return 404, {"code": "NOT_FOUND", "message": "sandbox not found"}
+        if request.method == "DELETE":
+            self.deleted.append(sandbox_id)
+            return 200, {}
+        self.extends.append((sandbox_id, request.json()["maxLifeSeconds"], time.monotonic()))
+        return 200, {}
+
+
+@pytest.mark.asyncio
+async def test_extends_just_in_time_in_batches():
+    """Test that sandboxes due close together are extended in one wake-up, once each."""
+    stub = LeaseStub()
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with LeaseManager(client, extend_seconds=600, margin=0.1, jitter=0, batch_window=1) as leases:
+                now = time.time()
+                for index in range(3):
+                    leases.acquire(f"SBX-{index}", expires_at=now + 0.3 + index * 0.2)
+                await asyncio.sleep(0.1)
+                assert not stub.extends
+                for _ in range(300):
+                    if len(stub.extends) == 3:
+                        break
+                    await asyncio.sleep(0.01)
+                assert {sandbox_id for sandbox_id, _, _ in stub.extends} == {"SBX-0", "SBX-1", "SBX-2"}
+                assert leases.get("SBX-2").remaining > 500
+                stats = leases.stats()
+    assert len(stub.extends) == 3
+    assert {seconds for _, seconds, _ in stub.extends} == {600}
+    assert max(at for _, _, at in stub.extends) - min(at for _, _, at in stub.extends) < 0.15
+    assert stats["extended"] == 3 and stats["next_extension_seconds"] > 500
+
+
+@pytest.mark.asyncio
+async def test_total_life_limit_release_and_gone_sandboxes():
+    """Test the 13-day cap, the deletion on release and the drop of sandboxes that are gone."""
+    stub = LeaseStub()
+    stub.gone.add("SBX-gone")
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with LeaseManager(client, extend_seconds=600, margin=0.1, jitter=0) as leases:
+                now = time.time()
+                old = leases.acquire("SBX-old", expires_at=now, created_at=now - MAX_TOTAL_LIFE_SECONDS + 99.5)
+                leases.acquire("SBX-gone", expires_at=now)
+                async with leases.lease("SBX-task") as lease:
+                    for _ in range(300):
+                        if lease.extensions:
+                            break
+                        await asyncio.sleep(0.01)
+                    assert lease.extensions == 1
+                assert "SBX-task" not in leases
+                assert "SBX-gone" not in leases
+                assert old.final and old.extensions == 1
+    assert ("SBX-old", 99) in [(sandbox_id, seconds) for sandbox_id, seconds, _ in stub.extends]
+    assert stub.deleted == ["SBX-task"]
@@ -0,0 +1,64 @@
+"""Test the lazy log arguments and the structured HTTP log."""
+import logging
+from unittest.mock import MagicMock, PropertyMock
+
+import httpx
+import pytest
+
+from lybic import log
+from lybic.log import log_body, log_model
+
+from .helpers import mock_client
+
+
+def test_arguments_are_not_rendered_when_disabled(caplog):
+    """Test that bodies and DTOs are not decoded or serialized while DEBUG is off."""
+    caplog.set_level(logging.INFO, logger="lybic")
+    response = MagicMock()
+    text = PropertyMock(return_value="{}")
+    type(response).text = text
+    model = MagicMock()
+
+    logging.getLogger("lybic.base").debug("response: %s, request: %s", log_body(response), log_model(model))
+
+    text.assert_not_called()
+    model.model_dump_json.assert_not_called()
+    assert not caplog.records
+
+
+def test_arguments_are_truncated(caplog, monkeypatch):
+    """Test that rendered bodies are capped at MAX_LOGGED_BODY characters."""
+    monkeypatch.setattr(log, "MAX_LOGGED_BODY", 10)
+    caplog.set_level(logging.DEBUG, logger="lybic")
+    response = httpx.Response(200, text="x" * 25)
+
+    logging.getLogger("lybic.base").debug("response: %s", log_body(response))
+    assert caplog.records[0].getMessage() == "response: xxxxxxxxxx... (15 more characters)"
+    assert str(log_body(response, limit=30)) == "x" * 25
+
+
+@pytest.mark.asyncio
+async def test_structured_exchange_record(caplog):
+    """Test that each attempt emits one record carrying its fields on the lybic.http logger."""
+    caplog.set_level(logging.DEBUG, logger="lybic.http")
+
+    def handler(request):
+        if request.url.path == "/fail":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    async with mock_client(handler) as client:
+        await client.request("GET", "/test")
+        with pytest.raises(httpx.ConnectError):
+            await client.request("GET", "/fail")
+
+    records = [record for record in caplog.records if record.name == "lybic.http"]
+    assert len(records) == 2
+    fields = records[0].lybic
+    assert fields["method"] == "GET"
+    assert fields["url"] == "https://api.example.com/test"
+    assert fields["status"] == 200
+    assert fields["response_bytes"] == len(b'{"ok":true}')
+    assert fields["response_body"] == '{"ok":true}'
+    assert records[1].lybic["status"] is None
+    assert records[1].lybic["error"] == "ConnectError"
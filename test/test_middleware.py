@@ -0,0 +1,88 @@
+"""Test the middleware chain of the clients."""
+import httpx
+import pytest
+
+from lybic import LybicClient, Middleware, RetryPolicy, dto
+from lybic.middleware import RetryMiddleware
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+STATS = {"mcpServers": 1, "sandboxes": 2, "projects": 3}
+
+
+def _client(handler, client_class=LybicClient, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=2, base_delay=0.0, max_delay=0.0))
+    return mock_client(handler, client_class, **kwargs)
+
+
+class Recorder(Middleware):
+    """Record what the hooks see."""
+
+    def __init__(self):
+        self.seen = []
+        self.parsed = []
+
+    def before(self, context):
+        self.seen.append((context.template, context.sandbox_id, context.attempt))
+
+    def on_parsed(self, context, model):
+        self.parsed.append((context.template, model))
+
+
+class FlakyNetwork(Middleware):
+    """Fail the first attempt of every call."""
+
+    def before(self, context):
+        if context.attempt == 0:
+            raise httpx.ConnectError("injected fault")
+
+
+class Header(Middleware):
+    """Add a header to every attempt."""
+
+    def before(self, context):
+        context.kwargs["headers"]["X-Trace-Id"] = "trace-1"
+
+
+@pytest.mark.asyncio
+async def test_middlewares_see_route_attempts_and_dto():
+    """Test that custom middlewares run per attempt and see the route, sandbox and parsed DTO."""
+    recorder = Recorder()
+    async with _client(lambda request: httpx.Response(200, json=STATS),
+                       middlewares=[recorder, FlakyNetwork()]) as client:
+        await client.request("POST", "/api/orgs/test_org/sandboxes/SBX-1/actions/execute", json={})
+        stats = await client.stats.get()
+
+    assert recorder.seen == [
+        ("/api/orgs/{org_id}/sandboxes/{sandbox_id}/actions/execute", "SBX-1", 0),
+        ("/api/orgs/{org_id}/sandboxes/{sandbox_id}/actions/execute", "SBX-1", 1),
+        ("/api/orgs/{org_id}/stats", None, 0),
+        ("/api/orgs/{org_id}/stats", None, 1),
+    ]
+    assert recorder.parsed == [("/api/orgs/{org_id}/stats", stats)]
+    assert isinstance(stats, dto.StatsResponseDto)
+
+
+@pytest.mark.asyncio
+async def test_middleware_before_retry_sees_the_whole_call():
+    """Test that a middleware inserted before the RetryMiddleware runs once per call."""
+    recorder = Recorder()
+    async with _client(lambda request: httpx.Response(200, json={}), middlewares=[FlakyNetwork()]) as client:
+        assert isinstance(client.middlewares[0], RetryMiddleware)
+        client.middlewares.insert(0, recorder)
+        await client.request("GET", "/test")
+    assert recorder.seen == [("/test", None, 0)]
+
+
+def test_sync_client_runs_middlewares():
+    """Test that before/after hooks work unchanged in the sync client."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("X-Trace-Id"))
+        return httpx.Response(200, json={})
+
+    with _client(handler, LybicSyncClient, middlewares=[Header(), FlakyNetwork()]) as client:
+        client.request("GET", "/test")
+    assert seen == ["trace-1"]
@@ -0,0 +1,120 @@
+"""Test the client-side token-bucket rate limiter."""
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from lybic import Deadline, LybicClient, LybicDeadlineExceededError, RateLimiter, RateLimit, RetryPolicy
+from lybic.routes import match_route, route_class
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+
+def _client(handler, client_class=LybicClient, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=1))
+    return mock_client(handler, client_class, **kwargs)
+
+
+def test_route_classes():
+    """Test that routes are grouped into route classes."""
+    def classify(path):
+        return route_class(match_route(path).template)
+
+    assert classify("/api/orgs/o/sandboxes/S/actions/execute") == "actions"
+    assert classify("/api/orgs/o/sandboxes/S/shell/stream") == "actions"
+    assert classify("/api/orgs/o/sandboxes") == "lifecycle"
+    assert classify("/api/orgs/o/sandboxes/S/file/copy") == "files"
+    assert classify("/api/orgs/o/stats") == "default"
+
+
+def test_bucket_burst_and_refill():
+    """Test that a burst is free and the next tokens wait for the refill."""
+    limiter = RateLimiter({"actions": RateLimit(rate=10, burst=2)})
+    with patch("lybic.rate_limit.time.monotonic", return_value=0.0):
+        waits = [limiter.reserve("org", "actions") for _ in range(4)]
+        assert limiter.reserve("org", "lifecycle") == 0
+    assert waits == pytest.approx([0, 0, 0.1, 0.2])
+    with patch("lybic.rate_limit.time.monotonic", return_value=1.0):
+        assert limiter.reserve("org", "actions") == 0
+
+
+def test_org_limits_and_default():
+    """Test per-org overrides and the default route class."""
+    limiter = RateLimiter(
+        {"default": RateLimit(rate=1, burst=1)},
+        org_limits={"big_org": {"default": RateLimit(rate=100, burst=100)}},
+    )
+    with patch("lybic.rate_limit.time.monotonic", return_value=0.0):
+        assert [limiter.reserve("small_org", "files") for _ in range(2)] == [0, 1]
+        assert [limiter.reserve("big_org", "files") for _ in range(2)] == [0, 0]
+
+
+def test_learns_from_throttling():
+    """Test that a 429 halves the rate, holds the bucket and recovers on success."""
+    limiter = RateLimiter({"actions": RateLimit(rate=10, burst=10)}, recovery=0.1)
+    with patch("lybic.rate_limit.time.monotonic", return_value=0.0):
+        limiter.on_throttled("org", "actions", retry_after=2)
+        assert limiter.snapshot()[0]["rate"] == 5
+        assert limiter.reserve("org", "actions") == pytest.approx(2.2)
+        limiter.on_success("org", "actions")
+        assert limiter.snapshot()[0]["rate"] == 6
+
+
+def test_reservation_beyond_max_wait_takes_no_token():
+    """Test that a request that would wait past its limit is refused without using up a token."""
+    limiter = RateLimiter({"default": RateLimit(rate=1, burst=1)})
+    with patch("lybic.rate_limit.time.monotonic", return_value=0.0):
+        assert limiter.reserve("org", "default") == 0
+        assert limiter.reserve("org", "default", max_wait=0.5) is None
+        assert limiter.reserve("org", "default", max_wait=2) == 1
+
+
+def test_thread_safe_reservations():
+    """Test that concurrent reservations never hand out the same token twice."""
+    limiter = RateLimiter({"default": RateLimit(rate=1, burst=1)})
+    waits = []
+    with patch("lybic.rate_limit.time.monotonic", return_value=0.0):
+        threads = [threading.Thread(target=lambda: waits.append(limiter.reserve("org", "default")))
+                   for _ in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sorted(waits) == list(range(32))
+
+
+@pytest.mark.asyncio
+async def test_client_waits_for_tokens_and_learns_from_429():
+    """Test that the async client smooths bursts and slows down after a 429."""
+    responses = [httpx.Response(429, headers={"Retry-After": "1"})] + [httpx.Response(200, json={})] * 3
+    limiter = RateLimiter({"default": RateLimit(rate=4, burst=2)})
+    with patch("lybic.middleware.asyncio.sleep") as sleep:
+        async with _client(lambda request: responses.pop(0), rate_limiter=limiter) as client:
+            for _ in range(3):
+                await client.request("GET", "/api/orgs/test_org/stats")
+    assert limiter.snapshot()[0]["rate"] < 4
+    assert sleep.call_count >= 2
+
+
+def test_sync_client_waits_for_tokens():
+    """Test that the sync client sleeps instead of sending a burst."""
+    limiter = RateLimiter({"actions": RateLimit(rate=5, burst=1)})
+    with patch("lybic.middleware.time.sleep") as sleep:
+        with _client(lambda request: httpx.Response(200, json={}), LybicSyncClient, rate_limiter=limiter) as client:
+            for _ in range(3):
+                client.request("POST", "/api/orgs/test_org/sandboxes/S/actions/execute")
+    assert sleep.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_rejected_for_its_deadline_leaves_the_token():
+    """Test that a call that cannot get a token before its deadline does not delay the next calls."""
+    limiter = RateLimiter({"default": RateLimit(rate=1, burst=1)})
+    async with _client(lambda request: httpx.Response(200, json={}), rate_limiter=limiter) as client:
+        await client.request("GET", "/api/orgs/test_org/stats")
+        with pytest.raises(LybicDeadlineExceededError):
+            async with Deadline(0.5):
+                await client.request("GET", "/api/orgs/test_org/stats")
+    assert limiter.snapshot()[0]["tokens"] > -0.5
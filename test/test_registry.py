@@ -0,0 +1,82 @@
+"""Test the multi-tenant client registry."""
+import asyncio
+import threading
+
+import pytest
+
+from lybic import LybicAuth, LybicClientRegistry, RateLimiter, TransportConfig
+from lybic_sync import LybicSyncClientRegistry
+
+from .stub_server import StubServer, default_handler
+
+TENANTS = 500
+MAX_CONNECTIONS = 16
+
+
+def _auth(server: StubServer, index: int) -> LybicAuth:
+    return LybicAuth(org_id=f"org-{index}", api_key=f"key-{index}", endpoint=server.url)
+
+
+@pytest.mark.asyncio
+async def test_tenants_share_pools_and_keep_their_headers():
+    """Test that hundreds of tenants share one pool per endpoint and send their own credentials."""
+    seen = []
+
+    def handler(request):
+        seen.append((request.path.split("/")[3], request.headers["x-api-key"]))
+        return default_handler(request)
+
+    with StubServer(handler=handler, latency=0.001) as server:
+        async with LybicClientRegistry(transport=TransportConfig(max_connections=MAX_CONNECTIONS)) as registry:
+            clients = [registry.get(_auth(server, index)) for index in range(TENANTS)]
+            await asyncio.gather(*[
+                client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"}) for client in clients
+            ])
+            assert len(registry) == TENANTS
+            assert registry.pool_count == 1
+            assert registry.get(_auth(server, 0)) is clients[0]
+            assert _auth(server, 1) in registry
+
+    assert sorted(seen) == sorted((f"org-{index}", f"key-{index}") for index in range(TENANTS))
+    assert server.max_in_flight <= MAX_CONNECTIONS
+
+
+@pytest.mark.asyncio
+async def test_options_give_each_tenant_its_own_components():
+    """Test per-tenant options and discarding a tenant."""
+    with StubServer() as server:
+        registry = LybicClientRegistry(timeout=5, options=lambda auth: {"rate_limiter": RateLimiter()})
+        first, second = registry.get(_auth(server, 1)), registry.get(_auth(server, 2))
+        assert first.rate_limiter is not second.rate_limiter
+        assert first.timeout == second.timeout == 5
+
+        await first.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+        assert registry.discard(_auth(server, 1)) is first
+        await first.close()
+        # the pools survive the discarded tenant
+        await second.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"})
+        assert server.connections == 1
+        await registry.close()
+    assert len(registry) == 0
+
+
+def test_sync_registry_from_threads():
+    """Test the sync registry handing out clients to many threads."""
+    errors = []
+    with StubServer() as server:
+        with LybicSyncClientRegistry(transport=TransportConfig(max_connections=MAX_CONNECTIONS)) as registry:
+            def work(index):
+                try:
+                    client = registry.get(_auth(server, index % 50))
+                    assert client.sandbox.execute_sandbox_action("SBX-0", action={"type": "screenshot"}).screenShot
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    errors.append(e)
+
+            threads = [threading.Thread(target=work, args=(index,)) for index in range(200)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(registry) == 50
+    assert not errors
+    assert server.max_in_flight <= MAX_CONNECTIONS
@@ -0,0 +1,130 @@
+"""Test the retry policy shared by the Lybic clients."""
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from lybic import LybicClient, LybicAPIError, RetryPolicy, RetryBudget
+from lybic.gui_agents.api.agent import Client as AgentClient
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_client
+
+
+def _status_error(status_code: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.example.com/test")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def _client(handler, client_class=LybicClient, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy())
+    return mock_client(handler, client_class, **kwargs)
+
+
+def test_status_classification():
+    """Test which errors are retried for idempotent and non-idempotent methods."""
+    policy = RetryPolicy()
+    assert policy.is_retryable("GET", _status_error(503))
+    assert not policy.is_retryable("GET", _status_error(400))
+    assert not policy.is_retryable("GET", _status_error(404))
+    assert not policy.is_retryable("POST", _status_error(500))
+    assert policy.is_retryable("POST", _status_error(429))
+    assert policy.is_retryable("POST", httpx.ConnectError("refused"))
+    assert not policy.is_retryable("POST", httpx.ReadTimeout("timeout"))
+    assert policy.is_retryable("GET", httpx.ReadTimeout("timeout"))
+
+
+def test_backoff_is_jittered_and_bounded():
+    """Test decorrelated jitter stays within [base_delay, max_delay]."""
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    delay = None
+    for _ in range(50):
+        delay = policy.backoff(delay)
+        assert 0.1 <= delay <= 1.0
+
+
+def test_retry_after():
+    """Test that Retry-After is honored and that too long waits are not retried."""
+    policy = RetryPolicy(base_delay=0.01, max_delay=10)
+    assert policy.next_delay("GET", 0, _status_error(503, {"Retry-After": "5"})) >= 5
+    assert policy.next_delay("GET", 0, _status_error(503, {"Retry-After": "60"})) is None
+    assert policy.next_delay("GET", 3, _status_error(503)) is None
+
+
+def test_retry_budget():
+    """Test that the budget caps retries as a fraction of requests."""
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_retry_client_errors():
+    """Test that a 404 is raised immediately."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404, json={"message": "not found"})
+
+    async with _client(handler) as client:
+        with pytest.raises(LybicAPIError):
+            await client.request("GET", "/test")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_retries_unavailable_with_retry_after():
+    """Test that a 503 is retried after the Retry-After delay."""
+    responses = [httpx.Response(503, headers={"Retry-After": "2"}), httpx.Response(200, json={})]
+    with patch("lybic.middleware.asyncio.sleep") as sleep:
+        async with _client(lambda request: responses.pop(0)) as client:
+            response = await client.request("GET", "/test")
+    assert response.status_code == 200
+    assert sleep.call_args[0][0] >= 2
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_sleep_after_last_attempt():
+    """Test that the final network error is raised without sleeping."""
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    with patch("lybic.middleware.asyncio.sleep") as sleep:
+        async with _client(handler, retry_policy=RetryPolicy(max_retries=2)) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.request("POST", "/test")
+    assert sleep.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_client_retries_through_the_middlewares():
+    """Test that the agent client honours Retry-After and raises API errors like the other clients."""
+    responses = [
+        httpx.Response(503, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"version": "1.0"}),
+        httpx.Response(400, json={"message": "bad request", "code": "BAD_REQUEST"}),
+    ]
+    with patch("lybic.middleware.asyncio.sleep") as sleep:
+        async with _client(lambda request: responses.pop(0)) as client:
+            async with AgentClient(lybic_client=client) as agent:
+                assert (await agent.get_agent_info()).version == "1.0"
+                with pytest.raises(LybicAPIError):
+                    await agent.get_agent_info()
+    assert sleep.call_count == 1 and sleep.call_args[0][0] >= 2
+
+
+def test_sync_client_does_not_retry_post_server_errors():
+    """Test that non-idempotent requests are not retried after reaching the server."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, json={"message": "boom"})
+
+    with _client(handler, LybicSyncClient) as client:
+        with pytest.raises(LybicAPIError):
+            client.request("POST", "/test")
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+"""Test conditional requests with ETag / Last-Modified revalidation against a local stub server."""
+import pytest
+
+from lybic import LybicClient, RevalidationCache
+from lybic_sync import LybicSyncClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+
+class StatsEndpoint:
+    """A stats endpoint that honors If-None-Match."""
+
+    def __init__(self):
+        self.version = 1
+        self.conditional = []
+
+    def __call__(self, request):
+        etag = f'"v{self.version}"'
+        self.conditional.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == etag:
+            return 304, b"", {"ETag": etag}
+        body = {"mcpServers": 1, "sandboxes": self.version, "projects": 1}
+        return 200, body, {"ETag": etag, "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+
+@pytest.mark.asyncio
+async def test_not_modified_returns_previous_dto():
+    """Test that a 304 returns the previously parsed DTO and a change returns a new one."""
+    endpoint = StatsEndpoint()
+    revalidation = RevalidationCache()
+    with StubServer(endpoint) as server:
+        async with LybicClient(stub_auth(server), revalidation=revalidation) as client:
+            first = await client.stats.get()
+            second = await client.stats.get()
+            assert second is first
+
+            endpoint.version = 2
+            third = await client.stats.get()
+            assert third.sandboxes == 2
+            assert await client.stats.get() is third
+    assert endpoint.conditional == [None, '"v1"', '"v1"', '"v2"']
+    assert revalidation.not_modified == 2
+
+
+@pytest.mark.asyncio
+async def test_routes_not_revalidated_are_sent_unconditionally():
+    """Test that only configured routes send validators."""
+    endpoint = StatsEndpoint()
+    with StubServer(endpoint) as server:
+        async with LybicClient(stub_auth(server), revalidation=RevalidationCache(routes=())) as client:
+            first = await client.stats.get()
+            assert await client.stats.get() is not first
+    assert endpoint.conditional == [None, None]
+
+
+def test_sync_client_revalidates():
+    """Test that the sync client sends If-None-Match and reuses the DTO on 304."""
+    endpoint = StatsEndpoint()
+    with StubServer(endpoint) as server:
+        with LybicSyncClient(stub_auth(server), revalidation=RevalidationCache()) as client:
+            first = client.stats.get()
+            assert client.stats.get() is first
+    assert endpoint.conditional == [None, '"v1"']
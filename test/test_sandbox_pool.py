@@ -0,0 +1,165 @@
+"""Test the warm sandbox pool against a stub of the sandbox lifecycle."""
+import asyncio
+import itertools
+
+import pytest
+
+from lybic import LybicSandboxNotReadyError, SandboxPool
+
+from .helpers import stub_client
+from .stub_server import StubServer
+
+SANDBOXES = "/api/orgs/test_org/sandboxes"
+
+
+class SandboxStub:
+    """Creates sandboxes that turn RUNNING after `polls` status checks, or `final` status, after rejecting
+    the first `rejected` creations."""
+
+    def __init__(self, polls: int = 1, final: str = "RUNNING", rejected: int = 0):
+        self.polls = polls
+        self.final = final
+        self.rejected = rejected
+        self.ids = itertools.count()
+        self.checks = {}
+        self.deleted = []
+        self.starting = set()
+        self.max_starting = 0
+
+    def _sandbox(self) -> dict:
+        sandbox_id = f"SBX-{next(self.ids)}"
+        self.checks[sandbox_id] = 0
+        self.starting.add(sandbox_id)
+        self.max_starting = max(self.max_starting, len(self.starting))
+        return {"id": sandbox_id, "name": "pooled-sandbox", "expiresAt": "", "createdAt": "", "projectId": "p",
+                "status": "PENDING"}
+
+    def __call__(self, request):
+        if request.method == "POST" and self.rejected:
+            self.rejected -= 1
+            return 429, {"message": "Too many sandboxes", "code": "TOO_MANY_REQUESTS"}
+        if request.method == "POST" and request.path == SANDBOXES:
+            return 200, self._sandbox()
+        if request.method == "POST" and request.path == f"{SANDBOXES}/from-image":
+            return 200, {"sandbox": self._sandbox(), "bookId": "book"}
+        sandbox_id = request.path.split("/")[5]
+        if request.method == "DELETE":
+            self.deleted.append(sandbox_id)
+            return 200, {}
+        self.checks[sandbox_id] += 1
+        if self.checks[sandbox_id] < self.polls:
+            return 200, {"status": "PENDING"}
+        self.starting.discard(sandbox_id)
+        return 200, {"status": self.final}
+
+
+async def _until(predicate, timeout: float = 5.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.mark.asyncio
+async def test_prefilled_pool_hands_out_ready_sandboxes_and_refills():
+    """Test hits on a prefilled pool, deletion on release and the background refill."""
+    stub = SandboxStub(polls=2)
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxPool(client, shapes={"small": 2}, poll_interval=0.01) as pool:
+                await _until(lambda: pool.stats()["ready"] == 2)
+                async with pool.acquire(shape="small") as sandbox:
+                    assert stub.checks[sandbox.id] == 2
+                await _until(lambda: pool.stats()["ready"] == 2)
+                stats = pool.stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+    assert stats["created"] == 3
+    assert stub.deleted[0] == sandbox.id
+    # closing deleted the ready sandboxes
+    assert len(stub.deleted) == 3
+
+
+@pytest.mark.asyncio
+async def test_creations_are_bounded():
+    """Test that at most max_concurrent_creates sandboxes are starting at once."""
+    stub = SandboxStub(polls=3)
+    with StubServer(handler=stub, latency=0.005) as server:
+        async with stub_client(server) as client:
+            async with SandboxPool(client, shapes={"small": 6}, max_concurrent_creates=2, poll_interval=0.01) as pool:
+                await _until(lambda: pool.stats()["ready"] == 6)
+    assert stub.max_starting == 2
+
+
+@pytest.mark.asyncio
+async def test_on_demand_image_and_recycling():
+    """Test a miss on an image that was not configured, and recycling released sandboxes."""
+    stub = SandboxStub()
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            pool = SandboxPool(client, images={"IMG-1": 1}, recycle=True, poll_interval=0.01)
+            async with pool:
+                first = await pool.get(image_id="IMG-2", timeout=5)
+                await pool.release(first, image_id="IMG-2")  # the pool keeps no IMG-2 sandbox
+
+                await _until(lambda: pool.stats()["ready"] == 1)
+                async with pool.acquire(image_id="IMG-1") as sandbox:
+                    pass
+                async with pool.acquire(image_id="IMG-1") as again:
+                    pass
+                with pytest.raises(KeyError):
+                    async with pool.acquire(image_id="IMG-1"):
+                        raise KeyError("broken sandbox")
+                stats = pool.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 3
+    assert again.id == sandbox.id and stats["recycled"] >= 1
+    assert first.id in stub.deleted and sandbox.id in stub.deleted
+
+
+@pytest.mark.asyncio
+async def test_failed_sandbox_is_reported_to_the_waiter():
+    """Test that a sandbox that stops instead of running fails the waiting call and is deleted."""
+    stub = SandboxStub(final="ERROR")
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxPool(client, poll_interval=0.01) as pool:
+                with pytest.raises(LybicSandboxNotReadyError) as error:
+                    await pool.get(shape="small", timeout=5)
+                assert pool.stats()["failed"] == 1
+    assert error.value.status == "ERROR"
+    assert stub.deleted == [error.value.sandbox_id]
+
+
+@pytest.mark.asyncio
+async def test_recycled_sandbox_is_not_handed_out_past_its_lifetime():
+    """Test that recycling does not extend the life of a sandbox beyond its expiration."""
+    stub = SandboxStub()
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            pool = SandboxPool(client, shapes={"small": 1}, recycle=True, max_life_seconds=1, expiry_margin=0.6,
+                               poll_interval=0.01)
+            async with pool:
+                first = await pool.get(shape="small", timeout=5)
+                await pool.release(first, shape="small")
+                assert pool.stats()["recycled"] == 1
+                await asyncio.sleep(0.45)
+                # the recycled sandbox is within the margin of its expiration
+                second = await pool.get(shape="small", timeout=5)
+                await asyncio.sleep(0.45)
+                await pool.release(second, shape="small")
+                stats = pool.stats()
+    assert second.id != first.id
+    assert stats["expired"] == 2 and stats["recycled"] == 1
+    assert first.id in stub.deleted and second.id in stub.deleted
+
+
+@pytest.mark.asyncio
+async def test_pool_recovers_from_failed_creations():
+    """Test that the pool refills with a backoff after rejected creations until it reaches its target."""
+    stub = SandboxStub(rejected=3)
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxPool(client, shapes={"small": 2}, retry_delay=0.01, poll_interval=0.01) as pool:
+                await _until(lambda: pool.stats()["ready"] == 2)
+                stats = pool.stats()
+    assert stats["failed"] == 3 and stats["created"] == 2
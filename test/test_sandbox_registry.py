@@ -0,0 +1,102 @@
+"""Test the sandbox metadata registry against a stub counting the sandbox fetches."""
+import time
+
+import pytest
+
+from lybic import LybicClient, SandboxRegistry
+from lybic_sync import LybicSyncClient
+from lybic_sync.pyautogui import PyautoguiSync
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+SANDBOXES = "/api/orgs/test_org/sandboxes"
+SHAPE = {"name": "android", "description": "", "pricePerHour": 1, "requiredPlanTier": 0, "requiredFeatureFlag": None,
+         "os": "Android", "virtualization": "KVM", "architecture": "aarch64"}
+
+
+class MetadataStub:
+    """Serves Android sandboxes and counts the GET of each sandbox."""
+
+    def __init__(self, listed=("SBX-0", "SBX-1")):
+        self.listed = list(listed)
+        self.fetches = 0
+
+    @staticmethod
+    def _sandbox(sandbox_id: str, status: str) -> dict:
+        return {"id": sandbox_id, "name": "s", "expiresAt": "", "createdAt": "", "projectId": "p", "status": status}
+
+    def __call__(self, request):
+        if request.path == SANDBOXES:
+            return 200, [self._sandbox(sandbox_id, "STOPPED") for sandbox_id in self.listed]
+        parts = request.path.split("/")
+        if request.method == "GET" and len(parts) == 6:
+            self.fetches += 1
+            return 200, {"sandbox": {**self._sandbox(parts[5], "RUNNING"), "shape": SHAPE},
+                         "connectDetails": {"gatewayAddresses": [], "certificateHashBase64": "", "endUserToken": "t",
+                                            "roomId": parts[5]}}
+        if parts[-1] == "process":
+            return 200, {"exitCode": 0}
+        return 200, {}
+
+
+@pytest.mark.asyncio
+async def test_steady_state_costs_no_fetch():
+    """Test that OS checks and connection details are served from the registry until a mutation."""
+    stub = MetadataStub()
+    registry = SandboxRegistry()
+    with StubServer(handler=stub) as server:
+        auth = stub_auth(server)
+        async with LybicClient(auth, sandbox_registry=registry) as client:
+            for _ in range(5):
+                await client.tools.mobile_use.set_gps_location("SBX-0", 1.0, 2.0)
+                assert (await client.sandbox.get_connection_details("SBX-0")).roomId == "SBX-0"
+            assert stub.fetches == 1
+            assert registry.shape("SBX-0").os == "Android"
+
+            await client.sandbox.extend_life("SBX-0", 600)
+            await client.sandbox.get_metadata("SBX-0")
+            await client.sandbox.restart("SBX-0")
+            await client.sandbox.get_metadata("SBX-0")
+            assert stub.fetches == 3
+            await client.sandbox.delete("SBX-0")
+            assert "SBX-0" not in registry
+
+            # a list refreshes the known sandboxes and drops the ones that are gone
+            await client.sandbox.get_metadata("SBX-1")
+            await client.sandbox.get_metadata("SBX-2")
+            await client.sandbox.list()
+            assert registry.get("SBX-1").sandbox.status.value == "STOPPED"
+            assert registry.get("SBX-1").sandbox.shape.os == "Android"
+            assert "SBX-2" not in registry
+    assert stub.fetches == 5
+
+
+def test_sync_clone_and_mobile_checks_share_the_registry():
+    """Test that the sync client and PyautoguiSync read the OS of a sandbox once."""
+    stub = MetadataStub()
+    with StubServer(handler=stub) as server:
+        auth = stub_auth(server)
+        with LybicSyncClient(auth, sandbox_registry=SandboxRegistry()) as client:
+            pyautogui = PyautoguiSync(client, "SBX-0")
+            assert pyautogui.mobile_sandbox
+            assert pyautogui.clone().mobile_sandbox
+            assert pyautogui.clone("SBX-0").mobile_sandbox
+            client.tools.mobile_use.set_gps_location("SBX-0", 1.0, 2.0)
+            assert pyautogui.clone("SBX-1").mobile_sandbox
+    assert stub.fetches == 2
+
+
+def test_refresh_keeps_the_ttl_of_the_fetch():
+    """Test that a list refresh updates an entry without extending its time to live."""
+    stub = MetadataStub(listed=("SBX-0",))
+    registry = SandboxRegistry(ttl=0.3)
+    with StubServer(handler=stub) as server:
+        auth = stub_auth(server)
+        with LybicSyncClient(auth, sandbox_registry=registry) as client:
+            client.sandbox.get("SBX-0")
+            time.sleep(0.2)
+            client.sandbox.list()
+            assert registry.get("SBX-0").sandbox.status.value == "STOPPED"
+            time.sleep(0.15)
+            assert registry.get("SBX-0") is None
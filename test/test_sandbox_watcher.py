@@ -0,0 +1,140 @@
+"""Test the sandbox watcher against a stub of the sandbox list and status endpoints."""
+import asyncio
+
+import pytest
+
+from lybic import LybicSandboxNotReadyError, SandboxPool, SandboxWatcher
+
+from .helpers import stub_client
+from .stub_server import StubServer
+
+SANDBOXES = "/api/orgs/test_org/sandboxes"
+
+
+class ListStub:
+    """Lists `statuses`; a sandbox listed with None has no status in the list, one not listed is only in `hidden`."""
+
+    def __init__(self, statuses: dict):
+        self.statuses = statuses
+        self.hidden = {}
+        self.lists = 0
+        self.status_calls = []
+
+    def __call__(self, request):
+        if request.path == SANDBOXES:
+            self.lists += 1
+            return 200, [{"id": sandbox_id, "name": "s", "expiresAt": "", "createdAt": "", "projectId": "p",
+                          "status": status} for sandbox_id, status in self.statuses.items()]
+        sandbox_id = request.path.split("/")[5]
+        self.status_calls.append(sandbox_id)
+        if sandbox_id in self.hidden:
+            return 200, {"status": self.hidden[sandbox_id]}
+        return 404, {"code": "NOT_FOUND", "message": "sandbox not found"}
+
+
+@pytest.mark.asyncio
+async def test_one_list_call_serves_all_waiters():
+    """Test that many waits are resolved by list calls, without a status call per sandbox."""
+    stub = ListStub({f"SBX-{index}": "PENDING" for index in range(50)})
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxWatcher(client, min_interval=0.01, max_interval=0.05) as watcher:
+                waits = asyncio.gather(*[watcher.wait_running(sandbox_id, timeout=5) for sandbox_id in stub.statuses])
+                await asyncio.sleep(0.05)
+                for sandbox_id in stub.statuses:
+                    stub.statuses[sandbox_id] = "RUNNING"
+                await waits
+                # waits only watch for their own duration
+                assert not watcher.status("SBX-0")
+    assert not stub.status_calls
+    assert stub.lists < 50
+
+
+@pytest.mark.asyncio
+async def test_fallback_changes_and_gone_sandboxes():
+    """Test the get_status fallback, the change iteration and the failure of waits on gone sandboxes."""
+    stub = ListStub({"SBX-listed": "PENDING", "SBX-blank": None})
+    stub.hidden["SBX-hidden"] = "RUNNING"
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            watcher = SandboxWatcher(client, min_interval=0.01, max_interval=0.05)
+            changes = []
+
+            async def collect():
+                async for change in watcher:
+                    changes.append((change.sandbox_id, change.previous, change.status))
+
+            collector = asyncio.create_task(collect())
+            await asyncio.sleep(0)
+            watcher.watch("SBX-listed", "SBX-hidden")
+            assert await watcher.wait_for("SBX-hidden", ["RUNNING"], timeout=5) == "RUNNING"
+            with pytest.raises(LybicSandboxNotReadyError):
+                await watcher.wait_running("SBX-blank", timeout=5)
+            stub.statuses["SBX-listed"] = "ERROR"
+            with pytest.raises(LybicSandboxNotReadyError) as error:
+                await watcher.wait_running("SBX-listed", timeout=5)
+            assert error.value.status == "ERROR"
+            await watcher.close()
+            await asyncio.wait_for(collector, 5)
+    assert ("SBX-hidden", None, "RUNNING") in changes
+    assert ("SBX-listed", "PENDING", "ERROR") in changes
+    assert ("SBX-blank", None, None) in changes
+    assert "SBX-listed" not in stub.status_calls
+
+
+@pytest.mark.asyncio
+async def test_interval_backs_off_while_idle():
+    """Test that the poll interval grows to max_interval while nothing changes."""
+    stub = ListStub({"SBX-0": "RUNNING"})
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxWatcher(client, min_interval=0.01, max_interval=0.04, backoff=2) as watcher:
+                watcher.watch("SBX-0")
+                await asyncio.sleep(0.3)
+                assert watcher.interval == 0.04
+                watcher.watch("SBX-1")
+                assert watcher.interval == 0.01
+    assert stub.lists < 15
+
+
+@pytest.mark.asyncio
+async def test_pool_waits_through_the_watcher():
+    """Test that a sandbox pool waits for its new sandboxes with the watcher."""
+    statuses = {}
+
+    def handler(request):
+        if request.method == "POST":
+            sandbox_id = f"SBX-{len(statuses)}"
+            statuses[sandbox_id] = "PENDING"
+            return 200, {"id": sandbox_id, "name": "s", "expiresAt": "", "createdAt": "", "projectId": "p",
+                         "status": "PENDING"}
+        if request.method == "GET" and request.path == SANDBOXES:
+            listed = [{"id": sandbox_id, "name": "s", "expiresAt": "", "createdAt": "", "projectId": "p",
+                       "status": status} for sandbox_id, status in statuses.items()]
+            for sandbox_id in statuses:
+                statuses[sandbox_id] = "RUNNING"
+            return 200, listed
+        if request.method == "DELETE":
+            return 200, {}
+        raise AssertionError(f"unexpected {request.method} {request.path}")
+
+    with StubServer(handler=handler) as server:
+        async with stub_client(server) as client:
+            async with SandboxWatcher(client, min_interval=0.01) as watcher:
+                async with SandboxPool(client, shapes={"small": 3}, watcher=watcher) as pool:
+                    async with pool.acquire(shape="small", timeout=5) as sandbox:
+                        assert sandbox.id.startswith("SBX-")
+
+
+@pytest.mark.asyncio
+async def test_fallbacks_rotate_beyond_max_fallbacks():
+    """Test that every sandbox missing from the list gets a status, even with more of them than max_fallbacks."""
+    stub = ListStub({})
+    stub.hidden.update({"SBX-a": "RUNNING", "SBX-b": "RUNNING", "SBX-c": "RUNNING", "SBX-d": "PENDING"})
+    with StubServer(handler=stub) as server:
+        async with stub_client(server) as client:
+            async with SandboxWatcher(client, min_interval=0.01, max_interval=0.05, max_fallbacks=2) as watcher:
+                watcher.watch("SBX-d")
+                await asyncio.gather(*[watcher.wait_running(sandbox_id, timeout=5)
+                                       for sandbox_id in ("SBX-a", "SBX-b", "SBX-c")])
+    assert {"SBX-a", "SBX-b", "SBX-c"} <= set(stub.status_calls)
@@ -0,0 +1,122 @@
+"""Test request coalescing of identical concurrent GETs."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from lybic import Deadline, LybicAPIError, LybicDeadlineExceededError
+from lybic.singleflight import SingleFlight
+
+from .helpers import mock_client
+
+SANDBOX = {
+    "sandbox": {
+        "id": "SBX-1", "name": "test", "expiresAt": "2025-01-01T00:00:00Z", "createdAt": "2025-01-01T00:00:00Z",
+        "projectId": "p", "shapeName": "s",
+    },
+    "connectDetails": {"gatewayAddresses": [], "certificateHashBase64": "", "endUserToken": "", "roomId": ""},
+}
+
+
+def _counting_handler(calls, body=None, status_code=200):
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(status_code, json=body if body is not None else {})
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_call_and_survives_cancelled_caller():
+    """Test that a cancelled caller does not cancel the call for the others."""
+    flight = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", fn))
+    second = asyncio.create_task(flight.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "result"
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_request_and_parsed_dto():
+    """Test that Sandbox.get called concurrently makes one request and parses once."""
+    calls = []
+    async with mock_client(_counting_handler(calls, SANDBOX), singleflight=True) as client:
+        results = await asyncio.gather(*(client.sandbox.get("SBX-1") for _ in range(5)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert results[0].sandbox.id == "SBX-1"
+
+        # a later call is a new flight
+        await client.sandbox.get("SBX-1")
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_params_and_methods_are_not_coalesced_together():
+    """Test that different params and non-GET requests are sent separately."""
+    calls = []
+    async with mock_client(_counting_handler(calls), singleflight=True) as client:
+        await asyncio.gather(
+            client.request("GET", "/test", params={"a": 1, "b": 2}),
+            client.request("GET", "/test", params={"b": 2, "a": 1}),
+            client.request("GET", "/test", params={"a": 2}),
+            client.request("POST", "/test"),
+            client.request("POST", "/test"),
+        )
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    """Test that all waiters get the error of the shared request."""
+    calls = []
+    async with mock_client(_counting_handler(calls, {"message": "not found"}, 404), singleflight=True) as client:
+        results = await asyncio.gather(
+            *(client.request("GET", "/test") for _ in range(3)), return_exceptions=True)
+    assert len(calls) == 1
+    assert all(isinstance(result, LybicAPIError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_disabled_by_default():
+    """Test that requests are not coalesced unless enabled."""
+    calls = []
+    async with mock_client(_counting_handler(calls)) as client:
+        await asyncio.gather(*(client.request("GET", "/test") for _ in range(3)))
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_follower_waits_within_its_own_deadline():
+    """Test that a caller joining a slow call gives up at its own deadline, without cancelling the call."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.5)
+        return httpx.Response(200, json=SANDBOX)
+
+    async def follower():
+        async with Deadline(0.1):
+            return await client.sandbox.get("SBX-1")
+
+    async with mock_client(handler, singleflight=True) as client:
+        leader = asyncio.create_task(client.sandbox.get("SBX-1"))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        with pytest.raises(LybicDeadlineExceededError):
+            await follower()
+        assert time.monotonic() - started < 0.3
+        assert (await leader).sandbox.id == "SBX-1"
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+"""Stress test sharing one LybicSyncClient between threads."""
+import threading
+
+from lybic import Deadline, TransportConfig
+from lybic_sync import LybicSyncClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+THREADS = 64
+CALLS_PER_THREAD = 10
+WORKERS = 8
+
+
+def _client(server: StubServer, **kwargs) -> LybicSyncClient:
+    return LybicSyncClient(stub_auth(server), transport=TransportConfig(max_connections=THREADS, max_keepalive_connections=THREADS),
+                           **kwargs)
+
+
+def test_threads_share_one_client_and_pool():
+    """Test that 64 threads racing on a fresh client share one httpx client and one connection pool."""
+    errors, clients, pools = [], set(), set()
+    barrier = threading.Barrier(THREADS)
+
+    with StubServer(latency=0.001) as server:
+        client = _client(server)
+
+        def work(index):
+            barrier.wait()
+            try:
+                for _ in range(CALLS_PER_THREAD):
+                    result = client.sandbox.execute_sandbox_action(f"SBX-{index}", action={"type": "screenshot"})
+                    assert result.screenShot
+                clients.add(id(client.client))
+                pools.add(id(client.transport._pools["api"]))  # pylint: disable=protected-access
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+
+    assert not errors
+    assert len(clients) == 1
+    assert len(pools) == 1
+    assert server.requests == THREADS * CALLS_PER_THREAD
+
+
+def test_map_and_submit():
+    """Test the bulk API on the managed thread pool, bounded by its workers."""
+    with StubServer(latency=0.001) as server:
+        with _client(server, max_workers=WORKERS) as client:
+            results = list(client.map(
+                lambda index: client.sandbox.execute_sandbox_action(f"SBX-{index}", action={"type": "screenshot"}),
+                range(THREADS * CALLS_PER_THREAD),
+            ))
+            with Deadline(30.0) as deadline:
+                seen = client.submit(Deadline.current).result()
+    assert len(results) == THREADS * CALLS_PER_THREAD
+    assert seen is deadline
+    assert 1 < server.max_in_flight <= WORKERS
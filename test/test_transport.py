@@ -0,0 +1,151 @@
+"""Test connection pool and transport configuration for Lybic clients."""
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+
+from lybic import LybicClient, TransportConfig
+from lybic.gui_agents.api.agent import Client as AgentClient
+from lybic_sync import LybicSyncClient
+
+from .helpers import mock_auth, stub_auth
+from .stub_server import StubServer
+
+
+def test_transport_config_limits():
+    """Test that the pool settings are mapped to httpx limits."""
+    config = TransportConfig(max_connections=500, max_keepalive_connections=200, keepalive_expiry=30)
+    assert config.limits == httpx.Limits(max_connections=500, max_keepalive_connections=200, keepalive_expiry=30)
+
+
+def test_transport_config_per_role():
+    """Test that per-host pool settings fall back to the main settings."""
+    downloads = TransportConfig(max_connections=10)
+    config = TransportConfig(downloads=downloads)
+    assert config.for_role("api") is config
+    assert config.for_role("agent_service") is config
+    assert config.for_role("downloads") is downloads
+
+
+def test_transport_config_validation():
+    """Test that invalid pool settings are rejected."""
+    with pytest.raises(ValueError):
+        TransportConfig(max_connections=0)
+    with pytest.raises(ValueError):
+        TransportConfig(max_keepalive_connections=-1)
+
+
+@pytest.mark.asyncio
+async def test_async_client_uses_custom_transport():
+    """Test that LybicClient sends requests through the configured transport."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"mcpServers": 1, "sandboxes": 2, "projects": 3})
+
+    config = TransportConfig(transport=httpx.MockTransport(handler))
+    async with LybicClient(mock_auth(), transport=config) as client:
+        stats = await client.stats.get()
+
+    assert stats.sandboxes == 2
+    assert seen[0].url == "https://api.example.com/api/orgs/test_org/stats"
+    assert seen[0].headers["x-api-key"] == "test_key"
+
+
+def test_sync_client_uses_custom_transport():
+    """Test that LybicSyncClient sends requests through the configured transport."""
+    config = TransportConfig(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"mcpServers": 1, "sandboxes": 2, "projects": 3}))
+    )
+    with LybicSyncClient(mock_auth(), transport=config) as client:
+        assert client.transport_config is config
+        assert client.stats.get().projects == 3
+
+
+def test_default_transport_config():
+    """Test that clients get a default transport config."""
+    client = LybicClient(mock_auth())
+    assert client.transport_config.max_connections == 100
+    assert client.transport_config.http2 is False
+
+
+@pytest.mark.asyncio
+async def test_screenshot_download_shares_pool():
+    """Test that screenshots are downloaded through the downloads pool of the client without credentials."""
+    buffer = BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, format="WebP")
+    cdn_requests = []
+
+    def cdn_handler(request):
+        cdn_requests.append(request)
+        return 200, buffer.getvalue(), {"Content-Type": "image/webp"}
+
+    with StubServer(cdn_handler) as cdn, \
+            StubServer(lambda request: (200, {"screenShot": f"{cdn.url}/screen.webp"})) as api:
+        auth = stub_auth(api)
+        async with LybicClient(auth) as client:
+            url, _, base64_str = await client.sandbox.get_screenshot("SBX-1")
+            await client.sandbox.get_screenshot("SBX-1")
+
+            assert url == f"{cdn.url}/screen.webp"
+            assert base64_str
+
+    assert cdn.connections == 1
+    assert "x-api-key" not in cdn_requests[0].headers
+
+
+@pytest.mark.asyncio
+async def test_borrowed_http_client_does_not_close_pool():
+    """Test that closing a client built on the shared pools keeps the pools open."""
+    def handler(request):
+        if request.path == "/api/agent/info":
+            return 200, {"version": "1.0"}
+        return 200, {"mcpServers": 1, "sandboxes": 2, "projects": 3}
+
+    with StubServer(handler) as api:
+        auth = stub_auth(api, agent_service_endpoint=api.url)
+        async with LybicClient(auth) as client:
+            async with AgentClient(lybic_client=client) as agent:
+                assert (await agent.get_agent_info()).version == "1.0"
+            stats = await client.stats.get()
+
+    assert stats.projects == 3
+    assert api.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_borrowed_transport_fails_after_close():
+    """Test that a client built on the shared pools cannot open new pools once the transport is closed."""
+    with StubServer(lambda request: (200, {"version": "1.0"})) as api:
+        auth = stub_auth(api, agent_service_endpoint=api.url)
+        async with LybicClient(auth) as client:
+            agent = AgentClient(lybic_client=client)
+        with pytest.raises(RuntimeError):
+            await agent.get_agent_info()
+        await agent.close()
+    assert not client.transport._pools  # pylint: disable=protected-access
+
+
+def test_transport_per_role_custom_transport():
+    """Test that a custom transport on a per-role config receives the requests of that role only."""
+    def handler(name):
+        return httpx.MockTransport(lambda request: httpx.Response(200, json={"name": name}))
+
+    config = TransportConfig(transport=handler("main"), downloads=TransportConfig(transport=handler("downloads")))
+    with LybicSyncClient(mock_auth(), transport=config) as client:
+        with client.make_http_client() as http:
+            assert http.get("https://api.example.com/").json() == {"name": "main"}
+            assert http.get("https://cdn.example.com/").json() == {"name": "downloads"}
+
+
+@pytest.mark.asyncio
+async def test_agent_clients_share_pools_by_default():
+    """Test that agent clients created without a LybicClient share the pools of their endpoint."""
+    with StubServer(lambda request: (200, {"version": "1.0"})) as api:
+        auth = stub_auth(api, agent_service_endpoint=api.url)
+        for _ in range(3):
+            async with AgentClient(auth) as agent:
+                assert (await agent.get_agent_info()).version == "1.0"
+    assert api.connections == 1
@@ -0,0 +1,49 @@
+"""Test prewarming the connection pools."""
+import asyncio
+
+import pytest
+
+from lybic import LybicClient, TransportConfig
+from lybic_sync import LybicSyncClient
+
+from .helpers import stub_auth
+from .stub_server import StubServer
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_kept_alive_connections():
+    """Test that warmup opens the connections later calls reuse, for every host."""
+    with StubServer(latency=0.05) as server, StubServer(latency=0.05) as downloads:
+        async with LybicClient(stub_auth(server, agent_service_endpoint=server.url)) as client:
+            reports = await client.warmup(connections=4, urls=[f"{downloads.url}/screen.webp"])
+
+            assert [report["url"] for report in reports] == [f"{server.url}/", f"{downloads.url}/"]
+            assert all(report["connections"] == 4 and report["failed"] == 0 for report in reports)
+            assert all(report["seconds"] >= 0.05 for report in reports)
+            assert server.connections == 4 and downloads.connections == 4
+
+            await asyncio.gather(*[client.request("GET", "/api/orgs/test_org/stats") for _ in range(4)])
+            assert server.connections == 4
+
+
+@pytest.mark.asyncio
+async def test_warmup_is_capped_and_reports_failures():
+    """Test that warmup stays within the keep-alive limit and reports unreachable hosts."""
+    with StubServer(latency=0.05) as server:
+        async with LybicClient(stub_auth(server, agent_service_endpoint=server.url),
+                               transport=TransportConfig(max_keepalive_connections=2)) as client:
+            api, unreachable = await client.warmup(connections=8, urls=["http://127.0.0.1:1"])
+    assert api["connections"] == 2 and server.connections == 2
+    assert unreachable["connections"] == 0 and unreachable["failed"] == 2
+    assert "ConnectError" in unreachable["error"]
+
+
+def test_sync_warmup():
+    """Test that the sync client opens its connections concurrently too."""
+    with StubServer(latency=0.05) as server:
+        with LybicSyncClient(stub_auth(server, agent_service_endpoint=server.url)) as client:
+            reports = client.warmup(connections=3)
+            client.request("GET", "/api/orgs/test_org/stats")
+    assert len(reports) == 1
+    assert reports[0]["connections"] == 3
+    assert server.connections == 3